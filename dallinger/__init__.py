@@ -1,23 +1,14 @@
 """This is Dallinger, a platform for simulating evolution with people."""
 
 import logging
+from importlib import import_module
+from importlib.util import find_spec
 from logging import NullHandler
 
-from . import (
-    bots,
-    command_line,
-    config,
-    experiment,
-    experiments,
-    heroku,
-    information,
-    models,
-    networks,
-    nodes,
-    processes,
-    registration,
-    transformations,
-)
+# The model modules are imported eagerly, so that the polymorphic identities of
+# all the built-in Node, Info, Network and Transformation subclasses are
+# registered whichever module a process imports first.
+from . import information, models, networks, nodes, transformations
 
 logger = logging.getLogger(__name__)
 logger.addHandler(NullHandler())
@@ -38,3 +29,15 @@ __all__ = (
     "registration",
     "logger",
 )
+
+
+def __getattr__(name):
+    # Submodules are imported on first access, so that processes only pay
+    # for the dependencies (selenium, boto3, paramiko...) they actually use.
+    if name in __all__ or find_spec("." + name, __name__) is not None:
+        return import_module("." + name, __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
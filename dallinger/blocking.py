@@ -0,0 +1,168 @@
+"""Detect code that blocks the gevent event loop.
+
+Experiment code runs in greenlets in the web and worker processes. When the
+``gevent_max_blocking_ms`` config parameter is set, gevent's monitoring
+thread checks that the event loop switches greenlets at least that often.
+When a greenlet keeps it from doing so, its stack trace is logged with the
+route, worker event or function it was running, counted in the
+``dallinger_gevent_loop_blocked_total`` metric, and added to the recent
+events shown on the dashboard's Event Loop tab.
+"""
+
+import json
+import logging
+import time
+import weakref
+
+import gevent
+from gevent import events
+from redis.exceptions import RedisError
+
+from dallinger import db, metrics, monitoring
+from dallinger.config import get_config
+
+logger = logging.getLogger(__name__)
+
+BLOCKING_LOG_PREFIX = "Event loop blocked:"
+
+EVENTS_KEY = "dallinger_blocking:events"
+
+#: Number of recent events kept for the dashboard.
+MAX_EVENTS = 100
+
+_contexts = weakref.WeakKeyDictionary()
+_process = monitoring.MonitoredProcess()
+# The greenlet of the last report, and when it was last seen blocking
+_last_blocked = (None, 0.0)
+
+
+def threshold_ms():
+    """The configured threshold, or ``None`` if blocking isn't monitored."""
+    config = get_config()
+    if not config.ready:
+        return None
+    return config.get("gevent_max_blocking_ms", 0) or None
+
+
+def start(process_type):
+    """Start monitoring the event loop of this process's hub, once per
+    process. ``process_type`` is ``"web"`` or ``"worker"``.
+    """
+    if not _process.start(process_type):
+        return
+    gevent.config.max_blocking_time = threshold_ms() / 1000.0
+    gevent.config.monitor_thread = True
+    # Reported through the log, with the blocking greenlet's context
+    gevent.config.print_blocking_reports = False
+    events.subscribers.append(_on_event)
+    gevent.get_hub().start_periodic_monitoring_thread()
+
+
+def attribute(greenlet, context):
+    """Report the blocking of ``greenlet`` as coming from ``context``."""
+    _contexts[greenlet] = context
+
+
+def context_of(greenlet):
+    context = _contexts.get(greenlet)
+    if context is not None:
+        return context
+    run = getattr(greenlet, "_run", None)
+    if run is not None:
+        return "greenlet {}".format(getattr(run, "__qualname__", repr(run)))
+    return "-"
+
+
+def _on_event(event):
+    """Called in gevent's monitoring thread, which must not switch
+    greenlets, so the event is reported by a greenlet spawned by the hub.
+
+    The monitoring thread emits an event every ``gevent_max_blocking_ms``
+    while a greenlet blocks, so events for the same greenlet in consecutive
+    checks are reported once.
+    """
+    global _last_blocked
+    if not isinstance(event, events.EventLoopBlocked):
+        return
+    now = time.time()
+    last_greenlet, last_seen = _last_blocked
+    _last_blocked = (weakref.ref(event.greenlet), now)
+    if (
+        last_greenlet is not None
+        and last_greenlet() is event.greenlet
+        and now - last_seen < 2.5 * event.blocking_time
+    ):
+        return
+    report = {
+        "time": now,
+        "process": _process.process_type,
+        "process_id": _process.process_id,
+        "context": context_of(event.greenlet),
+        "threshold_ms": event.blocking_time * 1000,
+        "stack": "\n".join(event.info),
+    }
+    event.hub.loop.run_callback_threadsafe(gevent.spawn, record, report)
+
+
+def record(report):
+    logger.warning(
+        "%s %s blocked the event loop for more than %.0f ms\n%s",
+        BLOCKING_LOG_PREFIX,
+        report["context"],
+        report["threshold_ms"],
+        report["stack"],
+    )
+    try:
+        pipe = db.redis_conn.pipeline(transaction=False)
+        metrics.GEVENT_LOOP_BLOCKED.inc(
+            pipe, process=report["process"], context=report["context"]
+        )
+        pipe.lpush(EVENTS_KEY, json.dumps(report))
+        pipe.ltrim(EVENTS_KEY, 0, MAX_EVENTS - 1)
+        pipe.execute()
+    except RedisError:
+        logger.warning("Could not record event loop blocking in Redis.", exc_info=True)
+
+
+def recent_events(conn=None):
+    conn = conn or db.redis_conn
+    return [json.loads(report) for report in conn.lrange(EVENTS_KEY, 0, -1)]
+
+
+def counts(conn=None):
+    """Blocking events by process type and context, most frequent first."""
+    conn = conn or db.redis_conn
+    return sorted(
+        (
+            (labels["process"], labels["context"], int(value))
+            for labels, value in metrics.GEVENT_LOOP_BLOCKED.values(conn)
+        ),
+        key=lambda item: item[2],
+        reverse=True,
+    )
+
+
+def clear(conn=None):
+    conn = conn or db.redis_conn
+    conn.delete(EVENTS_KEY, metrics.GEVENT_LOOP_BLOCKED.key)
+
+
+def init_app(app):
+    """Monitor the web process, and attribute blocking to the route of the
+    request being handled.
+    """
+    from flask import request
+
+    from dallinger.experiment_server.utils import route_label
+
+    @app.before_request
+    def attribute_request():
+        if threshold_ms():
+            start("web")
+            attribute(
+                gevent.getcurrent(), "{} {}".format(request.method, route_label())
+            )
+
+    @app.teardown_request
+    def forget_request(exc):
+        _contexts.pop(gevent.getcurrent(), None)
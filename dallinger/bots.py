@@ -254,6 +254,12 @@ class HighPerformanceBotBase(BotBase):
     Instead, this kind of bot makes requests directly to the experiment server.
     """
 
+    #: The HTTP client used for requests to the experiment server: the
+    #: ``requests`` module by default, or a shared, pooled
+    #: ``requests.Session`` when the bot is run by a
+    #: :class:`~dallinger.swarm.BotSwarm`.
+    http = requests
+
     @property
     def driver(self):
         raise NotImplementedError
@@ -293,7 +299,7 @@ class HighPerformanceBotBase(BotBase):
                 )
             )
             try:
-                result = requests.post(url)
+                result = self.http.post(url)
                 result.raise_for_status()
             except RequestException:
                 self.stochastic_sleep()
@@ -326,7 +332,7 @@ class HighPerformanceBotBase(BotBase):
                 host=self.host, participant_id=self.participant_id, status=status
             )
             try:
-                result = requests.get(url)
+                result = self.http.get(url)
                 result.raise_for_status()
             except RequestException:
                 self.stochastic_sleep()
@@ -369,9 +375,45 @@ class HighPerformanceBotBase(BotBase):
                 host=self.host, self=self
             )
             try:
-                result = requests.post(url, data=data)
+                result = self.http.post(url, data=data)
                 result.raise_for_status()
             except RequestException:
                 self.stochastic_sleep()
                 continue
             return True
+
+
+class LoadTestBot(HighPerformanceBotBase):
+    """A generic bot for ``dallinger loadtest``, used when the experiment
+    does not define a :class:`HighPerformanceBotBase` of its own.
+
+    It exercises the core web API: it creates a node, fetches the node's
+    neighbors, creates an info and reads it back.
+    """
+
+    def subscribe_to_quorum_channel(self):
+        # The load test drives the server from outside its gevent loop, so
+        # there is no websocket to listen on.
+        pass
+
+    def participate(self):
+        result = self.http.post(
+            "{host}/node/{self.participant_id}".format(host=self.host, self=self)
+        )
+        if result.status_code != 200:
+            # No network has room for this participant
+            return
+        node_id = result.json()["node"]["id"]
+        self.http.get(
+            "{host}/node/{node_id}/neighbors".format(host=self.host, node_id=node_id)
+        )
+        result = self.http.post(
+            "{host}/info/{node_id}".format(host=self.host, node_id=node_id),
+            data={"contents": uuid.uuid4().hex},
+        )
+        result.raise_for_status()
+        self.http.get(
+            "{host}/info/{node_id}/{info_id}".format(
+                host=self.host, node_id=node_id, info_id=result.json()["info"]["id"]
+            )
+        )
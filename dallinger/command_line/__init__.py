@@ -38,6 +38,7 @@ from dallinger.constraints import constraints_cli
 from dallinger.deployment import (
     DebugDeployment,
     LoaderDeployment,
+    LoadTestDeployment,
     deploy_sandbox_shared_setup,
     setup_experiment,
 )
@@ -50,6 +51,7 @@ from dallinger.notifications import (
     admin_notifier,
 )
 from dallinger.recruiters import by_name
+from dallinger.swarm import ARRIVAL_PROFILES
 from dallinger.utils import (
     check_call,
     generate_random_id,
@@ -218,6 +220,50 @@ def debug(verbose, bot, proxy, no_browsers=False, exp_config=None):
     debugger.run()
 
 
+@dallinger.command()
+@click.option("--verbose", is_flag=True, flag_value=True, help="Verbose mode")
+@click.option("--bots", default=100, type=int, help="Number of simulated participants")
+@click.option(
+    "--rate",
+    default=10.0,
+    type=float,
+    help="Mean arrival rate of participants, per second",
+)
+@click.option(
+    "--profile",
+    default="ramp",
+    type=click.Choice(ARRIVAL_PROFILES),
+    help="How participant arrivals are spaced out",
+)
+@click.option(
+    "--concurrency",
+    default=50,
+    type=int,
+    help="Maximum number of participants active at once, one thread each",
+)
+@click.option(
+    "--output",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="JSON file to save the results to",
+)
+@require_exp_directory
+def loadtest(verbose, bots, rate, profile, concurrency, output, exp_config=None):
+    """Measure how the experiment performs under load, locally."""
+    tester = LoadTestDeployment(
+        Output(),
+        verbose,
+        exp_config,
+        bots=bots,
+        rate=rate,
+        profile=profile,
+        concurrency=concurrency,
+        results_path=output,
+    )
+    log(header, chevrons=False)
+    tester.run()
+
+
 def _mturk_service_from_config(sandbox):
     config = get_config(load=True)
     return MTurkService(
@@ -809,6 +855,40 @@ def load(app, verbose, replay, exp_config=None):
     loader.run()
 
 
+@dallinger.group("replay-cache")
+def replay_cache():
+    """Manage the cached database imports used by experiment replays."""
+    pass
+
+
+@replay_cache.command("list")
+def replay_cache_list():
+    """List cached replay imports."""
+    cached = data.list_cached_imports()
+    if not cached:
+        click.echo("No cached replay imports found.")
+        return
+    rows = [
+        [entry["name"], entry["source"], "{:.1f} MB".format(entry["size"] / 1e6)]
+        for entry in cached
+    ]
+    print(render_rich_table(rows, headers=["Database", "Source", "Size"]))
+
+
+@replay_cache.command("evict")
+@click.option("--all", "evict_all", is_flag=True, help="Evict every cached import")
+@click.argument("names", nargs=-1)
+def replay_cache_evict(evict_all, names):
+    """Drop cached replay imports by database name."""
+    if not names and not evict_all:
+        raise click.UsageError("Pass database names to evict, or --all.")
+    evicted = data.evict_cached_imports(None if evict_all else names)
+    for name in evicted:
+        log("Evicted {}".format(name))
+    if not evicted:
+        click.echo("No matching cached replay imports found.")
+
+
 @dallinger.command()
 @click.option("--app", default=None, callback=verify_id, help="Experiment id")
 def logs(app):
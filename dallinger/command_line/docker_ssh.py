@@ -21,11 +21,10 @@ from pathlib import Path
 from secrets import token_urlsafe
 from shlex import quote
 from socket import gethostbyname_ex, gethostname
-from typing import Dict, Literal
+from typing import TYPE_CHECKING, Dict, Literal
 from uuid import uuid4
 
 import click
-import paramiko
 import requests
 from jinja2 import Template
 from requests.adapters import HTTPAdapter
@@ -55,6 +54,9 @@ from dallinger.utils import (
 
 from .utils import get_server_pem_path
 
+if TYPE_CHECKING:
+    import paramiko
+
 
 @dataclass(frozen=True)
 class App:
@@ -1324,7 +1326,7 @@ def destroy(server, app):
     print(f"App {app} removed")
 
 
-def get_connected_ssh_client(host, user=None) -> paramiko.SSHClient:
+def get_connected_ssh_client(host, user=None) -> "paramiko.SSHClient":
     """Create and connect an SSH client with proper authentication.
 
     Args:
@@ -1339,6 +1341,8 @@ def get_connected_ssh_client(host, user=None) -> paramiko.SSHClient:
         This is a deliberate choice to simplify the connection process, as the server
         is expected to be under our control.
     """
+    import paramiko
+
     pem_path = get_server_pem_path()
     client = paramiko.SSHClient()
 
@@ -1610,7 +1614,7 @@ class ExecuteException(Exception):
     pass
 
 
-def get_sftp(host, user=None) -> paramiko.SFTPClient:
+def get_sftp(host, user=None) -> "paramiko.SFTPClient":
     client = get_connected_ssh_client(host, user)
     return client.open_sftp()
 
@@ -1,4 +1,5 @@
 import errno
+import importlib.util
 import logging
 import os.path
 import socket
@@ -8,13 +9,9 @@ from datetime import datetime
 from pathlib import Path
 from typing import Callable
 
-import boto3
 import click
-import pandas as pd
-import paramiko
 import requests
 from botocore.exceptions import ClientError
-from paramiko import ssh_exception as pse
 from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn
 from tenacity import (
     before_sleep_log,
@@ -30,6 +27,10 @@ from ..config import store_host as dallinger_store_host
 from ..docker_ssh import Executor
 from ..docker_ssh import prepare_server as dallinger_prepare_server
 
+if importlib.util.find_spec("pandas") is None:
+    # pandas is only imported when it is used, but the ec2 extra requires it
+    raise ImportError("The ec2 commands require pandas")
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_AWS_REGION = "us-east-1"
@@ -111,18 +112,26 @@ class _BotoClientProxy:
 
 
 def get_ec2_client(region_name=None):
+    import boto3
+
     return _BotoClientProxy(boto3.client("ec2", **get_keys(region_name)))
 
 
 def get_ssm_client(region_name=None):
+    import boto3
+
     return _BotoClientProxy(boto3.client("ssm", **get_keys(region_name)))
 
 
 def get_53_client():
+    import boto3
+
     return _BotoClientProxy(boto3.client("route53", **get_keys()))
 
 
 def list_regions():
+    import pandas as pd
+
     logger.info("Getting regions...")
     regions = get_ec2_client().describe_regions()["Regions"]
     region_metadata = []
@@ -139,6 +148,8 @@ def list_regions():
 
 
 def get_instance_details(instance_types, region_name=None):
+    import pandas as pd
+
     try:
         response = requests.get(
             "https://ec2.shop",
@@ -169,6 +180,8 @@ def get_instance_details(instance_types, region_name=None):
 
 
 def get_instances(region_name, show_spinner=True):
+    import pandas as pd
+
     display_region = region_name or _resolve_default_region_name()
     if show_spinner:
         with yaspin(
@@ -221,6 +234,8 @@ def get_instances(region_name, show_spinner=True):
 
 
 def get_all_instances(region_name=None):
+    import pandas as pd
+
     if region_name is None:
         logger.info("Listing instances in all regions...")
         instance_dfs = []
@@ -305,6 +320,8 @@ def list_instances(region_name=None, filtered_states=[], pem=None):
 
 
 def get_instance_types(region_name=None):
+    import pandas as pd
+
     ec2 = get_ec2_client(region_name)
     with Progress(
         SpinnerColumn(style="green"),
@@ -353,6 +370,8 @@ def list_instance_types(region_name=None):
 
 
 def list_recent_ubuntu_images(region_name=None):
+    import pandas as pd
+
     logger.info("Getting recent Ubuntu images...")
     response = get_ec2_client(region_name).describe_images(
         IncludeDeprecated=False,
@@ -444,6 +463,8 @@ def register_key_pair(ec2, key_name):
 
     Supports RSA, Ed25519, and ECDSA key types.
     """
+    import paramiko
+
     pem_path: Path = get_pem_path(key_name)
 
     # Try each supported key type
@@ -468,6 +489,8 @@ def register_key_pair(ec2, key_name):
 
 def _is_retryable(exc: BaseException) -> bool:
     """Avoid retrying when there's no hope."""
+    from paramiko import ssh_exception as pse
+
     _RETRY_ERRNOS = {
         getattr(errno, "ECONNREFUSED", None),
         getattr(errno, "EHOSTUNREACH", None),
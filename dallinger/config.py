@@ -25,6 +25,7 @@ import json
 import logging
 import os
 import sys
+import threading
 from collections import deque
 from contextlib import contextmanager
 from pathlib import Path
@@ -34,6 +35,7 @@ logger = logging.getLogger(__name__)
 marker = object()
 
 LOCAL_CONFIG = "config.txt"
+CHANGEABLE_PARAMS_CHANNEL = "dallinger_config_changes"
 SENSITIVE_KEY_NAMES = ("access_id", "access_key", "password", "secret", "token")
 
 
@@ -89,7 +91,9 @@ default_keys = (
     ("dallinger_develop_directory", str, []),
     ("dallinger_email_address", str, []),
     ("dashboard_password", str, [], True),
+    ("dashboard_search_index", bool, []),
     ("dashboard_user", str, [], True),
+    ("database_replica_url", str, [], True),
     ("database_size", str, []),
     ("database_url", str, [], True),
     ("debug_recruiter", str, []),
@@ -103,6 +107,7 @@ default_keys = (
     ("ec2_default_pem", str, []),
     ("ec2_default_security_group", str, []),
     ("enable_global_experiment_registry", bool, []),
+    ("gevent_max_blocking_ms", int, []),
     ("EXPERIMENT_CLASS_NAME", str, []),
     ("group_name", str, []),
     ("heroku_app_id_root", str, []),
@@ -120,6 +125,9 @@ default_keys = (
     ("logfile", str, []),
     ("loglevel", int, []),
     ("loglevel_worker", int, []),
+    ("max_worker_memory_mb", int, []),
+    ("memory_profiling", bool, []),
+    ("metrics", bool, []),
     ("mode", str, []),
     ("mturk_qualification_blocklist", str, ["qualification_blacklist"]),
     ("mturk_qualification_requirements", str, [], False, [is_valid_json]),
@@ -143,7 +151,10 @@ default_keys = (
     ("recruiters", str, []),
     ("redis_size", str, []),
     ("replay", bool, []),
+    ("replay_speed", float, []),
+    ("request_profiling", bool, []),
     ("sentry", bool, []),
+    ("slow_query_ms", int, []),
     ("smtp_host", str, []),
     ("smtp_username", str, []),
     ("smtp_password", str, ["dallinger_email_password"], True),
@@ -191,6 +202,100 @@ class ConfigLayer(dict):
         self.source = source
 
 
+class ChangeableValues:
+    """Process-wide cache of the changeable parameters stored in Redis.
+
+    Values are read from Redis once and then served locally. Writers publish
+    the changed key on :data:`CHANGEABLE_PARAMS_CHANNEL` (see :meth:`set`),
+    and a background subscriber drops the local copy when it receives the
+    message. If Redis pub/sub is unavailable every read goes to Redis.
+
+    A value read from Redis is only cached if its key was not invalidated,
+    nor the cache cleared, during the read (as counted by ``_invalidations``
+    and ``_clears``): the value read may predate the change.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self._invalidations = {}
+        self._clears = 0
+        self._pid = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _subscribed(self):
+        if (
+            self._pid == os.getpid()
+            and self._thread is not None
+            and self._thread.is_alive()
+        ):
+            return True
+        from redis.exceptions import RedisError
+
+        from dallinger.db import redis_conn
+
+        # Values cached before a fork, or while unsubscribed, may be stale
+        self.clear()
+        with self._lock:
+            try:
+                pubsub = redis_conn.pubsub()
+                pubsub.subscribe(**{CHANGEABLE_PARAMS_CHANNEL: self._invalidate})
+                # Wait for the subscription to be confirmed so that no
+                # invalidation published after the next read can be missed
+                pubsub.get_message(timeout=1.0)
+                self._thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+            except RedisError as err:
+                logger.warning(f"Could not subscribe to config changes: {err}")
+                self._thread = None
+                return False
+            self._pid = os.getpid()
+        return True
+
+    def _invalidate(self, message):
+        key = message["data"]
+        if isinstance(key, bytes):
+            key = key.decode("utf-8")
+        self._drop(key)
+
+    def _drop(self, key):
+        with self._lock:
+            self._invalidations[key] = self._invalidations.get(key, 0) + 1
+            self.values.pop(key, None)
+
+    def get(self, key):
+        """Return the raw value stored in Redis for ``key``, or ``None``."""
+        from dallinger.db import redis_conn
+
+        if not self._subscribed():
+            return redis_conn.get(key)
+        with self._lock:
+            if key in self.values:
+                return self.values[key]
+            version = (self._clears, self._invalidations.get(key, 0))
+        value = redis_conn.get(key)
+        with self._lock:
+            if (self._clears, self._invalidations.get(key, 0)) == version:
+                self.values[key] = value
+        return value
+
+    def set(self, key, value):
+        """Store ``value`` for ``key`` in Redis and notify all processes."""
+        from dallinger.db import redis_conn
+
+        redis_conn.set(key, value)
+        self._drop(key)
+        redis_conn.publish(CHANGEABLE_PARAMS_CHANNEL, key)
+
+    def clear(self):
+        """Drop all locally cached values."""
+        with self._lock:
+            self._clears += 1
+            self.values.clear()
+
+
+changeable_values = ChangeableValues()
+
+
 class Configuration:
     SUPPORTED_TYPES = {bytes, str, int, float, bool}
     _experiment_params_loaded = False
@@ -205,6 +310,7 @@ class Configuration:
     def clear(self):
         self.data = deque()
         self.ready = False
+        self._resolved = {}
 
     def _reset(self, register_defaults=False):
         self.clear()
@@ -264,6 +370,7 @@ class Configuration:
                     raise e
             normalized_mapping[key] = value
         self.data.extendleft([ConfigLayer(normalized_mapping, source)])
+        self._resolved.clear()
 
     def _layers_by_priority(self):
         """Return layers ordered highest-priority first.
@@ -278,28 +385,25 @@ class Configuration:
         self.extend(*args, **kwargs)
         yield self
         self.data.popleft()
+        self._resolved.clear()
 
+    # Parameters that can be changed while the experiment is running. Their
+    # current value is kept in Redis and takes precedence over all layers.
     changeable_params = ["auto_recruit"]
 
     def get(self, key, default=marker):
-        # For now this is limited to "auto_recruit", but in the future it can be extended
-        # to other parameters as well
-        if key == "auto_recruit":
-            from dallinger.db import redis_conn
-
-            auto_recruit = redis_conn.get("auto_recruit")
-            if auto_recruit is not None:
-                return bool(int(auto_recruit))
+        if key in self.changeable_params:
+            value = changeable_values.get(key)
+            if value is not None:
+                return bool(int(value))
         if not self.ready:
             raise RuntimeError("Config not loaded")
-        for layer in self._layers_by_priority():
-            try:
-                value = layer[key]
-                if isinstance(value, str):
-                    value = value.strip()
-                return value
-            except KeyError:
-                continue
+        try:
+            value = self._resolved[key]
+        except KeyError:
+            value = self._resolved[key] = self._resolve(key)
+        if value is not marker:
+            return value
         if default is marker:
             error_text = f"The following config parameter was not set: {key}. Consider setting it in config.txt or in ~/.dallingerconfig."
             if key == "prolific_project":
@@ -307,6 +411,21 @@ class Configuration:
             raise KeyError(error_text)
         return default
 
+    def _resolve(self, key):
+        """Return the value of ``key`` from the highest-priority layer that
+        sets it, or ``marker``. Results are memoized in ``_resolved`` until
+        the layers change.
+        """
+        for layer in self._layers_by_priority():
+            try:
+                value = layer[key]
+            except KeyError:
+                continue
+            if isinstance(value, str):
+                value = value.strip()
+            return value
+        return marker
+
     def __getitem__(self, key):
         return self.get(key)
 
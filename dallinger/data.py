@@ -4,6 +4,7 @@ import csv
 import errno
 import hashlib
 import io
+import json
 import logging
 import os
 import shutil
@@ -12,14 +13,17 @@ import tempfile
 import warnings
 from zipfile import ZIP_DEFLATED, ZipFile
 
-import boto3
-import botocore
+import botocore.exceptions
 import psycopg2
+import sqlalchemy
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
 
 from dallinger import db, models
 from dallinger.heroku.tools import HerokuApp
 from dallinger.postgres_copy import copy_from
 from dallinger.utils import open_for_csv
+from dallinger.version import __version__
 
 from .config import get_config
 
@@ -178,49 +182,100 @@ def copy_heroku_to_local(id):
     heroku_app.pg_pull()
 
 
-def copy_db_to_csv(dsn, path, scrub_pii=False):
-    """Copy a local database to a set of CSV files."""
+#: Default PII scrubbing policy applied by :func:`copy_db_to_csv` when
+#: ``scrub_pii`` is set. Maps table names to ``{column: SQL expression}``;
+#: each expression replaces the column's value in the exported CSV. Columns
+#: missing from the database being exported are ignored.
+pii_scrub_policy = {
+    "participant": {
+        "worker_id": "id::text",
+        "unique_id": "id::text || ':' || coalesce(assignment_id, '')",
+        "client_ip_address": "NULL",
+    },
+}
+
+
+def merge_scrub_policies(*policies):
+    """Combine scrub policies, with later policies taking precedence per
+    column.
+    """
+    merged = {}
+    for policy in policies:
+        for table, columns in (policy or {}).items():
+            merged.setdefault(table, {}).update(columns)
+    return merged
+
+
+def _table_columns(cur, table):
+    cur.execute(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_name = %s AND table_schema = current_schema() "
+        "ORDER BY ordinal_position",
+        (table,),
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+def _copy_source(cur, table, scrubbed_columns):
+    """Return the COPY source for ``table``: the table itself, or a SELECT
+    which replaces the scrubbed columns in place.
+    """
+    if not scrubbed_columns:
+        return table
+    expressions = []
+    for column in _table_columns(cur, table):
+        quoted = '"{}"'.format(column)
+        if column in scrubbed_columns:
+            expressions.append("{} AS {}".format(scrubbed_columns[column], quoted))
+        else:
+            expressions.append(quoted)
+    return "(SELECT {} FROM {})".format(", ".join(expressions), table)
+
+
+def copy_db_to_csv(dsn, path, scrub_pii=False, scrub_policy=None):
+    """Copy a local database to a set of CSV files.
+
+    If ``scrub_pii`` is set, PII is scrubbed by the database during the COPY
+    according to :data:`pii_scrub_policy`, extended by ``scrub_policy``.
+    """
     if "postgresql://" in dsn or "postgres://" in dsn:
         conn = psycopg2.connect(dsn=dsn)
     else:
         conn = psycopg2.connect(database=dsn, user="dallinger")
+    policy = merge_scrub_policies(pii_scrub_policy, scrub_policy) if scrub_pii else {}
     cur = conn.cursor()
     for table in table_names:
         csv_path = os.path.join(path, "{}.csv".format(table))
+        source = _copy_source(cur, table, policy.get(table))
         with open(csv_path, "w") as f:
-            sql = "COPY {} TO STDOUT WITH CSV HEADER".format(table)
+            sql = "COPY {} TO STDOUT WITH CSV HEADER".format(source)
             cur.copy_expert(sql, f)
     conn.close()
-    if scrub_pii:
-        _scrub_participant_table(path)
 
 
 # Backwards compatibility for imports
 copy_local_to_csv = copy_db_to_csv
 
 
-def _scrub_participant_table(path_to_data):
-    """Scrub PII from the given participant table."""
-    path = os.path.join(path_to_data, "participant.csv")
-    with open_for_csv(path, "r") as input, open("{}.0".format(path), "w") as output:
-        reader = csv.reader(input)
-        writer = csv.writer(output)
-        headers = next(reader)
-        writer.writerow(headers)
-        for i, row in enumerate(reader):
-            row[headers.index("worker_id")] = row[headers.index("id")]
-            row[headers.index("unique_id")] = "{}:{}".format(
-                row[headers.index("id")], row[headers.index("assignment_id")]
-            )
-            if "client_ip_address" in headers:
-                row[headers.index("client_ip_address")] = ""
-            writer.writerow(row)
+def _experiment_scrub_policy():
+    """The extra scrub policy declared by the active experiment, if any."""
+    from dallinger.config import experiment_available
+    from dallinger.utils import get_exp_klass
 
-        os.rename("{}.0".format(path), path)
+    if not experiment_available():
+        return None
+    exp_klass = get_exp_klass()
+    if exp_klass is None:
+        return None
+    return exp_klass.pii_scrub_policy()
 
 
-def export(id, local=False, scrub_pii=False):
-    """Export data from an experiment."""
+def export(id, local=False, scrub_pii=False, scrub_policy=None):
+    """Export data from an experiment.
+
+    When scrubbing PII, ``scrub_policy`` defaults to the policy returned by
+    the active experiment's ``pii_scrub_policy()``.
+    """
 
     print("Preparing to export the data...")
 
@@ -228,10 +283,14 @@ def export(id, local=False, scrub_pii=False):
         db_uri = db.db_url
     else:
         db_uri = HerokuApp(id).db_uri
-    return export_db_uri(id, db_uri=db_uri, local=local, scrub_pii=scrub_pii)
+    if scrub_pii and scrub_policy is None:
+        scrub_policy = _experiment_scrub_policy()
+    return export_db_uri(
+        id, db_uri=db_uri, local=local, scrub_pii=scrub_pii, scrub_policy=scrub_policy
+    )
 
 
-def export_db_uri(id, db_uri, local, scrub_pii):
+def export_db_uri(id, db_uri, local, scrub_pii, scrub_policy=None):
     # Create the data package if it doesn't already exist.
     subdata_path = os.path.join("data", id, "data")
     try:
@@ -242,7 +301,7 @@ def export_db_uri(id, db_uri, local, scrub_pii):
             raise
 
     # Copy in the data.
-    copy_db_to_csv(db_uri, subdata_path, scrub_pii=scrub_pii)
+    copy_db_to_csv(db_uri, subdata_path, scrub_pii=scrub_pii, scrub_policy=scrub_policy)
 
     # Copy the experiment code into a code/ subdirectory.
     try:
@@ -343,6 +402,144 @@ def ingest_zip(path, engine=None):
                 ingest_to_model(file, model, engine)
 
 
+def zip_content_hash(path):
+    """Return the SHA-256 hex digest of the file at ``path``."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def schema_fingerprint(metadata=None):
+    """Return a hex digest of the Dallinger version and the DDL of every
+    table in ``metadata`` (the tables of the loaded models by default).
+    """
+    if metadata is None:
+        metadata = db.Base.metadata
+    digest = hashlib.sha256(__version__.encode("utf-8"))
+    dialect = postgresql.dialect()
+    for table in metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _database_name(url):
+    return url.rsplit("/", 1)[1]
+
+
+def _replay_cache_prefix():
+    return "{}-replay-".format(_database_name(db.db_url))
+
+
+def _execute_autocommit(*statements):
+    """Run database-level statements (CREATE/DROP DATABASE, ...) against the
+    main database, outside of a transaction. Returns the rows of the last
+    statement.
+    """
+    engine = sqlalchemy.create_engine(db.db_url, isolation_level="AUTOCOMMIT")
+    rows = None
+    try:
+        with engine.connect() as conn:
+            for sql, params in statements:
+                result = conn.execute(sqlalchemy.text(sql), params)
+                rows = result.fetchall() if result.returns_rows else None
+    finally:
+        engine.dispose()
+    return rows
+
+
+def cached_import_name(zip_path):
+    """The name of the cached import of ``zip_path``, which depends on the
+    zip's contents and on the database schema it is ingested into.
+    """
+    return "{}{}-{}".format(
+        _replay_cache_prefix(),
+        zip_content_hash(zip_path)[:16],
+        schema_fingerprint()[:8],
+    )
+
+
+def _database_exists(name):
+    rows = _execute_autocommit(
+        ("SELECT 1 FROM pg_database WHERE datname = :name", {"name": name})
+    )
+    return bool(rows)
+
+
+def cached_import_database(zip_path):
+    """Return the name of a database holding the ingested contents of
+    ``zip_path``, ingesting it only if no database exists for the zip's
+    content hash and the current schema yet (see :func:`cached_import_name`).
+    The database is meant to be used as a template for :func:`clone_database`.
+    """
+    name = cached_import_name(zip_path)
+    if _database_exists(name):
+        return name
+
+    # Ingest under a temporary name, so a failed import is never mistaken
+    # for a complete one
+    building = name + "-building"
+    _execute_autocommit(
+        ('DROP DATABASE IF EXISTS "{}"'.format(building), {}),
+        ('CREATE DATABASE "{}"'.format(building), {}),
+    )
+    engine = sqlalchemy.create_engine(db.db_url.rsplit("/", 1)[0] + "/" + building)
+    try:
+        bootstrap_db_from_zip(zip_path, engine)
+    finally:
+        engine.dispose()
+    _execute_autocommit(
+        ('ALTER DATABASE "{}" RENAME TO "{}"'.format(building, name), {}),
+        (
+            'COMMENT ON DATABASE "{}" IS {}'.format(
+                name, "'{}'".format(os.path.basename(zip_path).replace("'", "''"))
+            ),
+            {},
+        ),
+    )
+    return name
+
+
+def clone_database(template, name):
+    """(Re)create database ``name`` as a copy of ``template``."""
+    _execute_autocommit(
+        ('DROP DATABASE IF EXISTS "{}"'.format(name), {}),
+        ('CREATE DATABASE "{}" TEMPLATE "{}"'.format(name, template), {}),
+    )
+
+
+def list_cached_imports():
+    """List the cached replay import databases as dicts with ``name``,
+    ``source`` (the zip file name) and ``size`` (in bytes).
+    """
+    rows = _execute_autocommit(
+        (
+            "SELECT datname, shobj_description(oid, 'pg_database'), "
+            "pg_database_size(datname) FROM pg_database "
+            "WHERE left(datname, length(:prefix)) = :prefix ORDER BY datname",
+            {"prefix": _replay_cache_prefix()},
+        )
+    )
+    return [
+        {"name": name, "source": source, "size": size} for name, source, size in rows
+    ]
+
+
+def evict_cached_imports(names=None):
+    """Drop cached replay import databases; all of them if ``names`` is not
+    given. Returns the names of the dropped databases.
+    """
+    cached = [entry["name"] for entry in list_cached_imports()]
+    if names is not None:
+        cached = [name for name in cached if name in names]
+    if cached:
+        _execute_autocommit(
+            *[('DROP DATABASE IF EXISTS "{}"'.format(name), {}) for name in cached]
+        )
+    return cached
+
+
 def fix_autoincrement(engine, table_name):
     """Auto-increment pointers are not updated when IDs are set explicitly,
     so we manually update the pointer so subsequent inserts work correctly.
@@ -438,6 +635,8 @@ def registration_s3_bucket():
 
 def _s3_resource(dallinger_region=False):
     """A boto3 S3 resource using the AWS keys in the config."""
+    import boto3
+
     config = get_config(load=True)
     region = "us-east-1" if dallinger_region else config.get("aws_region")
     return boto3.resource(
@@ -463,16 +662,135 @@ class Data:
                 setattr(
                     self,
                     "{}s".format(tab),
-                    Table(os.path.join(tmp_dir, "data", "{}.csv".format(tab))),
+                    Table(
+                        os.path.join(tmp_dir, "data", "{}.csv".format(tab)),
+                        model=getattr(models, tab.capitalize()),
+                    ),
                 )
 
 
 class Table:
-    """Dallinger data-table object."""
+    """Dallinger data-table object.
+
+    The CSV file is parsed lazily, and at most once: the tablib dataset
+    backing the text and spreadsheet formats is memoized on first use, and
+    the pandas DataFrame returned by :attr:`df` is built from it.
+
+    When ``model`` is given (or can be inferred from the file name, e.g.
+    ``info.csv``), the DataFrame columns are typed after the model's
+    columns: integers, floats, datetimes, booleans and decoded JSON.
+    """
 
-    def __init__(self, path):
-        with open(path) as f:
-            self.tablib_dataset = tablib.Dataset().load(f.read(), "csv")
+    def __init__(self, path, model=None):
+        if not os.path.isfile(path):
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        self.path = path
+        if model is None:
+            name = os.path.splitext(os.path.basename(path))[0]
+            if name in table_names:
+                model = getattr(models, name.capitalize())
+        self.model = model
+        self._tablib_dataset = None
+        self._df = None
+
+    @property
+    def tablib_dataset(self):
+        """The underlying :class:`tablib.Dataset`, parsed on first access."""
+        if self._tablib_dataset is None:
+            with open(self.path) as f:
+                self._tablib_dataset = tablib.Dataset().load(f.read(), "csv")
+        return self._tablib_dataset
+
+    def _column_kinds(self, headers):
+        """Map CSV headers to the kind of value stored in the model column."""
+        kinds = {}
+        if self.model is None:
+            return kinds
+        columns = self.model.__table__.columns
+        for name in headers:
+            if name not in columns:
+                continue
+            column_type = columns[name].type
+            if isinstance(column_type, sqlalchemy.Boolean):
+                kinds[name] = "boolean"
+            elif isinstance(column_type, sqlalchemy.DateTime):
+                kinds[name] = "datetime"
+            elif isinstance(column_type, sqlalchemy.JSON):
+                kinds[name] = "json"
+            elif isinstance(column_type, sqlalchemy.Integer):
+                kinds[name] = "Int64"
+            elif isinstance(column_type, sqlalchemy.Float):
+                kinds[name] = "float64"
+            elif isinstance(column_type, sqlalchemy.String):
+                kinds[name] = "str"
+        return kinds
+
+    def _read_csv_options(self):
+        with open_for_csv(self.path, "r") as f:
+            headers = next(csv.reader(f), [])
+        kinds = self._column_kinds(headers)
+        dtype = {
+            name: kind if kind in ("Int64", "float64", "str") else "object"
+            for name, kind in kinds.items()
+        }
+        return kinds, {"dtype": dtype, "keep_default_na": False, "na_values": [""]}
+
+    @staticmethod
+    def _coerce(frame, kinds):
+        import pandas as pd
+
+        for name, kind in kinds.items():
+            if kind == "boolean":
+                frame[name] = frame[name].map({"t": True, "f": False}).astype("boolean")
+            elif kind == "datetime":
+                frame[name] = pd.to_datetime(frame[name], format="ISO8601")
+            elif kind == "json":
+                frame[name] = frame[name].map(
+                    lambda value: json.loads(value) if isinstance(value, str) else value
+                )
+        return frame
+
+    @property
+    def df(self):
+        """A pandas DataFrame, typed after the model columns and memoized."""
+        if self._df is None:
+            import pandas as pd
+
+            dataset = self.tablib_dataset
+            headers = dataset.headers or []
+            kinds = self._column_kinds(headers)
+            frame = pd.DataFrame(list(dataset), columns=headers, dtype=object)
+            # Like read_csv with na_values=[""]: only empty fields are missing
+            frame = frame.mask(frame == "")
+            for name in headers:
+                kind = kinds.get(name)
+                if kind in ("Int64", "float64"):
+                    frame[name] = pd.to_numeric(frame[name]).astype(kind)
+                elif kind == "str":
+                    frame[name] = frame[name].astype(kind)
+                elif kind is None:
+                    try:
+                        frame[name] = pd.to_numeric(frame[name])
+                    except (TypeError, ValueError):
+                        pass
+            self._df = self._coerce(frame, kinds)
+        return self._df
+
+    def chunks(self, chunksize=10000):
+        """Iterate over the table as typed DataFrames of at most ``chunksize``
+        rows, without loading the whole file into memory.
+        """
+        if self._df is not None:
+            for offset in range(0, len(self._df), chunksize):
+                yield self._df.iloc[offset : offset + chunksize]
+            return
+
+        import pandas as pd
+
+        kinds, options = self._read_csv_options()
+        with pd.read_csv(self.path, chunksize=chunksize, **options) as reader:
+            for chunk in reader:
+                yield self._coerce(chunk, kinds)
 
     @property
     def csv(self):
@@ -484,11 +802,6 @@ class Table:
         """A Python dictionary."""
         return self.tablib_dataset.dict[0]
 
-    @property
-    def df(self):
-        """A pandas DataFrame."""
-        return self.tablib_dataset.df
-
     @property
     def html(self):
         """An HTML table."""
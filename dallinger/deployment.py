@@ -14,6 +14,7 @@ from dallinger import data, db, heroku, recruiters, registration
 from dallinger.config import get_config
 from dallinger.heroku.tools import HerokuApp, HerokuLocalWrapper
 from dallinger.redis_utils import connect_to_redis
+from dallinger.swarm import BotSwarm, SwarmResult
 from dallinger.utils import (
     GitClient,
     bootstrap_development_session,
@@ -532,6 +533,202 @@ class DebugDeployment(HerokuLocalDeployment):
         return super(DebugDeployment, self).notify(message)
 
 
+class LoadTestDeployment(HerokuLocalDeployment):
+    """Run the experiment locally, as ``dallinger debug`` does, and drive it
+    with a :class:`~dallinger.swarm.BotSwarm`. Throughput and per-route
+    latencies, serialization retries and RQ queue depths are saved to a
+    JSON file.
+    """
+
+    dispatch = {
+        r"{} (\w+)".format(db.SERIALIZATION_RETRY_LOG_PREFIX): "serialization_retry",
+    }
+    QUEUES = ("high", "default", "low")
+    QUEUE_SAMPLE_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        output,
+        verbose,
+        exp_config,
+        bots=100,
+        rate=10.0,
+        profile="ramp",
+        concurrency=50,
+        results_path=None,
+    ):
+        self.out = output
+        self.verbose = verbose
+        self.exp_config = exp_config or {}
+        self.bots = bots
+        self.rate = rate
+        self.profile = profile
+        self.concurrency = concurrency
+        self.original_dir = os.getcwd()
+        self.results_path = os.path.abspath(
+            results_path or "loadtest-{}.json".format(time.strftime("%Y%m%d-%H%M%S"))
+        )
+        self.environ = {
+            "FLASK_SECRET_KEY": codecs.encode(os.urandom(16), "hex").decode("ascii"),
+        }
+        self.complete = False
+        self.swarm = None
+        self.serialization_retries = {}
+        self.queue_depths = {name: [] for name in self.QUEUES}
+
+    def configure(self):
+        super(LoadTestDeployment, self).configure()
+        # Recruitment requests from the experiment would only add load of
+        # their own, so they are logged and ignored.
+        self.exp_config["recruiter"] = "hotair"
+
+    def bot_class(self):
+        """The experiment's ``Bot`` if it is a high-performance bot, or else
+        the generic :class:`~dallinger.bots.LoadTestBot`.
+        """
+        from dallinger.bots import HighPerformanceBotBase, LoadTestBot
+
+        try:
+            from dallinger_experiment.experiment import Bot  # type: ignore
+        except ImportError:
+            return LoadTestBot
+        if isinstance(Bot, type) and issubclass(Bot, HighPerformanceBotBase):
+            return Bot
+        return LoadTestBot
+
+    def execute(self, heroku):
+        base_url = get_base_url()
+        self.out.log("Server is running on {}.".format(base_url))
+        self.out.log("Launching the experiment...")
+        handle_launch_data("{}/launch".format(base_url), error=self.out.error)
+        bot_class = self.bot_class()
+        self.out.log(
+            "Starting {} {} bots ({} arrivals at {}/s, at most {} at once)...".format(
+                self.bots, bot_class.__name__, self.profile, self.rate, self.concurrency
+            )
+        )
+        self.swarm = BotSwarm(
+            bot_class,
+            base_url,
+            count=self.bots,
+            rate=self.rate,
+            profile=self.profile,
+            concurrency=self.concurrency,
+        )
+        runner = threading.Thread(
+            target=self.run_swarm, name="Load test", kwargs={"heroku": heroku}
+        )
+        runner.start()
+        heroku.monitor(listener=self.notify)
+        runner.join()
+        self.save_results()
+
+    def run_swarm(self, heroku):
+        sampler = threading.Thread(
+            target=self.sample_queue_depths, name="Queue depths", daemon=True
+        )
+        sampler.start()
+        try:
+            self.swarm.run()
+        finally:
+            self.complete = True
+            heroku.stop()
+
+    def sample_queue_depths(self):
+        queues = [db.get_queue(name) for name in self.QUEUES]
+        while not self.complete:
+            for queue in queues:
+                self.queue_depths[queue.name].append(queue.count)
+            time.sleep(self.QUEUE_SAMPLE_INTERVAL)
+
+    def serialization_retry(self, match):
+        name = match.group(1)
+        self.serialization_retries[name] = self.serialization_retries.get(name, 0) + 1
+
+    def notify(self, message):
+        if self.complete:
+            return HerokuLocalWrapper.MONITOR_STOP
+        return super(LoadTestDeployment, self).notify(message)
+
+    def results(self):
+        """Return the outcome of the load test as a JSON-serializable dict.
+        If the swarm never started, e.g. because the experiment failed to
+        launch, no bot sessions are reported.
+        """
+        from dallinger.version import __version__
+
+        swarm = self.swarm
+        results = {
+            "dallinger_version": __version__,
+            "experiment_id": self.exp_id,
+            "bot_class": swarm.bot_factory.__name__ if swarm is not None else None,
+            "bots": self.bots,
+            "rate": self.rate,
+            "profile": self.profile,
+            "concurrency": self.concurrency,
+        }
+        results.update((swarm.result if swarm is not None else SwarmResult()).as_dict())
+        results["serialization_retries"] = {
+            "total": sum(self.serialization_retries.values()),
+            "by_function": self.serialization_retries,
+        }
+        results["queue_depth"] = {
+            name: {
+                "max": max(depths, default=0),
+                "mean": sum(depths) / len(depths) if depths else 0,
+            }
+            for name, depths in self.queue_depths.items()
+        }
+        return results
+
+    def save_results(self):
+        results = self.results()
+        self.out.log(
+            "{completed} of {started} bots completed in {duration:.1f}s "
+            "({throughput:.2f}/s)".format(**results)
+        )
+        for endpoint, stats in results["endpoints"].items():
+            self.out.log(
+                "{:<24} {:>6} requests {:>4} errors  p50 {:>8.1f}ms  "
+                "p95 {:>8.1f}ms  p99 {:>8.1f}ms".format(
+                    endpoint,
+                    stats["count"],
+                    stats["errors"],
+                    stats["p50_ms"],
+                    stats["p95_ms"],
+                    stats["p99_ms"],
+                )
+            )
+        if results["arrival_lag"]["count"]:
+            self.out.log(
+                "{} bots started late, arrival lag p50 {:.1f}ms  p99 {:.1f}ms".format(
+                    results["delayed"],
+                    results["arrival_lag"]["p50_ms"],
+                    results["arrival_lag"]["p99_ms"],
+                )
+            )
+        self.out.log(
+            "Serialization retries: {}".format(
+                results["serialization_retries"]["total"]
+            )
+        )
+        self.out.log(
+            "Max queue depth: {}".format(
+                ", ".join(
+                    "{} {}".format(name, depth["max"])
+                    for name, depth in results["queue_depth"].items()
+                )
+            )
+        )
+        with open(self.results_path, "w") as f:
+            json.dump(results, f, indent=4)
+        self.out.log("Results saved to {}".format(self.results_path))
+
+    def cleanup(self):
+        self.out.log("Completed load test of experiment with id " + self.exp_id)
+        self.complete = True
+
+
 class LoaderDeployment(HerokuLocalDeployment):
     dispatch = {"Replay ready: (.*)$": "start_replay"}
 
@@ -1,6 +1,7 @@
 """The base experiment class."""
 
 import datetime
+import hashlib
 import inspect
 import json
 import logging
@@ -10,17 +11,29 @@ import sys
 import time
 import uuid
 import warnings
-from collections import Counter, OrderedDict
+from collections import OrderedDict
 from contextlib import contextmanager
+from dataclasses import dataclass
 from functools import cached_property, wraps
 from importlib import import_module
-from operator import itemgetter
 from typing import Any, List, Optional, Union
 
 import requests
 from flask import Blueprint, url_for
-from sqlalchemy import String, Table, and_, asc, cast, create_engine, desc, func, or_
-from sqlalchemy.orm import scoped_session, sessionmaker, undefer
+from sqlalchemy import (
+    Integer,
+    String,
+    Table,
+    and_,
+    asc,
+    cast,
+    create_engine,
+    desc,
+    func,
+    or_,
+    tuple_,
+)
+from sqlalchemy.orm import scoped_session, sessionmaker, undefer, with_polymorphic
 from sqlalchemy.orm.attributes import InstrumentedAttribute
 from sqlalchemy.orm.exc import MultipleResultsFound, NoResultFound
 
@@ -34,20 +47,26 @@ from dallinger.config import (
 )
 from dallinger.data import (
     Data,
+    cached_import_database,
+    clone_database,
     export,
     find_experiment_export,
-    ingest_zip,
     is_registered,
 )
 from dallinger.data import load as data_load
 from dallinger.db import (
     Base,
+    cached_count,
     db_url,
+    estimated_distinct_count,
+    estimated_table_count,
     get_mapped_class,
     get_polymorphic_mapping,
-    init_db,
+    indexed_search_columns,
+    redis_conn,
+    table_version,
 )
-from dallinger.experiment_server.utils import date_handler
+from dallinger.experiment_server.utils import json_compatible
 from dallinger.heroku.tools import HerokuApp
 from dallinger.information import Gene, Meme, State
 from dallinger.models import Info, Network, Node, Participant, Transformation
@@ -58,6 +77,23 @@ from dallinger.utils import classproperty, deferred_route_decorator, struct_to_h
 
 logger = logging.getLogger(__name__)
 
+# Seconds for which dashboard SearchPanes options are cached
+SEARCH_PANES_TTL = 30
+
+_statistics_cache = {}
+
+
+def _count_cache_key(table, polymorphic_identity, search_value="", column_filters=None):
+    """Redis key for the cached row count of a dashboard database view."""
+    key = "table_data:count:{}:{}:{}".format(
+        table, polymorphic_identity, table_version(table)
+    )
+    filters = {k: v for k, v in (column_filters or {}).items() if v}
+    if search_value or filters:
+        state = json.dumps([search_value, filters], sort_keys=True)
+        key += ":" + hashlib.sha1(state.encode()).hexdigest()
+    return key
+
 
 def exp_class_working_dir(meth):
     @wraps(meth)
@@ -146,6 +182,13 @@ class Experiment:
     #: Default is 0 (no waiting room).
     quorum = 0
 
+    #: float, number of seconds for which each server process caches the
+    #: results of :func:`~dallinger.experiment.Experiment.monitoring_statistics`
+    #: and :func:`~dallinger.experiment.Experiment.log_summary`, which are
+    #: polled by the dashboard and the waiting room.
+    #: Default is 0 (no caching).
+    statistics_cache_ttl = 0
+
     #: int, the number of participants
     #: requested when the experiment first starts. Default is 1.
     initial_recruitment_size = 1
@@ -326,6 +369,17 @@ class Experiment:
         """
         return {}
 
+    @classmethod
+    def pii_scrub_policy(cls):
+        """Override this classmethod to scrub additional PII on export.
+
+        Return a mapping of table names to ``{column: SQL expression}``, for
+        example ``{"info": {"details": "details - 'email'"}}``. The
+        expressions are evaluated by the database during the export COPY and
+        extend the defaults in :data:`dallinger.data.pii_scrub_policy`.
+        """
+        return {}
+
     @property
     def protected_routes(self):
         """Disable one or more standard Dallinger Flask routes by name.
@@ -990,12 +1044,31 @@ class Experiment:
 
     def log_summary(self):
         """Log a summary of all the participants' status codes."""
-        participants = db.session.query(Participant.status).all()
-        counts = Counter([p.status for p in participants])
-        sorted_counts = sorted(counts.items(), key=itemgetter(0))
+        sorted_counts = self._cached_statistics(
+            "log_summary",
+            lambda: sorted(
+                tuple(row)
+                for row in db.session.query(Participant.status, func.count()).group_by(
+                    Participant.status
+                )
+            ),
+        )
         self.log("Status summary: {}".format(str(sorted_counts)))
         return sorted_counts
 
+    def _cached_statistics(self, key, compute):
+        """Return ``compute()``, cached for ``statistics_cache_ttl`` seconds."""
+        if not self.statistics_cache_ttl:
+            return compute()
+        key = (type(self).__name__, key)
+        now = time.monotonic()
+        cached = _statistics_cache.get(key)
+        if cached is not None and now - cached[0] < self.statistics_cache_ttl:
+            return cached[1]
+        value = compute()
+        _statistics_cache[key] = (now, value)
+        return value
+
     def save(self, *objects):
         """Add all the objects to the session and commit them.
 
@@ -1252,16 +1325,23 @@ class Experiment:
         replay logic. The "events" returned by this method will be passed
         to :meth:`~Experiment.replay_event`. The default implementation
         simply returns all :class:`~dallinger.models.Info` objects in the
-        order they were created.
+        order they were created. Queries should run on ``session``: the
+        replay backend streams them through a session of their own.
         """
         if session is None:
             session = db.session
-        return session.query(Info).order_by(Info.creation_time)
+        events = session.query(Info).order_by(Info.creation_time)
+        if target is not None:
+            events = events.filter(Info.creation_time <= target)
+        return events
 
     def replay_event(self, event):
         """Stub method to replay an event returned by
         :meth:`~Experiment.events_for_replay`.
         Experiments must override this method to provide replay support.
+        When scrubbing through a replay restored by
+        :meth:`~Experiment.restore_state_from_replay`, this must flush rather
+        than commit, so that the replay checkpoints stay valid.
         """
         pass
 
@@ -1281,6 +1361,20 @@ class Experiment:
         """Returns `True` if an experiment replay has started."""
         return True
 
+    def replay_checkpoint(self):
+        """Return any in-memory replay state to be saved with a replay
+        checkpoint. The value is passed back to
+        :meth:`~Experiment.replay_restore` when scrubbing backwards to the
+        checkpoint. Database state is checkpointed automatically.
+        """
+        return None
+
+    def replay_restore(self, state):
+        """Restore in-memory replay state saved by
+        :meth:`~Experiment.replay_checkpoint`.
+        """
+        pass
+
     def is_complete(self):
         """Method for custom determination of experiment completion.
         Experiments should override this to provide custom experiment
@@ -1309,54 +1403,57 @@ class Experiment:
         :returns: An ``OrderedDict()`` mapping panel titles to data structures
                   describing the experiment state.
         """  # noqa
-        participants = db.session.query(Participant)
-        nodes = db.session.query(Node)
-        infos = db.session.query(Info)
+        return self._cached_statistics(
+            ("monitoring_statistics", bool(kw.get("transformations"))),
+            lambda: self._monitoring_statistics(**kw),
+        )
+
+    def _monitoring_statistics(self, **kw):
+        def failed_counts(cls):
+            count, failed = (
+                db.session.query(
+                    func.count(),
+                    func.count().filter(cls.failed == True),  # noqa
+                )
+                .select_from(cls)
+                .one()
+            )
+            return OrderedDict((("count", count), ("failed", failed)))
 
-        unique_statuses = set(participant.status for participant in participants.all())
         stats = OrderedDict()
         stats["Participants"] = dict(
-            (status, participants.filter_by(status=status).count())
-            for status in sorted(unique_statuses)
+            sorted(
+                db.session.query(Participant.status, func.count())
+                .group_by(Participant.status)
+                .all()
+            )
         )
 
         # Count up our networks by role
-        network_roles = db.session.query(Network.role, func.count(Network.role))
-        network_counts = network_roles.group_by(Network.role).all()
-        failed_networks = network_roles.filter(Network.failed == True)  # noqa
-        failed_counts = dict(failed_networks.group_by(Network.role).all())
+        network_counts = (
+            db.session.query(
+                Network.role,
+                func.count(Network.role),
+                func.count(Network.role).filter(Network.failed == True),  # noqa
+            )
+            .group_by(Network.role)
+            .all()
+        )
         network_stats = {}
-        for role, count in network_counts:
+        for role, count, failed in network_counts:
             network_stats[role] = OrderedDict(
                 (
                     ("count", count),
-                    ("failed", failed_counts.get(role, 0)),
+                    ("failed", failed),
                 )
             )
         stats["Networks"] = network_stats
 
-        stats["Nodes"] = OrderedDict(
-            (
-                ("count", nodes.count()),
-                ("failed", nodes.filter_by(failed=True).count()),
-            )
-        )
-
-        stats["Infos"] = OrderedDict(
-            (
-                ("count", infos.count()),
-                ("failed", infos.filter_by(failed=True).count()),
-            )
-        )
+        stats["Nodes"] = failed_counts(Node)
+        stats["Infos"] = failed_counts(Info)
 
         if kw.get("transformations"):
-            transformations = Transformation.query
-            stats["transformations"] = OrderedDict(
-                (
-                    ("count", transformations.count()),
-                    ("failed", transformations.filter_by(failed=True).count()),
-                )
-            )
+            stats["transformations"] = failed_counts(Transformation)
 
         return stats
 
@@ -1366,14 +1463,18 @@ class Experiment:
         network_ids=None,
         collapsed=False,
         transformations=False,
+        since=None,
     ):
-        networks = self.summarize_table("network", network_roles, network_ids)
+        networks = self.summarize_table(
+            "network", network_roles, network_ids, since=since
+        )
 
         nodes = self.summarize_table(
             "node",
             network_roles,
             network_ids,
             cls_filter=(lambda cls: issubclass(cls, Source)) if collapsed else None,
+            since=since,
         )
 
         if collapsed:
@@ -1382,13 +1483,17 @@ class Experiment:
             participants = []
             trans = []
         else:
-            vectors = self.summarize_table("vector", network_roles, network_ids)
-            infos = self.summarize_table("info", network_roles, network_ids)
-            participants = self.summarize_table("participant")
+            vectors = self.summarize_table(
+                "vector", network_roles, network_ids, since=since
+            )
+            infos = self.summarize_table(
+                "info", network_roles, network_ids, since=since
+            )
+            participants = self.summarize_table("participant", since=since)
 
             if transformations:
                 trans = self.summarize_table(
-                    "transformation", network_roles, network_ids
+                    "transformation", network_roles, network_ids, since=since
                 )
             else:
                 trans = []
@@ -1402,12 +1507,100 @@ class Experiment:
             "trans": trans,
         }
 
+    def network_structure_delta(
+        self,
+        since=None,
+        page=0,
+        page_size=100,
+        network_roles=None,
+        network_ids=None,
+        collapsed=False,
+        transformations=False,
+    ):
+        """
+        Returns one page of the network structure used by the Network
+        Monitoring Dashboard, containing only objects created or failed after
+        ``since``.
+
+        Objects carry no last-modified time, so other changes, such as a
+        participant's ``status`` or an object's properties, are missed by a
+        delta. Clients should reload the whole structure periodically.
+
+        Pages are made of ``page_size`` networks, ordered by id, so a client
+        can load the structure one batch of networks at a time. Networks are
+        also included when any of their nodes, vectors, infos or
+        transformations changed, as their aggregate counts will have changed.
+        Participants are not tied to networks, so they are only returned with
+        the first page.
+
+        :param since: Optional ``datetime``; all objects are returned if omitted
+        :param page: Zero-based page number
+        :param page_size: Number of networks per page
+        :param network_roles: Optionally restrict output to networks with these roles
+        :param network_ids: Optionally restrict output to networks with these IDs
+        :param collapsed: Only return networks and sources
+        :param transformations: Include transformations
+
+        Returns a dictionary with the same keys as :meth:`network_structure`,
+        plus ``page``, ``has_more``, ``network_ids`` (the ids of the networks
+        in this page) and ``next_since``, the value to pass as ``since`` when
+        polling for the next delta.
+        """
+        # Objects are timestamped before they are committed, so the next
+        # delta overlaps this one slightly; clients merge objects by id.
+        next_since = datetime.datetime.now() - datetime.timedelta(seconds=5)
+
+        query = db.session.query(Network.id)
+        if network_roles is not None:
+            query = query.filter(Network.role.in_(network_roles))
+        if network_ids is not None:
+            query = query.filter(Network.id.in_(network_ids))
+        page_ids = [
+            network_id
+            for (network_id,) in query.order_by(Network.id)
+            .offset(page * page_size)
+            .limit(page_size + 1)
+        ]
+        has_more = len(page_ids) > page_size
+        page_ids = page_ids[:page_size]
+
+        structure = self.network_structure(
+            network_ids=page_ids,
+            collapsed=collapsed,
+            transformations=transformations,
+            since=since,
+        )
+        if since is not None:
+            included = {network["id"] for network in structure["networks"]}
+            touched = {
+                obj["network_id"]
+                for key in ("nodes", "vectors", "infos", "trans")
+                for obj in structure[key]
+            } - included
+            if touched:
+                structure["networks"] += self.summarize_table(
+                    "network", network_ids=sorted(touched)
+                )
+        if page > 0:
+            structure["participants"] = []
+
+        structure.update(
+            {
+                "page": page,
+                "has_more": has_more,
+                "network_ids": page_ids,
+                "next_since": next_since,
+            }
+        )
+        return structure
+
     def summarize_table(
         self,
         table: Union[Table, str],
         network_roles: Optional[List] = None,
         network_ids: Optional[List] = None,
         cls_filter: Optional[callable] = None,
+        since: Optional[datetime.datetime] = None,
     ):
         """
         Summarizes a given database table.
@@ -1416,18 +1609,23 @@ class Experiment:
         :param network_roles: Optionally restrict output to objects from networks with these roles
         :param network_ids: Optionally restrict output to objects from networks with these IDs
         :param cls_filter: Optional lambda function that returns ``False`` for classes that should be excluded
+        :param since: Optionally restrict output to objects created, failed or ended after this time. Other changes, like updated properties or statuses, are not tracked
 
         Returns a list of JSON-style dictionaries produced by calling ``.__json__()`` on every object
         retrieved from the table.
         """
-        objects = self.pull_table(
-            table=table,
-            polymorphic_identity=None,
-            network_roles=network_roles,
-            network_ids=network_ids,
-            cls_filter=cls_filter,
-        )
-        return [obj.__json__() for obj in objects]
+        return [
+            data
+            for chunk in self.stream_table(
+                table=table,
+                network_roles=network_roles,
+                network_ids=network_ids,
+                cls_filter=cls_filter,
+                since=since,
+                serialize=True,
+            )
+            for data in chunk
+        ]
 
     def pull_table(
         self,
@@ -1436,52 +1634,88 @@ class Experiment:
         network_roles: Optional[List] = None,
         network_ids: Optional[List] = None,
         cls_filter: Optional[callable] = None,
+        since: Optional[datetime.datetime] = None,
     ):
         """
         Downloads every object in the specified table.
-        For efficiency, the SQL queries are batched by the values of the polymorphic identity column ``type``
-        if it is present.
+        See :meth:`stream_table` to process large tables without loading every
+        object into memory at once.
 
         :param table: Table to be summarized
         :param polymorphic_identity: Optionally restrict output to a given polymorphic identity (i.e. ``type`` value)
         :param network_roles: Optionally restrict output to objects from networks with these roles
         :param network_ids: Optionally restrict output to objects from networks with these IDs
         :param cls_filter: Optional lambda function that returns ``False`` for classes that should be excluded
+        :param since: Optionally restrict output to objects created, failed or ended after this time. Other changes, like updated properties or statuses, are not tracked
 
         Returns a list of database-mapped objects.
         """
+        return [
+            obj
+            for chunk in self.stream_table(
+                table=table,
+                polymorphic_identity=polymorphic_identity,
+                network_roles=network_roles,
+                network_ids=network_ids,
+                cls_filter=cls_filter,
+                since=since,
+            )
+            for obj in chunk
+        ]
+
+    def stream_table(
+        self,
+        table: Union[Table, str],
+        polymorphic_identity: Optional[str] = None,
+        network_roles: Optional[List] = None,
+        network_ids: Optional[List] = None,
+        cls_filter: Optional[callable] = None,
+        since: Optional[datetime.datetime] = None,
+        serialize: bool = False,
+        chunk_size: int = 1000,
+    ):
+        """
+        Streams every object in the specified table, in chunks.
+        Every polymorphic identity (i.e. ``type`` value) is fetched by a
+        single query ordered by primary key, which is read through a
+        server-side cursor ``chunk_size`` rows at a time, so only one chunk of
+        objects needs to be held in memory.
+
+        :param table: Table to be streamed
+        :param polymorphic_identity: Optionally restrict output to a given polymorphic identity (i.e. ``type`` value)
+        :param network_roles: Optionally restrict output to objects from networks with these roles
+        :param network_ids: Optionally restrict output to objects from networks with these IDs
+        :param cls_filter: Optional lambda function that returns ``False`` for classes that should be excluded
+        :param since: Optionally restrict output to objects created, failed or ended after this time. Other changes, like updated properties or statuses, are not tracked
+        :param serialize: Yield the dictionaries produced by ``.__json__()`` instead of the objects
+        :param chunk_size: Maximum number of objects in each chunk
+
+        Yields lists of database-mapped objects, or of JSON-style dictionaries
+        if ``serialize`` is set.
+        """
         if isinstance(table, str):
             table = Base.metadata.tables[table]
 
-        if polymorphic_identity is None and "type" in table.columns:
-            observed_types = [
-                r.type for r in db.session.query(table.columns.type).distinct().all()
+        if "type" in table.columns:
+            mapping = get_polymorphic_mapping(table)
+            if polymorphic_identity is not None:
+                mapping = {polymorphic_identity: mapping[polymorphic_identity]}
+            identities = [
+                identity
+                for identity, cls in mapping.items()
+                if identity is not None and (cls_filter is None or cls_filter(cls))
             ]
-            obj_by_type = [
-                self.pull_table(
-                    table,
-                    polymorphic_identity=_type,
-                    network_roles=network_roles,
-                    network_ids=network_ids,
-                    cls_filter=cls_filter,
-                )
-                for _type in observed_types
-            ]
-            return [obj for sublist in obj_by_type for obj in sublist]
-
-        if polymorphic_identity is None:
-            cls = get_mapped_class(table)
+            if not identities:
+                return
+            cls = mapping[identities[0]].__mapper__.base_mapper.class_
+            query = db.session.query(with_polymorphic(cls, "*")).filter(
+                table.columns.type.in_(identities)
+            )
         else:
-            assert "type" in table.columns
-            cls = get_polymorphic_mapping(table)[polymorphic_identity]
-
-        if cls_filter is not None and not cls_filter(cls):
-            return
-
-        query = cls.query
-
-        if polymorphic_identity is not None:
-            query = query.filter(cls.type == polymorphic_identity)
+            cls = get_mapped_class(table)
+            if cls_filter is not None and not cls_filter(cls):
+                return
+            query = cls.query
 
         if network_roles is not None:
             query = query.filter(Network.role.in_(network_roles))
@@ -1493,9 +1727,29 @@ class Experiment:
             if "network_id" in table.columns:
                 query = query.join(Network, cls.network_id == Network.id)
 
-        primary_keys = [c.name for c in table.primary_key.columns]
+        if since is not None:
+            changed = [
+                table.columns[name] > since
+                for name in ("creation_time", "time_of_death", "end_time")
+                if name in table.columns
+            ]
+            query = query.filter(or_(*changed))
+
+        query = (
+            query.order_by(*table.primary_key.columns)
+            .options(undefer("*"))
+            .execution_options(stream_results=True)
+            .yield_per(chunk_size)
+        )
 
-        return query.order_by(*primary_keys).options(undefer("*")).all()
+        chunk = []
+        for obj in query:
+            chunk.append(obj.__json__() if serialize else obj)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
 
     def node_visualization_options(self):
         """Provides custom vis.js configuration options for the
@@ -1566,6 +1820,7 @@ class Experiment:
         order_column: Optional[str] = None,
         order_dir: str = "asc",
         column_filters: Optional[dict[str, list[str]]] = None,
+        after: Optional[int] = None,
     ):
         """
         Generates server-side paginated DataTablesJS data for the experiment.
@@ -1576,6 +1831,10 @@ class Experiment:
         and may be customized by overriding this method or by having models
         return additional serializable data in their ``__json__``.
 
+        Counts of large result sets are planner estimates until the exact
+        count, computed by a worker, is available (see
+        :func:`dallinger.db.cached_count`).
+
         :param start: Starting record index (0-based), provided by DataTables.
         :param length: Number of records to return, provided by DataTables.
         :param table: Name of the table to query (default: "participant").
@@ -1584,11 +1843,15 @@ class Experiment:
         :param search_value: Global search string to filter results (default: "").
         :param order_column: Column name to sort by (default: None = primary key).
         :param order_dir: Sort direction, "asc" or "desc" (default: "asc").
+        :param after: Optional primary key of the last row of the previous
+            page. When given, the page is fetched with keyset pagination,
+            starting right after that row, instead of skipping ``start`` rows.
 
         :returns: A ``dict`` with keys:
             - ``data``: List of row dicts for the current page.
             - ``total_count``: Total number of rows before filtering.
             - ``filtered_count``: Number of rows after filtering.
+            - ``searchable_columns``: Columns covered by the global search.
         """
         table_obj = Base.metadata.tables[table]
         if polymorphic_identity == "None":
@@ -1601,17 +1864,18 @@ class Experiment:
             cls = get_polymorphic_mapping(table_obj)[polymorphic_identity]
             base = db.session.query(cls).filter(cls.type == polymorphic_identity)
 
-        total_count = base.order_by(None).count()
+        total_count = cached_count(
+            base,
+            _count_cache_key(table, polymorphic_identity),
+            estimate=(
+                estimated_table_count(table) if polymorphic_identity is None else None
+            ),
+        )
 
         # Global search
         q = base
         if search_value:
-            conds = []
-            for col in table_obj.columns:
-                if hasattr(cls, col.name):
-                    conds.append(
-                        cast(getattr(cls, col.name), String).ilike(f"%{search_value}%")
-                    )
+            conds = self.table_search_conditions(cls, table, search_value)
             if conds:
                 q = q.filter(or_(*conds))
 
@@ -1625,21 +1889,53 @@ class Experiment:
                 continue
             q = q.filter(cast(attr, String).in_([to_db(v) for v in selected]))
 
-        filtered_count = q.order_by(None).count()
-
-        # Ordering
+        if search_value or any(column_filters.values()):
+            filtered_count = cached_count(
+                q,
+                _count_cache_key(
+                    table, polymorphic_identity, search_value, column_filters
+                ),
+            )
+        else:
+            filtered_count = total_count
+
+        # Ordering, with the primary key as a tie-breaker so that pages are
+        # stable and can be fetched with keyset pagination
+        descending = order_dir.lower() == "desc"
+        direction = desc if descending else asc
+        pk_attrs = [
+            getattr(cls, pk.name)
+            for pk in table_obj.primary_key.columns
+            if isinstance(getattr(cls, pk.name, None), InstrumentedAttribute)
+        ]
         attr = getattr(cls, order_column, None) if order_column else None
-        if isinstance(attr, InstrumentedAttribute):
-            q = q.order_by(desc(attr) if order_dir.lower() == "desc" else asc(attr))
+        if isinstance(attr, InstrumentedAttribute) and order_column in table_obj.c:
+            ordering = [attr] + [pk for pk in pk_attrs if pk.key != attr.key]
+            # Row comparisons do not work with NULLs
+            seekable = not table_obj.c[order_column].nullable
+        elif isinstance(attr, InstrumentedAttribute):
+            ordering = [attr]
+            seekable = False
         else:
             # Fallback: order by primary key(s)
-            for pk in table_obj.primary_key.columns:
-                pk_attr = getattr(cls, pk.name, None)
-                if isinstance(pk_attr, InstrumentedAttribute):
-                    q = q.order_by(pk_attr)
+            ordering = pk_attrs
+            seekable = True
+        q = q.order_by(*[direction(col) for col in ordering])
 
         # Page
-        items = q.offset(start).limit(length).all()
+        boundary = None
+        if after is not None and seekable and len(pk_attrs) == 1:
+            boundary = (
+                db.session.query(*ordering).filter(pk_attrs[0] == after).one_or_none()
+            )
+        if boundary is not None:
+            key = tuple_(*ordering)
+            q = q.filter(
+                key < tuple_(*boundary) if descending else key > tuple_(*boundary)
+            )
+            items = q.limit(length).all()
+        else:
+            items = q.offset(start).limit(length).all()
 
         # Rows (raw JSON-native values; presentation handled client-side)
         rows, all_keys = [], set()
@@ -1648,20 +1944,10 @@ class Experiment:
             if table_obj.name == "participant" and hasattr(obj, "worker_id"):
                 data["worker_id"] = obj.worker_id
 
-            coerced = {}
-            for key, value in data.items():
-                if value is None:
-                    coerced[key] = None
-                elif isinstance(value, (str, bytes)):
-                    if isinstance(value, bytes):
-                        coerced[key] = value.decode("utf-8", errors="replace")
-                    else:
-                        coerced[key] = value
-                else:
-                    # Ensure the value can be JSON-encoded for the dashboard API.
-                    coerced[key] = json.loads(json.dumps(value, default=date_handler))
-            rows.append(coerced)
-            all_keys.update(coerced.keys())
+            # Ensure the values can be JSON-encoded for the dashboard API.
+            row = json_compatible(data)
+            rows.append(row)
+            all_keys.update(row.keys())
 
         for row in rows:
             for key in all_keys:
@@ -1671,8 +1957,58 @@ class Experiment:
             "data": rows,
             "total_count": total_count,
             "filtered_count": filtered_count,
+            "searchable_columns": self.searchable_columns(table),
         }
 
+    def searchable_columns(self, table: str):
+        """
+        Lists the columns covered by the global search of the dashboard
+        database view.
+
+        Every column is searched by casting it to a string, unless the
+        trigram search indexes have been created (see the
+        ``dashboard_search_index`` config parameter). Then only the indexed
+        text columns are searched, along with exact matches on an integer
+        primary key, so that searches can be answered from the indexes.
+
+        :param table: Name of the table.
+        :returns: A list of column names.
+        """
+        table_obj = Base.metadata.tables[table]
+        indexed = indexed_search_columns(table)
+        if not indexed:
+            return [col.name for col in table_obj.columns]
+        return list(indexed) + [
+            col.name
+            for col in table_obj.primary_key.columns
+            if isinstance(col.type, Integer)
+        ]
+
+    def table_search_conditions(self, cls, table: str, search_value: str):
+        """
+        Builds the SQL conditions for a global search of the dashboard
+        database view, one per column listed by :meth:`searchable_columns`.
+
+        :param cls: The mapped class being queried.
+        :param table: Name of the table.
+        :param search_value: Global search string.
+        :returns: A list of SQLAlchemy conditions, to be combined with ``or_``.
+        """
+        indexed = indexed_search_columns(table)
+        is_id = search_value.isdigit() and int(search_value) < 2**31
+        conditions = []
+        for name in self.searchable_columns(table):
+            attr = getattr(cls, name, None)
+            if attr is None:
+                continue
+            if not indexed:
+                conditions.append(cast(attr, String).ilike(f"%{search_value}%"))
+            elif name in indexed:
+                conditions.append(attr.ilike(f"%{search_value}%"))
+            elif is_id:
+                conditions.append(attr == int(search_value))
+        return conditions
+
     def table_search_panes(
         self,
         table: str,
@@ -1682,6 +2018,122 @@ class Experiment:
         column_filters: dict[str, list[str]],
         threshold: float,
         max_distinct: int = 200,
+    ):
+        """
+        Returns SearchPanes options for the provided columns, computed by
+        :meth:`compute_search_panes`.
+
+        Options are cached in Redis per table, polymorphic identity, filter
+        state and :func:`~dallinger.db.table_version` for
+        ``SEARCH_PANES_TTL`` seconds. On large tables (see
+        ``dallinger.db.EXACT_COUNT_THRESHOLD``) only the panes of columns the
+        query planner expects to have at most ``max_distinct`` values are
+        computed right away. The other panes missing from the cache are
+        computed by a worker, one column at a time; they are listed under
+        ``pending`` until they are ready, and the client is expected to ask
+        again.
+
+        :returns: ``{"options": { <col_key>: [ {label,value,total,count}, ... ], ... }, "pending": [<col_key>, ...]}``
+        """
+        if polymorphic_identity == "None":
+            polymorphic_identity = None
+        kwargs = {
+            "table": table,
+            "polymorphic_identity": polymorphic_identity,
+            "search_value": search_value,
+            "column_filters": column_filters or {},
+            "threshold": threshold,
+            "max_distinct": max_distinct,
+        }
+        state = json.dumps(
+            [search_value, kwargs["column_filters"], threshold, max_distinct],
+            sort_keys=True,
+        )
+        cache_key = "search_panes:{}:{}:{}:{}".format(
+            table,
+            polymorphic_identity,
+            table_version(table),
+            hashlib.sha1(state.encode()).hexdigest(),
+        )
+        options = {
+            key.decode(): json.loads(value)
+            for key, value in redis_conn.hgetall(cache_key).items()
+        }
+
+        missing = [key for key in pane_columns if key not in options]
+        pending = []
+        if missing and (estimated_table_count(table) or 0) >= db.EXACT_COUNT_THRESHOLD:
+            # Only the panes of high-cardinality columns are left to a worker
+            pending = [
+                key
+                for key in missing
+                if not self._has_few_distinct_values(table, key, max_distinct)
+            ]
+            missing = [key for key in missing if key not in pending]
+        if missing:
+            computed = self.compute_search_panes(pane_columns=missing, **kwargs)
+            options.update(computed)
+            self._cache_search_panes(cache_key, computed)
+        if pending and redis_conn.set(
+            cache_key + ":pending", 1, nx=True, ex=db.COUNT_JOB_TIMEOUT
+        ):
+            from dallinger.experiment_server.worker_events import (
+                compute_search_panes,
+            )
+
+            db.get_queue("low").enqueue(
+                compute_search_panes,
+                cache_key,
+                pending,
+                kwargs,
+                job_timeout=db.COUNT_JOB_TIMEOUT,
+            )
+
+        return {
+            "options": {key: options.get(key, []) for key in pane_columns},
+            "pending": pending,
+        }
+
+    def _has_few_distinct_values(self, table, column, max_distinct):
+        """Whether the query planner expects ``column`` to have at most
+        ``max_distinct`` distinct values.
+        """
+        if column not in Base.metadata.tables[table].columns:
+            return False
+        estimate = estimated_distinct_count(table, column)
+        return estimate is not None and estimate <= max_distinct
+
+    def _cache_search_panes(self, cache_key, options):
+        pipeline = redis_conn.pipeline()
+        pipeline.hset(
+            cache_key, mapping={key: json.dumps(opts) for key, opts in options.items()}
+        )
+        pipeline.expire(cache_key, SEARCH_PANES_TTL)
+        pipeline.execute()
+
+    def cache_search_panes_by_column(self, cache_key, pane_columns, kwargs):
+        """Compute and cache SearchPanes options one column at a time, so
+        that the database view can show each pane as soon as it is ready.
+        Called by a worker for the panes :meth:`table_search_panes` leaves
+        pending.
+        """
+        try:
+            for key in pane_columns:
+                self._cache_search_panes(
+                    cache_key, self.compute_search_panes(pane_columns=[key], **kwargs)
+                )
+        finally:
+            redis_conn.delete(cache_key + ":pending")
+
+    def compute_search_panes(
+        self,
+        table: str,
+        polymorphic_identity: Optional[str],
+        search_value: str,
+        pane_columns: list[str],
+        column_filters: dict[str, list[str]],
+        threshold: float,
+        max_distinct: int = 200,
     ):
         """
         Compute SearchPanes options for the provided columns using server-side logic.
@@ -1700,7 +2152,7 @@ class Experiment:
         :param column_filters: Current pane selections: { key: [values...] }.
         :param threshold: Pane display threshold (same as DataTables config).
         :param max_distinct: Safety cap on distinct values per pane.
-        :returns: ``{"options": { <col_key>: [ {label,value,total,count}, ... ], ... }}``
+        :returns: ``{ <col_key>: [ {label,value,total,count}, ... ], ... }``
         """
         table_obj = Base.metadata.tables[table]
         if polymorphic_identity == "None":
@@ -1717,15 +2169,13 @@ class Experiment:
         def apply_global_search(q):
             if not search_value:
                 return q
-            conditions = [
-                cast(getattr(cls, c.name), String).ilike(f"%{search_value}%")
-                for c in table_obj.columns
-                if hasattr(cls, c.name)
-            ]
+            conditions = self.table_search_conditions(cls, table, search_value)
             return q.filter(or_(*conditions)) if conditions else q
 
         q_global = apply_global_search(base).order_by(None)
-        global_count = q_global.count()
+        global_count = cached_count(
+            q_global, _count_cache_key(table, polymorphic_identity, search_value)
+        )
 
         # Build q_all: global search + ALL panes filters
         q_all = q_global
@@ -1805,7 +2255,7 @@ class Experiment:
                 )
             panes_options[key] = col_opts
 
-        return {"options": panes_options}
+        return panes_options
 
     def table_columns(
         self,
@@ -1929,8 +2379,29 @@ class Experiment:
 
     @contextmanager
     def restore_state_from_replay(
-        self, app_id, session=None, zip_path=None, **configuration_options
+        self,
+        app_id,
+        session=None,
+        zip_path=None,
+        checkpoint_interval=60,
+        max_checkpoints=100,
+        **configuration_options,
     ):
+        """Load the dataset for ``app_id`` and yield a :class:`Scrubber` which
+        replays its events into the current database.
+
+        While scrubbing forwards, the replayed state is checkpointed (as a
+        database savepoint plus :meth:`~Experiment.replay_checkpoint`) every
+        ``checkpoint_interval`` seconds of experiment time, so that scrubbing
+        backwards only replays events since the nearest earlier checkpoint.
+        At most ``max_checkpoints`` savepoints are nested, so the interval is
+        widened when needed to spread them over the whole experiment. The
+        savepoints are taken on ``session`` (``db.session`` by default).
+
+        ``replay_event`` implementations must flush rather than commit:
+        committing releases every savepoint, after which scrubbing backwards
+        would roll back to the wrong state.
+        """
         # We need to fake dallinger_experiment to point at the current experiment
         module = sys.modules[type(self).__module__]
         if sys.modules.get("dallinger_experiment", module) != module:
@@ -1943,67 +2414,102 @@ class Experiment:
         self.app_id = self.original_app_id = app_id
         self.exp_config = config
 
-        # The replay index is initialised to 1970 as that is guaranteed
-        # to be before any experiment Info objects
-        self._replay_time_index = datetime.datetime(1970, 1, 1, 1, 1, 1)
+        self._reset_replay(session=session, max_checkpoints=max_checkpoints)
+
+        # Find the real data for this experiment
+        if zip_path is None:
+            zip_path = find_experiment_export(app_id)
+        if zip_path is None:
+            msg = 'Dataset export for app id "{}" could not be found.'
+            raise IOError(msg.format(app_id))
 
         # Create a second database session so we can load the full history
         # of the experiment to be replayed and selectively import events
-        # into the main database
+        # into the main database. Ingested datasets are cached as template
+        # databases keyed by the zip's content hash and the schema, so
+        # reopening a dataset only needs a copy of the template.
+        print("Loading dataset from {}...".format(os.path.basename(zip_path)))
+        template = cached_import_database(zip_path)
         specific_db_url = db_url + "-import-" + app_id
+        clone_database(template, specific_db_url.rsplit("/", 1)[1])
         import_engine = create_engine(specific_db_url)
-        try:
-            # Clear the temporary storage and import it
-            init_db(drop_all=True, bind=import_engine)
-        except Exception:
-            create_db_engine = create_engine(db_url)
-            conn = create_db_engine.connect()
-            conn.execute("COMMIT;")
-            conn.execute(
-                'CREATE DATABASE "{}"'.format(specific_db_url.rsplit("/", 1)[1])
-            )
-            conn.close()
-            import_engine = create_engine(specific_db_url)
-            init_db(drop_all=True, bind=import_engine)
 
         self.import_session = scoped_session(
             sessionmaker(autocommit=False, autoflush=True, bind=import_engine)
         )
 
-        # Find the real data for this experiment
-        if zip_path is None:
-            zip_path = find_experiment_export(app_id)
-        if zip_path is None:
-            msg = 'Dataset export for app id "{}" could not be found.'
-            raise IOError(msg.format(app_id))
-
-        print("Ingesting dataset from {}...".format(os.path.basename(zip_path)))
-        ingest_zip(zip_path, engine=import_engine)
         self._replay_range = tuple(
             self.import_session.query(
                 func.min(Info.creation_time), func.max(Info.creation_time)
             )
         )[0]
+        interval = datetime.timedelta(seconds=checkpoint_interval)
+        start, end = self._replay_range
+        if start is not None:
+            # The initial checkpoint and the one after the first event take
+            # two of the savepoints
+            interval = max(interval, (end - start) / (self._replay_max_checkpoints - 2))
         # We apply the configuration options we were given and yield
         # the scrubber function into the context manager, so within the
         # with experiment.restore_state_from_replay(...): block the configuration
         # options are correctly set
         with config.override(configuration_options, strict=True):
             self.replay_start()
-            yield Scrubber(self, session=self.import_session)
+            self.take_replay_checkpoint()
+            yield Scrubber(
+                self, session=self.import_session, checkpoint_interval=interval
+            )
             self.replay_finish()
 
         # Clear up global state
         self.import_session.rollback()
         self.import_session.close()
-        db.session.rollback()
-        db.session.close()
+        import_engine.dispose()
+        self._replay_session.rollback()
+        self._replay_session.close()
         config._reset(register_defaults=True)
         del sys.modules["dallinger_experiment"]
+        reset_load_cache()
+
+    def _reset_replay(self, session=None, max_checkpoints=100):
+        """Start a replay into ``session`` from the beginning, without
+        checkpoints.
+        """
+        # The replay index is initialised to 1970 as that is guaranteed
+        # to be before any experiment Info objects
+        self._replay_time_index = datetime.datetime(1970, 1, 1, 1, 1, 1)
+        self._replay_session = db.session if session is None else session
+        self._replay_checkpoints = []
+        self._replay_max_checkpoints = max(max_checkpoints, 3)
+
+    def take_replay_checkpoint(self):
+        """Checkpoint the replayed state at the current replay time index."""
+        if len(self._replay_checkpoints) >= self._replay_max_checkpoints:
+            # Savepoints nest, and releasing one releases those taken after
+            # it, so only the latest can go without losing the others
+            self._replay_checkpoints.pop().savepoint.commit()
+        self._replay_checkpoints.append(
+            ReplayCheckpoint(
+                time=self._replay_time_index,
+                savepoint=self._replay_session.begin_nested(),
+                state=self.replay_checkpoint(),
+            )
+        )
 
-    def revert_to_time(self, session, target):
-        # We do not support going back in time
-        raise NotImplementedError
+    def revert_to_time(self, target):
+        """Revert the replayed state to the latest checkpoint taken at or
+        before ``target``. Events between the checkpoint and ``target`` are
+        then replayed by the :class:`Scrubber`.
+        """
+        checkpoints = self._replay_checkpoints
+        while len(checkpoints) > 1 and checkpoints[-1].time > target:
+            checkpoints.pop()
+        checkpoint = checkpoints.pop()
+        # Rolling back a savepoint also discards the ones nested inside it
+        checkpoint.savepoint.rollback()
+        self._replay_time_index = checkpoint.time
+        self.replay_restore(checkpoint.state)
+        self.take_replay_checkpoint()
 
     def _ipython_display_(self):
         """Display Jupyter Notebook widget"""
@@ -2043,20 +2549,36 @@ class Experiment:
         sys.modules["dallinger_experiment"]._jupyter_cleanup = _jupyter_cleanup
 
 
+@dataclass
+class ReplayCheckpoint:
+    """The replayed state at a point in an experiment replay."""
+
+    time: datetime.datetime
+    savepoint: Any
+    state: Any
+
+
 class Scrubber:
-    def __init__(self, experiment, session):
+    def __init__(self, experiment, session, checkpoint_interval=None):
+        if not hasattr(experiment, "_replay_checkpoints"):
+            # Not created by restore_state_from_replay
+            experiment._reset_replay()
+            experiment.original_app_id = experiment.app_id
         self.experiment = experiment
         self.session = session
+        self.checkpoint_interval = checkpoint_interval
         self.realtime = False
 
     def __call__(self, time):
         """Scrub to a point in the experiment replay, given by time
         which is a datetime object."""
+        if not self.experiment._replay_checkpoints:
+            # Checkpoint the starting state, so that it can be reverted to
+            self.experiment.take_replay_checkpoint()
         if self.experiment._replay_time_index > time:
-            self.experiment.revert_to_time(session=self.session, target=time)
-        events = self.experiment.events_for_replay(
-            session=self.session, target=time
-        ).all()
+            self.experiment.revert_to_time(target=time)
+        events = self.experiment.events_for_replay(session=self.session, target=time)
+        last_checkpoint = self.experiment._replay_checkpoints[-1].time
         for event in events:
             if event.creation_time <= self.experiment._replay_time_index:
                 # Skip events we've already handled
@@ -2066,6 +2588,12 @@ class Scrubber:
                 break
             self.experiment.replay_event(event)
             self.experiment._replay_time_index = event.creation_time
+            if (
+                self.checkpoint_interval is not None
+                and event.creation_time - last_checkpoint >= self.checkpoint_interval
+            ):
+                self.experiment.take_replay_checkpoint()
+                last_checkpoint = event.creation_time
         # Override app_id to allow exports to be created that don't
         # overwrite the original dataset
         self.experiment.app_id = "{}_{}".format(
@@ -2182,10 +2710,36 @@ def is_experiment_class(cls):
     )
 
 
+_loaded_experiment_classes = {}
+
+
 def load():
-    """Load the active experiment."""
+    """Load the active experiment.
+
+    The experiment class is cached per process, keyed on the experiment
+    directory and the ``EXPERIMENT_CLASS_NAME`` environment variable, for as
+    long as the same ``dallinger_experiment`` package stays imported. Use
+    :func:`reset_load_cache` to force it to be discovered again.
+    """
+    directory = experiment_directory() or os.getcwd()
+    initialize_experiment_package(directory)
+    package = sys.modules.get("dallinger_experiment")
+    key = (directory, os.environ.get("EXPERIMENT_CLASS_NAME", None))
+    cached = _loaded_experiment_classes.get(key)
+    if cached is not None and cached[0] is package:
+        return cached[1]
+    klass = _find_experiment_class()
+    _loaded_experiment_classes[key] = (package, klass)
+    return klass
+
+
+def reset_load_cache():
+    """Forget the experiment classes found by :func:`load`."""
+    _loaded_experiment_classes.clear()
+
+
+def _find_experiment_class():
     first_err = second_err = None
-    initialize_experiment_package(experiment_directory() or os.getcwd())
     try:
         try:
             from dallinger_experiment import experiment
@@ -39,10 +39,14 @@ from dallinger.utils import (
     deferred_route_decorator,
 )
 
-from .utils import date_handler, error_response, success_response
+from .log_index import get_log_index
+from .utils import date_handler, error_response, replica_reads, success_response
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of lines returned by a log search
+LOG_SEARCH_LIMIT = 1000
+
 
 def is_running_in_codespaces():
     """Check if the application is running in GitHub Codespaces.
@@ -259,6 +263,10 @@ dashboard_tabs = DashboardTabs(
         DashboardTab("Lifecycle", "dashboard.dashboard_lifecycle"),
         DashboardTab("Database", "dashboard.dashboard_database", database_children),
         DashboardTab("Logger", "dashboard.dashboard_logger"),
+        DashboardTab("Profiling", "dashboard.dashboard_profiling"),
+        DashboardTab("Slow Queries", "dashboard.dashboard_slow_queries"),
+        DashboardTab("Event Loop", "dashboard.dashboard_event_loop"),
+        DashboardTab("Memory", "dashboard.dashboard_memory"),
         DashboardTab("Development", "dashboard.dashboard_develop"),
     ]
 )
@@ -621,16 +629,17 @@ def dashboard_mturk():
 @dashboard.route("/auto_recruit/<bool_val>", methods=["POST"])
 @login_required
 def auto_recruit(bool_val):
-    from dallinger.db import redis_conn
+    from dallinger.config import changeable_values
 
     num_val = int(bool_val)
     assert num_val in [0, 1]
-    redis_conn.set("auto_recruit", num_val)
+    changeable_values.set("auto_recruit", num_val)
     return success_response()
 
 
 @dashboard.route("/monitoring")
 @login_required
+@replica_reads
 def dashboard_monitoring():
     from sqlalchemy import distinct, func
 
@@ -639,7 +648,6 @@ def dashboard_monitoring():
 
     exp = Experiment()
     panes = exp.monitoring_panels(**request.args.to_dict(flat=False))
-    network_structure = exp.network_structure(**request.args.to_dict(flat=False))
     vis_options = exp.node_visualization_options()
     net_roles = (
         session.query(Network.role, func.count(Network.role))
@@ -654,15 +662,57 @@ def dashboard_monitoring():
         "dashboard_monitor.html",
         title="Experiment Monitoring",
         panes=panes,
-        network_structure=json.dumps(network_structure, default=date_handler),
+        structure_url=url_for(
+            "dashboard.network_structure", **request.args.to_dict(flat=False)
+        ),
         net_roles=net_roles,
         net_ids=net_ids,
         vis_options=json.dumps(vis_options),
     )
 
 
+@dashboard.route("/network_structure")
+@login_required
+@replica_reads
+def network_structure():
+    """Return a page of network structure changes as JSON.
+
+    See :meth:`~dallinger.experiment.Experiment.network_structure_delta` for
+    the supported ``since``, ``page``, ``page_size``, ``network_roles``,
+    ``network_ids``, ``collapsed`` and ``transformations`` parameters.
+    """
+    from dallinger.experiment_server.experiment_server import Experiment
+
+    params = request.args
+    since = params.get("since")
+    if since:
+        try:
+            since = datetime.fromisoformat(since)
+        except ValueError:
+            return json_error_response("'since' must be an ISO 8601 timestamp.")
+    else:
+        since = None
+
+    exp = Experiment()
+    structure = exp.network_structure_delta(
+        since=since,
+        page=params.get("page", 0, type=int),
+        page_size=params.get("page_size", 100, type=int),
+        network_roles=params.getlist("network_roles") or None,
+        network_ids=params.getlist("network_ids", type=int) or None,
+        collapsed=bool(params.get("collapsed")),
+        transformations=bool(params.get("transformations")),
+    )
+    return Response(
+        json.dumps(structure, default=date_handler),
+        status=200,
+        mimetype="application/json",
+    )
+
+
 @dashboard.route("/node_details/<object_type>/<obj_id>")
 @login_required
+@replica_reads
 def node_details(object_type, obj_id):
     from dallinger.experiment_server.experiment_server import Experiment
 
@@ -830,65 +880,64 @@ def log_read_lines(line_start: int, line_end: int) -> tuple[list[dict], bool, in
     """
     Read the log file and return the lines in the specified range.
 
+    The lines are read by seeking to the nearest checkpoint of the log's
+    line-offset index (see :class:`~dallinger.experiment_server.log_index.LogIndex`).
+
     :param line_start: The line number to start reading from
     :type line_start: int
 
     :param line_end: The line number to stop reading at
     :type line_end: int
 
-    :return: A tuple containing the lines, a boolean indicating if the end of the file was reached, and the last line number
+    :return: A tuple containing the lines, a boolean indicating if the file continues past ``line_end``, and the number of lines in the file
 
     :Note: The line numbers are 1-based
 
     """
-    lines = []
-    line_range = range(line_start, line_end)
-    early_stop = False
-    with open(JSON_LOGFILE) as f:
-        for i, line in enumerate(f):
-            number = i + 1
-            if number in line_range:
-                line_info = clean_line_info(json.loads(line), number)
-                lines.append(line_info)
-            if number > line_end:
-                early_stop = True
-                break
-    return lines, early_stop, i
+    index = get_log_index(JSON_LOGFILE)
+    lines = [
+        clean_line_info(json.loads(line), number)
+        for number, line in index.read(line_start, line_end)
+    ]
+    return lines, index.lines > line_end, index.lines
 
 
-def find_log_line_number(substring) -> Union[int, None]:
+def find_log_line_number(substring, last=False) -> Union[int, None]:
     """
     Find the line number in the log file that contains a substring.
 
     :param substring: The substring to search for
     :type substring: str
 
+    :param last: Return the last matching line instead of the first one
+    :type last: bool
+
     :return: The line number (1-based) or None if the substring was not found
     """
-    with open(JSON_LOGFILE) as f:
-        for number, line in enumerate(f):
-            if substring in line:
-                return number + 1
-    return None
+    return get_log_index(JSON_LOGFILE).find(substring, last=last)
 
 
-def log_search_substring(substring: str):
+def log_search_substring(substring: str, limit: Optional[int] = None):
     """
     Search the log file for a substring and return the matching lines.
 
+    The file is scanned in a background thread, and matching lines are
+    streamed as they are found.
+
     :param substring: The substring to search for
     :type substring: str
 
+    :param limit: Optional maximum number of matching lines
+    :type limit: int
+
     :return: A generator that yields the matching lines in the right format (i.e. f"data:{json.dumps(obj)}\n\n")
 
     :Note: The line numbers are 1-based
-    :Note: The generator will yield a 'stop' message when the end of the file is reached
+    :Note: The generator will yield a 'stop' message when the end of the file or the limit is reached
     """
-    with open(JSON_LOGFILE) as f:
-        for number, line in enumerate(f):
-            if substring in line:
-                line_info = clean_line_info(json.loads(line), number)
-                yield f"data:{json.dumps(line_info)}\n\n"
+    for number, line in get_log_index(JSON_LOGFILE).search(substring, limit=limit):
+        line_info = clean_line_info(json.loads(line), number)
+        yield f"data:{json.dumps(line_info)}\n\n"
     yield f"data:{json.dumps({'stop': True})}\n\n"
 
 
@@ -969,13 +1018,17 @@ def json_error_response(message, status_code=400):
 @login_required
 def logs_find_lines():
     """
-    Find lines in the log file that contain a substring (GET parameter 'query').
+    Find lines in the log file that contain a substring (GET parameter 'query'),
+    up to 'limit' lines (``LOG_SEARCH_LIMIT`` by default).
     """
     params = request.args
     query = params.get("query", None)
     if query is None:
         return json_error_response("No query provided.")
-    return Response(log_search_substring(query), mimetype="text/event-stream")
+    limit = params.get("limit", LOG_SEARCH_LIMIT, type=int)
+    return Response(
+        log_search_substring(query, limit=limit), mimetype="text/event-stream"
+    )
 
 
 @dashboard.route("/logs/find_line_number", methods=["POST"])
@@ -989,7 +1042,8 @@ def logs_find_line_number():
     if query is None:
         return json_error_response("No query provided.")
 
-    line_number = find_log_line_number(query)
+    # The dashboard looks up recent lines, so search from the end
+    line_number = find_log_line_number(query, last=True)
     if line_number is not None:
         return {"line_number": line_number}
     return json_error_response("No line found.", 404)
@@ -1063,6 +1117,7 @@ def parse_searchpanes_filters(args) -> dict[str, list[str]]:
 
 @dashboard.route("/database", methods=["GET", "POST"])
 @login_required
+@replica_reads
 def dashboard_database():
     from dallinger.db import get_polymorphic_mapping
     from dallinger.experiment_server.experiment_server import Experiment
@@ -1155,6 +1210,7 @@ def dashboard_database():
             order_column=order_column if isinstance(order_column, str) else None,
             order_dir=order_dir,
             column_filters=col_filters,
+            after=request.values.get("after", type=int),
         )
 
         panes = exp.table_search_panes(
@@ -1175,6 +1231,7 @@ def dashboard_database():
             "recordsFiltered": page["filtered_count"],
             "data": page["data"],
             "searchPanes": panes,
+            "searchableColumns": page["searchable_columns"],
         }
 
     # AJAX URL, this same endpoint with current query string
@@ -1231,6 +1288,147 @@ def dashboard_logger():
     return render_template("dashboard_logger.html")
 
 
+@dashboard.route("/profiling")
+@login_required
+def dashboard_profiling():
+    """Per-route timings of the requests recently handled by this server
+    process, when ``request_profiling`` is enabled.
+    """
+    from .profiling import profiler
+
+    routes = profiler.summary()
+    if request.args.get("format") == "json":
+        return success_response(routes=routes)
+    return render_template(
+        "dashboard_profiling.html",
+        title="Request Profiling",
+        enabled=get_config().get("request_profiling", False),
+        requests=len(profiler.window),
+        routes=routes,
+    )
+
+
+@dashboard.route("/profiling/clear", methods=["POST"])
+@login_required
+def dashboard_profiling_clear():
+    from .profiling import profiler
+
+    profiler.clear()
+    return success_response()
+
+
+@dashboard.route("/slow_queries")
+@login_required
+def dashboard_slow_queries():
+    """Statements that took longer than ``slow_query_ms``, in any of the
+    experiment's processes, by fingerprint.
+    """
+    from dallinger import slow_queries
+
+    queries = slow_queries.summary()
+    if request.args.get("format") == "json":
+        return success_response(queries=queries)
+    return render_template(
+        "dashboard_slow_queries.html",
+        title="Slow Queries",
+        threshold=slow_queries.threshold_ms(),
+        queries=queries,
+    )
+
+
+@dashboard.route("/slow_queries/clear", methods=["POST"])
+@login_required
+def dashboard_slow_queries_clear():
+    from dallinger import slow_queries
+
+    slow_queries.clear()
+    return success_response()
+
+
+@dashboard.route("/event_loop")
+@login_required
+def dashboard_event_loop():
+    """Greenlets that blocked the event loop for longer than
+    ``gevent_max_blocking_ms``, in any web or worker process.
+    """
+    from dallinger import blocking
+
+    counts = blocking.counts()
+    events = blocking.recent_events()
+    if request.args.get("format") == "json":
+        return success_response(counts=counts, events=events)
+    return render_template(
+        "dashboard_event_loop.html",
+        title="Event Loop",
+        threshold=blocking.threshold_ms(),
+        counts=counts,
+        events=events,
+    )
+
+
+@dashboard.route("/event_loop/clear", methods=["POST"])
+@login_required
+def dashboard_event_loop_clear():
+    from dallinger import blocking
+
+    blocking.clear()
+    return success_response()
+
+
+@dashboard.route("/memory")
+@login_required
+def dashboard_memory():
+    """The memory of each web and worker process over the last hour, and
+    their latest ``tracemalloc`` snapshots.
+    """
+    from dallinger import memory
+
+    processes = memory.processes()
+    tracing = memory.tracing_requested()
+    if request.args.get("format") == "json":
+        return success_response(processes=processes, tracing=tracing)
+    return render_template(
+        "dashboard_memory.html",
+        title="Memory",
+        enabled=memory.enabled(),
+        max_rss=memory.max_rss_bytes(),
+        interval=memory.SAMPLE_INTERVAL,
+        processes=processes,
+        tracing=tracing,
+    )
+
+
+@dashboard.route("/memory/tracing", methods=["POST"])
+@login_required
+def dashboard_memory_tracing():
+    """Start or stop tracing allocations in every process."""
+    from dallinger import memory
+
+    if request.values.get("enable") == "true":
+        memory.start_tracing()
+    else:
+        memory.stop_tracing()
+    return success_response()
+
+
+@dashboard.route("/memory/snapshot", methods=["POST"])
+@login_required
+def dashboard_memory_snapshot():
+    from dallinger import memory
+
+    memory.request_snapshot()
+    return success_response()
+
+
+@dashboard.route("/memory/clear", methods=["POST"])
+@login_required
+def dashboard_memory_clear():
+    from dallinger import memory
+
+    memory.clear()
+    return success_response()
+
+
 @dashboard.route("/develop", methods=["GET", "POST"])
 @login_required
 def dashboard_develop():
@@ -1260,6 +1458,8 @@ def database_action(route_name):
         )
     result = route_func(data)
     session.commit()
+    # Changes made here are not seen by table_version() otherwise
+    dallinger.db.invalidate_tables(list(dallinger.db.Base.metadata.tables))
     if result.get("message"):
         flash(result["message"], "success")
     return success_response(**result)
@@ -26,7 +26,15 @@ from sqlalchemy import exc, func
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.sql.expression import true
 
-from dallinger import db, experiment, models, recruiters
+from dallinger import (
+    blocking,
+    db,
+    experiment,
+    metrics,
+    models,
+    recruiters,
+    slow_queries,
+)
 from dallinger.config import get_config
 from dallinger.notifications import MessengerError, admin_notifier
 from dallinger.utils import (
@@ -36,7 +44,7 @@ from dallinger.utils import (
     setup_warning_hooks,
 )
 
-from . import dashboard
+from . import dashboard, profiling
 from .replay import ReplayBackend
 from .utils import (
     ExperimentError,
@@ -45,6 +53,8 @@ from .utils import (
     error_page,
     error_response,
     nocache,
+    remember_writes,
+    replica_reads,
     success_response,
 )
 from .worker_events import worker_function
@@ -91,6 +101,19 @@ def _load_config():
     _config()
 
 
+# Registered right after the config is loaded, so that metrics and profiles
+# cover the other request hooks, including the experiment's after_request.
+metrics.init_app(app)
+profiling.init_app(app)
+blocking.init_app(app)
+
+
+@app.before_request
+def _log_slow_queries():
+    if slow_queries.threshold_ms():
+        slow_queries.install()
+
+
 @app.before_request
 @launch_error_guard(
     "Failed to load experiment before /launch while checking protected routes"
@@ -177,6 +200,11 @@ def after_request(response):
     return response
 
 
+# Clients that wrote to the database read from the primary for a while
+app.before_request(db.reset_writes)
+app.after_request(remember_writes)
+
+
 if exp_klass is not None:  # pragma: no cover
     bp = exp_klass.experiment_routes
     routes = experiment.EXPERIMENT_ROUTE_REGISTRATIONS
@@ -503,7 +531,7 @@ def launch():
 
     if config.get("replay", False):
         try:
-            task = ReplayBackend(exp)
+            task = ReplayBackend(exp, speed=config.get("replay_speed", 1.0))
             gevent.spawn(task)
         except Exception:
             return error_response(
@@ -664,6 +692,7 @@ def recruiter_exit():
 
 
 @app.route("/summary", methods=["GET"])
+@replica_reads
 def summary():
     """Summarize the participants' status codes."""
     exp = Experiment()
@@ -728,6 +757,17 @@ def summary():
     return Response(dumps(state), status=200, mimetype="application/json")
 
 
+@app.route("/metrics", methods=["GET"])
+@login_required
+def prometheus_metrics():
+    """Report the metrics of all the experiment's processes in the Prometheus
+    text format, when the ``metrics`` config parameter is set.
+    """
+    if not metrics.enabled():
+        abort(404)
+    return Response(metrics.render(session), content_type=metrics.CONTENT_TYPE)
+
+
 @app.route("/experiment_property/<prop>", methods=["GET"])
 @app.route("/experiment/<prop>", methods=["GET"])
 def experiment_property(prop):
@@ -1363,6 +1403,7 @@ def get_info(node_id, info_id):
 
 
 @app.route("/node/<int:node_id>/infos", methods=["GET"])
+@replica_reads
 def node_infos(node_id):
     """Get all the infos of a node.
 
@@ -1402,6 +1443,7 @@ def node_infos(node_id):
 
 
 @app.route("/node/<int:node_id>/received_infos", methods=["GET"])
+@replica_reads
 def node_received_infos(node_id):
     """Get all the infos a node has been sent and has received.
 
@@ -36,6 +36,9 @@ def worker_exit(server, worker):
 
 
 def post_worker_init(worker):
+    from dallinger import memory
+
+    memory.init_gunicorn_worker(worker)
     return experiment_hook("gunicorn_post_worker_init", worker)
 
 
@@ -0,0 +1,236 @@
+"""Line-number index for the experiment's JSON log file.
+
+The dashboard's Logs tab addresses log lines by number. Rather than reading
+the file from the start for every request, :class:`LogIndex` keeps the byte
+offset of every ``every``-th line in a sidecar file next to the log, and
+extends it incrementally as the log grows.
+
+Reading a large log takes a while, so under gevent (as in the gunicorn
+workers) the reads yield to other greenlets every ``YIELD_EVERY`` lines.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+
+import gevent
+from gevent import monkey
+
+logger = logging.getLogger(__name__)
+
+#: Number of lines read between yields to other greenlets.
+YIELD_EVERY = 1000
+
+
+def _cooperate():
+    """Let other greenlets run, when gevent patched the process."""
+    if monkey.is_module_patched("threading"):
+        gevent.sleep(0)
+
+
+class LogIndex:
+    """Byte offsets of checkpoint lines in a log file.
+
+    ``offsets[i]`` is the byte offset of line ``i * every + 1`` (line numbers
+    are 1-based). The index is stored as JSON in ``<path>.idx`` and rebuilt
+    from scratch if the log file is replaced or truncated.
+    """
+
+    def __init__(self, path, every=1000):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.every = every
+        self.inode = None
+        self.offsets = [0]
+        self.lines = 0
+        self.end = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get("every") != self.every:
+            return
+        self.inode = state["inode"]
+        self.offsets = state["offsets"]
+        self.lines = state["lines"]
+        self.end = state["end"]
+
+    def _save(self):
+        state = {
+            "every": self.every,
+            "inode": self.inode,
+            "offsets": self.offsets,
+            "lines": self.lines,
+            "end": self.end,
+        }
+        tmp_path = "{}.{}.tmp".format(self.index_path, os.getpid())
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as err:
+            logger.warning(f"Could not save log index {self.index_path}: {err}")
+
+    def update(self):
+        """Index the lines appended to the log since the last update.
+
+        Returns the number of complete lines in the log.
+        """
+        with self._lock:
+            stat = os.stat(self.path)
+            if stat.st_ino != self.inode or stat.st_size < self.end:
+                self.inode = stat.st_ino
+                self.offsets = [0]
+                self.lines = 0
+                self.end = 0
+            if stat.st_size == self.end:
+                return self.lines
+
+            with open(self.path, "rb") as f:
+                f.seek(self.end)
+                offset = self.end
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Partially written line, index it next time
+                        break
+                    offset += len(line)
+                    self.lines += 1
+                    if self.lines % self.every == 0:
+                        self.offsets.append(offset)
+                    if self.lines % YIELD_EVERY == 0:
+                        _cooperate()
+                self.end = offset
+            self._save()
+            return self.lines
+
+    def _open_at(self, line_number):
+        """Open the log positioned at the checkpoint preceding ``line_number``.
+
+        Returns the file and the number of the line at its position.
+        """
+        checkpoint = min((line_number - 1) // self.every, len(self.offsets) - 1)
+        f = open(self.path, "rb")
+        f.seek(self.offsets[checkpoint])
+        return f, checkpoint * self.every + 1
+
+    def read(self, start, end):
+        """Return ``(number, line)`` pairs for lines ``start`` to ``end - 1``,
+        reading only from the nearest checkpoint.
+        """
+        total = self.update()
+        end = min(end, total + 1)
+        if start >= end:
+            return []
+        result = []
+        f, number = self._open_at(start)
+        with f:
+            for line in f:
+                if number >= end:
+                    break
+                if number >= start:
+                    result.append((number, line.decode("utf-8", errors="replace")))
+                number += 1
+        return result
+
+    def find(self, substring, last=False):
+        """Return the number of the first line containing ``substring``, or
+        of the last one if ``last`` is set, or ``None``.
+
+        Searching for the last occurrence reads the log backwards one
+        checkpoint interval at a time, so recent lines are found quickly.
+        """
+        total = self.update()
+        needle = substring.encode("utf-8")
+        if not last:
+            for number, line in self.scan(needle, stop=total):
+                return number
+            return None
+
+        for checkpoint in reversed(range(len(self.offsets))):
+            first = checkpoint * self.every + 1
+            found = None
+            for number, line in self.scan(
+                needle, start=first, stop=min(first + self.every - 1, total)
+            ):
+                found = number
+            if found is not None:
+                return found
+        return None
+
+    def scan(self, needle, start=1, stop=None):
+        """Yield ``(number, line)`` for the lines from ``start`` to ``stop``
+        (inclusive) whose raw bytes contain ``needle``.
+        """
+        if stop is None:
+            stop = self.update()
+        f, number = self._open_at(start)
+        with f:
+            for line in f:
+                if number > stop:
+                    break
+                if number >= start and needle in line:
+                    yield number, line.decode("utf-8", errors="replace")
+                number += 1
+                if number % YIELD_EVERY == 0:
+                    _cooperate()
+
+    def search(self, substring, limit=None):
+        """Search the log for ``substring`` in a background thread (a
+        greenlet under gevent, which the scan yields from).
+
+        Yields ``(number, line)`` pairs as they are found, stopping after
+        ``limit`` matches. Closing the generator stops the search.
+        """
+        results = queue.Queue(maxsize=100)
+        stopped = threading.Event()
+        done = object()
+
+        def run():
+            try:
+                found = 0
+                for match in self.scan(substring.encode("utf-8")):
+                    if stopped.is_set():
+                        break
+                    results.put(match)
+                    found += 1
+                    if limit is not None and found >= limit:
+                        break
+            except Exception:
+                logger.exception("Log search failed")
+            finally:
+                results.put(done)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        try:
+            while True:
+                match = results.get()
+                if match is done:
+                    return
+                yield match
+        finally:
+            stopped.set()
+            # Unblock the search thread if it is waiting on a full queue
+            while thread.is_alive():
+                try:
+                    results.get_nowait()
+                except queue.Empty:
+                    thread.join(0.01)
+
+
+_indexes = {}
+
+
+def get_log_index(path):
+    """Return the shared :class:`LogIndex` for the log file at ``path``."""
+    path = os.path.abspath(path)
+    if path not in _indexes:
+        _indexes[path] = LogIndex(path)
+    return _indexes[path]
@@ -0,0 +1,198 @@
+"""Opt-in, per-route request profiling for the experiment server.
+
+When the ``request_profiling`` config parameter is set, every request records
+its wall time, the number and total duration of the SQL statements and Redis
+commands it ran, and the number of database commits. The last
+``WINDOW_SIZE`` requests are kept in memory, in each server process, and
+summarized by route on the dashboard's Profiling tab.
+"""
+
+import threading
+import time
+from collections import deque
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from dallinger import db
+from dallinger.config import get_config
+
+from .utils import route_label
+
+#: Number of recent requests kept by each server process.
+WINDOW_SIZE = 1000
+
+
+class RequestProfile:
+    """Timings of a single request, in milliseconds."""
+
+    def __init__(self, route, method):
+        self.route = route
+        self.method = method
+        self.status = None
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self.wall_ms = 0.0
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.redis_count = 0
+        self.redis_ms = 0.0
+        self.commits = 0
+
+    def finish(self, status):
+        self.status = status
+        self.wall_ms = (time.perf_counter() - self._start) * 1000
+
+    @property
+    def other_ms(self):
+        """Time not spent waiting on Postgres or Redis: Python code,
+        experiment hooks, serialization and lock waits.
+        """
+        return max(self.wall_ms - self.sql_ms - self.redis_ms, 0.0)
+
+
+def current_profile():
+    """Return the :class:`RequestProfile` of the request being handled, if
+    it is being profiled.
+    """
+    if has_request_context():
+        return g.get("_request_profile")
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100.0))]
+
+
+class Profiler:
+    """Collects request profiles in a rolling window."""
+
+    def __init__(self, window_size=WINDOW_SIZE):
+        self.window = deque(maxlen=window_size)
+        self._installed = False
+        self._lock = threading.Lock()
+
+    def install(self):
+        """Listen to SQLAlchemy engine and session events and time the
+        commands sent through ``dallinger.db.redis_conn``. Only done the first
+        time a request is profiled, so there is no overhead otherwise.
+        """
+        with self._lock:
+            if self._installed:
+                return
+            event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(db.engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(db.session_factory, "after_commit", _after_commit)
+            _time_redis(db.redis_conn)
+            self._installed = True
+
+    def start(self):
+        self.install()
+        g._request_profile = RequestProfile(route_label(), request.method)
+
+    def finish(self, response):
+        profile = g.pop("_request_profile", None)
+        if profile is not None:
+            profile.finish(response.status_code)
+            self.window.append(profile)
+        return response
+
+    def summary(self):
+        """Aggregate the window by route, slowest total time first."""
+        by_route = {}
+        for profile in list(self.window):
+            key = (profile.method, profile.route)
+            by_route.setdefault(key, []).append(profile)
+
+        routes = []
+        for (method, route), profiles in by_route.items():
+            count = len(profiles)
+            wall = [p.wall_ms for p in profiles]
+            routes.append(
+                {
+                    "method": method,
+                    "route": route,
+                    "count": count,
+                    "errors": sum(1 for p in profiles if p.status >= 500),
+                    "total_ms": sum(wall),
+                    "mean_ms": sum(wall) / count,
+                    "p95_ms": _percentile(wall, 95),
+                    "max_ms": max(wall),
+                    "sql_count": sum(p.sql_count for p in profiles) / count,
+                    "sql_ms": sum(p.sql_ms for p in profiles) / count,
+                    "redis_count": sum(p.redis_count for p in profiles) / count,
+                    "redis_ms": sum(p.redis_ms for p in profiles) / count,
+                    "commits": sum(p.commits for p in profiles) / count,
+                    "other_ms": sum(p.other_ms for p in profiles) / count,
+                }
+            )
+        return sorted(routes, key=lambda r: r["total_ms"], reverse=True)
+
+    def clear(self):
+        self.window.clear()
+
+
+profiler = Profiler()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    if current_profile() is not None:
+        conn.info.setdefault("_profile_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    profile = current_profile()
+    starts = conn.info.get("_profile_query_start")
+    if profile is not None and starts:
+        profile.sql_count += 1
+        profile.sql_ms += (time.perf_counter() - starts.pop()) * 1000
+
+
+def _after_commit(session):
+    profile = current_profile()
+    if profile is not None:
+        profile.commits += 1
+
+
+def _timed_redis(func):
+    def timed(*args, **kwargs):
+        profile = current_profile()
+        if profile is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.redis_count += 1
+            profile.redis_ms += (time.perf_counter() - start) * 1000
+
+    return timed
+
+
+def _time_redis(conn):
+    """Wrap the commands and pipelines of a Redis client instance."""
+    conn.execute_command = _timed_redis(conn.execute_command)
+    pipeline = conn.pipeline
+
+    def timed_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        pipe.execute = _timed_redis(pipe.execute)
+        return pipe
+
+    conn.pipeline = timed_pipeline
+
+
+def init_app(app):
+    """Profile the requests handled by ``app`` when ``request_profiling``
+    is enabled.
+    """
+
+    @app.before_request
+    def start_request_profile():
+        config = get_config()
+        if config.ready and config.get("request_profiling", False):
+            profiler.start()
+
+    @app.after_request
+    def finish_request_profile(response):
+        return profiler.finish(response)
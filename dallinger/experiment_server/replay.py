@@ -3,6 +3,7 @@ import time
 
 import gevent
 
+from dallinger import db
 from dallinger.utils import get_base_url
 
 logger = logging.getLogger(__name__)
@@ -14,10 +15,24 @@ class ReplayBackend:
     This is started during launch and delegates `event` selection and
     publication to the experiment class. `Events` are any objects with a
     creation_time attribute.
+
+    Events are streamed from the database through a server-side cursor in
+    chunks of ``batch_size`` rows, so memory use does not grow with the
+    length of the experiment. The cursor belongs to a separate session, which
+    ``events_for_replay`` is given, so ``replay_event`` may commit. Events
+    whose timestamps fall within the same ``tick`` (in seconds) are replayed
+    together as one batch. ``speed`` scales the original timing (``2``
+    replays twice as fast); a ``speed`` of ``0`` or ``None`` fast-forwards
+    through the events without waiting.
     """
 
-    def __init__(self, experiment):
+    def __init__(self, experiment, speed=1.0, batch_size=1000, tick=0.01):
         self.experiment = experiment
+        self.speed = speed or None
+        self.batch_size = batch_size
+        self.tick = tick
+        self.replayed = 0
+        self.rate = None
 
     def __call__(self):
         gevent.sleep(0.200)
@@ -35,45 +50,90 @@ class ReplayBackend:
 
         self.experiment.log("Looping through replayable data", key="replay")
         timestamp = self.timestamp
-        events = self.experiment.events_for_replay()
-
-        if not events.count():
-            self.experiment.replay_finish()
-            return
-
-        first_timestamp = timestamp(events[0].creation_time)
-        self.experiment.log(
-            "Found {} messages to replay starting from {}".format(
-                events.count(), events[0].creation_time
-            ),
-            key="replay",
-        )
+        first_timestamp = last_timestamp = None
+        self.replayed = 0
         start = time.time()
-        for event in events:
-            event_offset = timestamp(event.creation_time) - first_timestamp
-            cur_offset = time.time() - start
-            if event_offset >= cur_offset:
-                if (event_offset - cur_offset) > 1:
+        # Events are read through a session of their own, so that
+        # replay_event can commit the main session without closing the
+        # server-side cursor they are streamed through
+        stream_session = db.session_factory()
+        try:
+            events = self.experiment.events_for_replay(session=stream_session)
+            for batch in self.batches(self.stream(events)):
+                batch_timestamp = timestamp(batch[0].creation_time)
+                if first_timestamp is None:
+                    first_timestamp = batch_timestamp
                     self.experiment.log(
-                        "Waiting {} seconds to replay {} {}".format(
-                            event_offset - cur_offset, event.type, event.id
+                        "Replaying messages starting from {}".format(
+                            batch[0].creation_time
                         ),
                         key="replay",
                     )
-                gevent.sleep(event_offset - cur_offset)
-            self.experiment.replay_event(event)
+                if self.speed is not None:
+                    event_offset = (batch_timestamp - first_timestamp) / self.speed
+                    cur_offset = time.time() - start
+                    if event_offset >= cur_offset:
+                        if (event_offset - cur_offset) > 1:
+                            self.experiment.log(
+                                "Waiting {} seconds to replay {} {}".format(
+                                    event_offset - cur_offset,
+                                    batch[0].type,
+                                    batch[0].id,
+                                ),
+                                key="replay",
+                            )
+                        gevent.sleep(event_offset - cur_offset)
+                for event in batch:
+                    self.experiment.replay_event(event)
+                self.replayed += len(batch)
+                last_timestamp = timestamp(batch[-1].creation_time)
+        finally:
+            stream_session.close()
+
+        if first_timestamp is None:
+            self.experiment.replay_finish()
+            return
 
+        elapsed = time.time() - start
+        self.rate = self.replayed / elapsed if elapsed else float("inf")
         self.experiment.log(
-            "Replayed {} events in {} seconds (original duration {} seconds)".format(
-                events.count(),
-                time.time() - start,
-                timestamp(event.creation_time) - first_timestamp,
+            "Replayed {} events in {} seconds ({:.1f} events/s, "
+            "original duration {} seconds)".format(
+                self.replayed,
+                elapsed,
+                self.rate,
+                last_timestamp - first_timestamp,
             ),
             key="replay",
         )
         self.experiment.replay_finish()
         return
 
+    def stream(self, events):
+        """Iterate over `events`, through a server-side cursor when `events`
+        is a SQLAlchemy query.
+        """
+        if hasattr(events, "yield_per"):
+            return events.execution_options(stream_results=True).yield_per(
+                self.batch_size
+            )
+        return iter(events)
+
+    def batches(self, events):
+        """Group consecutive events sharing a timestamp tick into lists."""
+        batch = []
+        batch_start = None
+        for event in events:
+            event_timestamp = self.timestamp(event.creation_time)
+            if batch and event_timestamp - batch_start > self.tick:
+                yield batch
+                batch = []
+            if not batch:
+                batch_start = event_timestamp
+            batch.append(event)
+        if batch:
+            yield batch
+
     @staticmethod
     def timestamp(dt):
         """Generate a microsecond accurate timestamp from a datetime."""
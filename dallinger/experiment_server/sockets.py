@@ -11,6 +11,7 @@ from gevent.lock import Semaphore
 from redis import ConnectionError
 from simple_websocket import ConnectionClosed
 
+from dallinger import metrics
 from dallinger.db import redis_conn
 
 from .experiment_server import app
@@ -138,6 +139,10 @@ class ChatBackend:
 
 # There is one chat backend per process.
 chat_backend = ChatBackend()
+metrics.WEBSOCKET_CLIENTS.collect = lambda: [
+    ({"channel": name}, len(channel.clients))
+    for name, channel in list(chat_backend.channels.items())
+]
 
 
 class Client:
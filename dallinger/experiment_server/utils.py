@@ -1,10 +1,10 @@
 import logging
 import sys
+import time
 from datetime import timedelta
 from functools import update_wrapper
 from json import dumps
 
-import user_agents
 from flask import (
     Response,
     current_app,
@@ -14,6 +14,7 @@ from flask import (
     request,
 )
 
+from dallinger import db
 from dallinger.config import get_config
 
 logger = logging.getLogger(__name__)
@@ -72,6 +73,40 @@ def date_handler(obj):
     return obj.isoformat() if hasattr(obj, "isoformat") else object
 
 
+def json_compatible(value):
+    """Convert a value to JSON-native types in a single pass.
+
+    Equivalent to ``json.loads(json.dumps(value, default=date_handler))``
+    for the values returned by the models' ``__json__`` methods: dates
+    become ISO strings, bytes are decoded, tuples become lists and mapping
+    keys become strings. Other objects are converted with ``str``.
+    """
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        return {
+            key if isinstance(key, str) else dumps(key).strip('"'): json_compatible(
+                item
+            )
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [json_compatible(item) for item in value]
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def route_label():
+    """The URL rule of the current request, for grouping requests by route
+    in profiles and metrics. Requests that matched no rule are grouped under
+    ``"<unmatched>"``.
+    """
+    return request.url_rule.rule if request.url_rule else "<unmatched>"
+
+
 def nocache(func):
     """Stop caching for pages wrapped in nocache decorator."""
 
@@ -84,6 +119,48 @@ def nocache(func):
     return update_wrapper(new_func, func)
 
 
+#: Holds the time until which a client that wrote to the database reads from
+#: the primary rather than the read replica.
+READ_YOUR_WRITES_COOKIE = "dallinger_read_primary_until"
+
+
+def replica_reads(func):
+    """Run the database reads of a read-only view on the read replica set by
+    the ``database_replica_url`` config parameter, unless the client wrote to
+    the database in the last ``db.READ_YOUR_WRITES_SECONDS`` seconds.
+    """
+
+    def new_func(*args, **kwargs):
+        try:
+            read_primary_until = float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0))
+        except ValueError:
+            read_primary_until = 0
+        if read_primary_until > time.time():
+            return func(*args, **kwargs)
+        with db.reading_from_replica():
+            return func(*args, **kwargs)
+
+    return update_wrapper(new_func, func)
+
+
+def remember_writes(response):
+    """Have a client that wrote to the database read from the primary for the
+    next ``db.READ_YOUR_WRITES_SECONDS`` seconds, when there is a replica.
+    """
+    if db.wrote() and db.replica_engine() is not None:
+        # Experiments recruited through MTurk run in a cross-site iframe
+        secure = request.is_secure
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE,
+            str(time.time() + db.READ_YOUR_WRITES_SECONDS),
+            max_age=db.READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            secure=secure,
+            samesite="None" if secure else "Lax",
+        )
+    return response
+
+
 class ExperimentError(Exception):
     """
     Error class for experimental errors, such as subject not being found in
@@ -141,6 +218,8 @@ class ValidatesBrowser:
 
     def is_supported(self, user_agent_string):
         """Check user agent against configured exclusions."""
+        import user_agents
+
         user_agent_obj = user_agents.parse(user_agent_string)
         browser_ok = True
         for rule in self.exclusions:
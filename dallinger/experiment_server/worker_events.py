@@ -4,7 +4,7 @@ from datetime import datetime
 from rq import get_current_job
 from sqlalchemy.exc import DataError, InternalError
 
-from dallinger import db, information, models
+from dallinger import db, information, metrics, models
 from dallinger.config import get_config
 
 logger = logging.getLogger(__name__)
@@ -37,6 +37,7 @@ LOG_EVENT_TYPES = frozenset(
 )
 
 
+@metrics.time_worker_event
 @db.scoped_session_decorator
 def worker_function(
     event_type,
@@ -315,3 +316,12 @@ class WebSocketMessage(WorkerEvent):
             node=self.node,
             receive_time=self.receive_time,
         )
+
+
+@db.scoped_session_decorator
+def compute_search_panes(cache_key, pane_columns, kwargs):
+    """Compute the dashboard SearchPanes options of a large table. Enqueued
+    by :meth:`~dallinger.experiment.Experiment.table_search_panes`.
+    """
+    _config()
+    _loaded_experiment().cache_search_panes_by_column(cache_key, pane_columns, kwargs)
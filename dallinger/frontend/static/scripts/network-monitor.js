@@ -1,7 +1,79 @@
+// Network structure objects received from the server, keyed by id. The
+// structure is loaded one page of networks at a time and then kept up to
+// date by polling for the objects that changed since the previous poll.
+// Deltas only hold objects created, failed or ended since then, so the whole
+// structure is reloaded every structure_reload_interval to pick up other
+// changes, such as participant statuses.
+var structure_keys = ['networks', 'nodes', 'vectors', 'infos', 'participants', 'trans'];
+var structure_store = {};
+structure_keys.forEach(function (key) {
+    structure_store[key] = {};
+});
+var structure_since = null;
+var structure_poll_interval = 5000;
+var structure_reload_interval = 60000;
+var structure_loaded_at = 0;
+
+var merge_structure = function (structure) {
+    var changed = false;
+    structure_keys.forEach(function (key) {
+        (structure[key] || []).forEach(function (obj) {
+            structure_store[key][obj.id] = obj;
+            changed = true;
+        });
+    });
+    return changed;
+};
+
+var current_structure = function () {
+    var structure = {};
+    structure_keys.forEach(function (key) {
+        structure[key] = Object.values(structure_store[key]);
+    });
+    return structure;
+};
+
+var load_structure = function (since, page, next_since, done) {
+    var url = new URL(templateGlobals().structure_url, window.location.origin);
+    url.searchParams.set('page', page);
+    if (since !== null) {
+        url.searchParams.set('since', since);
+    }
+    $.getJSON(url.toString(), function (structure) {
+        if (merge_structure(structure)) {
+            draw_network();
+        }
+        // The first page's timestamp covers every page of this poll
+        next_since = next_since || structure.next_since;
+        if (structure.has_more) {
+            load_structure(since, page + 1, next_since, done);
+        } else {
+            done(next_since);
+        }
+    }).fail(function () {
+        done(since);
+    });
+};
+
+var poll_structure = function () {
+    var since = structure_since;
+    var started = Date.now();
+    if (started - structure_loaded_at >= structure_reload_interval) {
+        since = null;
+    }
+    load_structure(since, 0, null, function (next_since) {
+        if (since === null && next_since !== null) {
+            structure_loaded_at = started;
+        }
+        structure_since = next_since;
+        setTimeout(poll_structure, structure_poll_interval);
+    });
+};
+
 var draw_network = function () {
     var template_globals = templateGlobals();
     var network = null;
-    var net_structure = template_globals.network_structure || {}; // this  is a container for all the data coming from the route
+    var net_structure = current_structure(); // this is a container for all the data coming from the route
     var vis_options = template_globals.vis_options || {}; // This is a set of overrides for the vis options
 
     var type_network_sort = $('#sortBy').val();
@@ -43,7 +115,8 @@ var draw_network = function () {
     var count_networks = 0;
     net_structure.networks.forEach(function (network) {
         var network_string = JSON.stringify(network).toLowerCase();
-        var include_network = network_string.includes(search_key) && $('#val-' + network.id)[0].checked;
+        var checkbox = $('#val-' + network.id)[0];
+        var include_network = network_string.includes(search_key) && (!checkbox || checkbox.checked);
         if (include_network) {
 
             if (max_networks !== null && count_networks >= max_networks) {
@@ -631,5 +704,7 @@ $('#search').keyup(function () {
     draw_network();
 });
 
+poll_structure();
+
 
 draw_network();
\ No newline at end of file
@@ -9,7 +9,7 @@ from apscheduler.schedulers.blocking import BlockingScheduler
 from sqlalchemy import text
 
 import dallinger
-from dallinger import db, recruiters
+from dallinger import db, metrics, recruiters, slow_queries
 from dallinger.experiment import EXPERIMENT_TASK_REGISTRATIONS
 from dallinger.models import Participant
 from dallinger.utils import ParticipationTime
@@ -118,4 +118,8 @@ def launch():
             )
 
     wait_for_redis_ready()
+    if metrics.enabled():
+        metrics.start("clock")
+    if slow_queries.threshold_ms():
+        slow_queries.install()
     scheduler.start()
@@ -22,6 +22,8 @@ from rq.timeouts import BaseDeathPenalty, JobTimeoutException
 from rq.version import VERSION
 from rq.worker import WorkerStatus
 
+from dallinger import blocking, db
+
 
 class GeventDeathPenalty(BaseDeathPenalty):
     def setup_death_penalty(self):
@@ -174,6 +176,7 @@ class GeventWorker(Worker):
                 queue.enqueue_dependents(job)
 
         child_greenlet = self.gevent_pool.spawn(self.perform_job, job, queue)
+        blocking.attribute(child_greenlet, db.job_label(job))
         child_greenlet.link(job_done)
         self.children.append(child_greenlet)
 
@@ -0,0 +1,296 @@
+"""Track the memory of the web and worker processes.
+
+When the ``memory_profiling`` config parameter is set, each gunicorn worker
+and RQ worker samples its resident set size (RSS) every ``SAMPLE_INTERVAL``
+seconds and keeps the last hour of samples in Redis, so that the dashboard's
+Memory tab can show how the memory of every process, on every dyno, grows
+over time.
+
+Allocations are traced with :mod:`tracemalloc` on demand. The dashboard
+leaves commands in Redis to start or stop tracing, or to take a snapshot,
+which each process carries out at its next sample. Each snapshot lists the
+top allocation sites of the process, and how they changed since its
+previous snapshot.
+
+When the ``max_worker_memory_mb`` config parameter is set, a gunicorn worker
+whose RSS exceeds it is restarted gracefully, like gunicorn does for workers
+that have handled ``max_requests`` requests.
+"""
+
+import json
+import logging
+import os
+import time
+import tracemalloc
+
+import psutil
+from redis.exceptions import RedisError
+
+from dallinger import db, monitoring
+from dallinger.config import get_config
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "dallinger_memory"
+PROCESSES_KEY = KEY_PREFIX + ":processes"
+COMMANDS_KEY = KEY_PREFIX + ":commands"
+
+#: Seconds between the memory samples of each process.
+SAMPLE_INTERVAL = 10
+
+#: Number of samples kept for each process: an hour's worth.
+MAX_SAMPLES = 360
+
+#: Seconds after which the samples of a process that stopped reporting are
+#: dropped.
+KEEP_FOR = SAMPLE_INTERVAL * MAX_SAMPLES
+
+#: Number of allocation sites listed in each snapshot.
+TOP_SITES = 25
+
+#: Frames stored for each traced allocation.
+TRACEBACK_FRAMES = 1
+
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+_process = monitoring.MonitoredProcess()
+_gunicorn_worker = None
+_recycling = False
+# The last snapshot command carried out, and the snapshot it took
+_snapshot_seq = None
+_previous_snapshot = None
+
+
+def enabled():
+    config = get_config()
+    return config.ready and config.get("memory_profiling", False)
+
+
+def max_rss_bytes():
+    """The configured RSS limit of gunicorn workers, or ``None``."""
+    config = get_config()
+    if not config.ready:
+        return None
+    limit = config.get("max_worker_memory_mb", 0)
+    return limit * 1024 * 1024 if limit else None
+
+
+def rss():
+    return psutil.Process().memory_info().rss
+
+
+def start(process_type):
+    """Start sampling the memory of this process, once per process.
+    ``process_type`` is ``"web"`` or ``"worker"``.
+    """
+    _process.start(process_type, run=_sample_forever, name="dallinger-memory")
+
+
+def init_gunicorn_worker(worker):
+    """Called by gunicorn's ``post_worker_init`` hook, so that the worker
+    can be recycled when it uses too much memory.
+    """
+    global _gunicorn_worker
+    _gunicorn_worker = worker
+    if enabled() or max_rss_bytes():
+        start("web")
+
+
+def _sample_forever():
+    while True:
+        try:
+            sample()
+        except Exception:
+            logger.exception("Could not sample the memory of this process.")
+        time.sleep(SAMPLE_INTERVAL)
+
+
+def sample():
+    """Sample the RSS of this process, record it and carry out the
+    dashboard's tracemalloc commands when ``memory_profiling`` is enabled,
+    and recycle the gunicorn worker if it exceeds ``max_worker_memory_mb``.
+    """
+    current = rss()
+    if enabled():
+        try:
+            record(current)
+            apply_commands()
+        except RedisError:
+            logger.warning("Could not record memory samples in Redis.", exc_info=True)
+    limit = max_rss_bytes()
+    if limit and current > limit:
+        recycle(current, limit)
+    return current
+
+
+def record(current, conn=None):
+    conn = conn or db.redis_conn
+    now = time.time()
+    key = _samples_key(_process.process_id)
+    pipe = conn.pipeline(transaction=False)
+    pipe.rpush(key, json.dumps([now, current]))
+    pipe.ltrim(key, -MAX_SAMPLES, -1)
+    pipe.expire(key, KEEP_FOR)
+    pipe.hset(
+        PROCESSES_KEY,
+        _process.process_id,
+        json.dumps(
+            {
+                "process": _process.process_type,
+                "pid": os.getpid(),
+                "started": _process.started,
+                "time": now,
+                "rss": current,
+                "tracing": tracemalloc.is_tracing(),
+            }
+        ),
+    )
+    pipe.execute()
+
+
+def recycle(current, limit):
+    """Stop the gunicorn worker gracefully, once it has finished the
+    requests it is handling. The arbiter starts a new worker to replace it.
+    """
+    global _recycling
+    if _gunicorn_worker is None or _recycling:
+        return
+    _recycling = True
+    logger.warning(
+        "Recycling worker %s: its RSS of %.0f MB exceeds max_worker_memory_mb "
+        "(%.0f MB).",
+        os.getpid(),
+        current / 1024 / 1024,
+        limit / 1024 / 1024,
+    )
+    _gunicorn_worker.alive = False
+
+
+def start_tracing(conn=None):
+    """Have every process start tracing its allocations."""
+    (conn or db.redis_conn).hset(COMMANDS_KEY, "tracing", 1)
+
+
+def stop_tracing(conn=None):
+    (conn or db.redis_conn).hset(COMMANDS_KEY, "tracing", 0)
+
+
+def request_snapshot(conn=None):
+    """Have every process that traces its allocations take a snapshot."""
+    (conn or db.redis_conn).hincrby(COMMANDS_KEY, "snapshot", 1)
+
+
+def tracing_requested(conn=None):
+    conn = conn or db.redis_conn
+    return conn.hget(COMMANDS_KEY, "tracing") == b"1"
+
+
+def apply_commands(conn=None):
+    global _snapshot_seq, _previous_snapshot
+    conn = conn or db.redis_conn
+    commands = conn.hgetall(COMMANDS_KEY)
+    tracing = commands.get(b"tracing") == b"1"
+    seq = int(commands.get(b"snapshot", 0))
+
+    if tracing and not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEBACK_FRAMES)
+    elif not tracing and tracemalloc.is_tracing():
+        tracemalloc.stop()
+        _previous_snapshot = None
+
+    # A process only carries out the snapshot commands given after it started
+    if _snapshot_seq is not None and seq > _snapshot_seq and tracing:
+        conn.set(
+            _snapshot_key(_process.process_id),
+            json.dumps(take_snapshot()),
+            ex=KEEP_FOR,
+        )
+    _snapshot_seq = seq
+
+
+def take_snapshot():
+    """Summarize the current allocations of this process by line, and their
+    change since the previous snapshot.
+    """
+    global _previous_snapshot
+    snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+    traced, peak = tracemalloc.get_traced_memory()
+    summary = {
+        "time": time.time(),
+        "traced": traced,
+        "peak": peak,
+        "top": [
+            {"site": _site(stat), "size": stat.size, "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:TOP_SITES]
+        ],
+        "diff": None,
+    }
+    if _previous_snapshot is not None:
+        summary["diff"] = [
+            {
+                "site": _site(stat),
+                "size": stat.size,
+                "size_diff": stat.size_diff,
+                "count_diff": stat.count_diff,
+            }
+            for stat in snapshot.compare_to(_previous_snapshot, "lineno")[:TOP_SITES]
+            if stat.size_diff
+        ]
+    _previous_snapshot = snapshot
+    return summary
+
+
+def _site(stat):
+    frame = stat.traceback[0]
+    return "{}:{}".format(frame.filename, frame.lineno)
+
+
+def _samples_key(process_id):
+    return "{}:samples:{}".format(KEY_PREFIX, process_id)
+
+
+def _snapshot_key(process_id):
+    return "{}:snapshot:{}".format(KEY_PREFIX, process_id)
+
+
+def processes(conn=None):
+    """The processes that reported within ``KEEP_FOR`` seconds, with their
+    RSS samples and latest snapshot, by process type.
+    """
+    conn = conn or db.redis_conn
+    now = time.time()
+    reports = []
+    for process_id, report in conn.hgetall(PROCESSES_KEY).items():
+        process_id = process_id.decode("utf-8")
+        report = json.loads(report)
+        if now - report["time"] > KEEP_FOR:
+            conn.hdel(PROCESSES_KEY, process_id)
+            continue
+        report["process_id"] = process_id
+        reports.append(report)
+
+    pipe = conn.pipeline(transaction=False)
+    for report in reports:
+        pipe.lrange(_samples_key(report["process_id"]), 0, -1)
+        pipe.get(_snapshot_key(report["process_id"]))
+    results = pipe.execute()
+    for i, report in enumerate(reports):
+        samples, snapshot = results[2 * i : 2 * i + 2]
+        report["samples"] = [json.loads(s) for s in samples]
+        report["snapshot"] = json.loads(snapshot) if snapshot else None
+    return sorted(reports, key=lambda r: (r["process"], r["started"]))
+
+
+def clear(conn=None):
+    """Forget the samples and snapshots recorded so far. Processes that are
+    still tracing their allocations keep doing so.
+    """
+    conn = conn or db.redis_conn
+    keys = [k for k in conn.scan_iter(KEY_PREFIX + ":*") if k != COMMANDS_KEY.encode()]
+    if keys:
+        conn.delete(*keys)
@@ -0,0 +1,422 @@
+"""Prometheus-compatible metrics for the web, worker and clock processes.
+
+When the ``metrics`` config parameter is set, each process records its
+metrics in Redis, so that the ``/metrics`` route of any web worker reports
+the totals of every gunicorn worker, RQ worker and clock process of the
+experiment, including those running on other dynos.
+
+Histograms and counters are incremented in Redis as they are observed.
+Gauges that describe the state of a single process (database connections,
+websocket clients) are reported by each process every
+``REPORT_INTERVAL`` seconds and summed over the processes that reported
+within ``STALE_AFTER`` seconds. RQ queue lengths and participant statuses are
+read when ``/metrics`` is requested.
+"""
+
+import json
+import logging
+import re
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from redis.exceptions import RedisError
+from sqlalchemy import event, func
+
+from dallinger import db, monitoring
+from dallinger.config import get_config
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+KEY_PREFIX = "dallinger_metrics"
+PROCESSES_KEY = KEY_PREFIX + ":processes"
+
+#: Seconds between the reports of each process's gauges.
+REPORT_INTERVAL = 15
+
+#: Seconds after which the gauges of a process that stopped reporting are
+#: dropped.
+STALE_AFTER = 4 * REPORT_INTERVAL
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+WAIT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+
+QUEUE_NAMES = ("high", "default", "low")
+
+
+def enabled():
+    config = get_config()
+    return config.ready and config.get("metrics", False)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_string(names, values):
+    return ",".join('{}="{}"'.format(n, _escape(values[n])) for n in names)
+
+
+_UNESCAPED = {"\\": "\\", '"': '"', "n": "\n"}
+
+
+def _parse_labels(labels):
+    return {
+        name: re.sub(r"\\(.)", lambda match: _UNESCAPED[match.group(1)], value)
+        for name, value in re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', labels)
+    }
+
+
+def _sample(name, labels, value, extra=""):
+    labels = ",".join(part for part in (labels, extra) if part)
+    if labels:
+        name = "{}{{{}}}".format(name, labels)
+    return "{} {}".format(name, _format_value(value))
+
+
+def _format_value(value):
+    value = float(value)
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _header(name, help, kind):
+    return ["# HELP {} {}".format(name, help), "# TYPE {} {}".format(name, kind)]
+
+
+class Counter:
+    """A counter stored in a Redis hash, with one field per label set."""
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.key = "{}:{}".format(KEY_PREFIX, name)
+
+    def inc(self, pipe, amount=1, **labels):
+        pipe.hincrbyfloat(self.key, _label_string(self.labelnames, labels), amount)
+
+    def values(self, conn):
+        """The current ``(labels, value)`` of each label set."""
+        return [
+            (_parse_labels(labels), float(value))
+            for labels, value in _decoded(conn.hgetall(self.key))
+        ]
+
+    def render(self, conn):
+        lines = _header(self.name, self.help, "counter")
+        for labels, value in sorted(_decoded(conn.hgetall(self.key))):
+            lines.append(_sample(self.name, labels, value))
+        return lines
+
+
+class Histogram:
+    """A histogram stored in a Redis hash. Bucket counts are stored
+    non-cumulatively, and added up when rendered.
+    """
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self.key = "{}:{}".format(KEY_PREFIX, name)
+
+    def observe(self, pipe, value, **labels):
+        labels = _label_string(self.labelnames, labels)
+        bucket = next(b for b in self.buckets if value <= b)
+        pipe.hincrby(self.key, "{}|{}".format(labels, bucket), 1)
+        pipe.hincrbyfloat(self.key, "{}|sum".format(labels), value)
+
+    def render(self, conn):
+        series = {}
+        for field, value in _decoded(conn.hgetall(self.key)):
+            labels, _, suffix = field.rpartition("|")
+            series.setdefault(labels, {})[suffix] = float(value)
+
+        lines = _header(self.name, self.help, "histogram")
+        for labels, values in sorted(series.items()):
+            count = 0
+            for bucket in self.buckets:
+                count += values.get(str(bucket), 0)
+                le = "+Inf" if bucket == float("inf") else repr(float(bucket))
+                lines.append(
+                    _sample(self.name + "_bucket", labels, count, 'le="{}"'.format(le))
+                )
+            lines.append(_sample(self.name + "_sum", labels, values.get("sum", 0)))
+            lines.append(_sample(self.name + "_count", labels, count))
+        return lines
+
+
+class ProcessGauge:
+    """A gauge whose value is reported by each process, through
+    :func:`report_process_gauges`, and summed by process type.
+
+    ``collect`` returns ``(labels, value)`` pairs for the current process.
+    """
+
+    def __init__(self, name, help, labelnames=(), collect=None):
+        self.name = name
+        self.help = help
+        self.labelnames = ("process",) + tuple(labelnames)
+        self.collect = collect
+
+    def current(self):
+        if self.collect is None:
+            return {}
+        samples = {}
+        for labels, value in self.collect():
+            labels = dict(labels, process=_process.process_type)
+            samples[_label_string(self.labelnames, labels)] = value
+        return samples
+
+    def render(self, reports):
+        totals = {}
+        for report in reports:
+            for labels, value in report["gauges"].get(self.name, {}).items():
+                totals[labels] = totals.get(labels, 0) + value
+        lines = _header(self.name, self.help, "gauge")
+        for labels, value in sorted(totals.items()):
+            lines.append(_sample(self.name, labels, value))
+        return lines
+
+
+def _decoded(mapping):
+    for field, value in mapping.items():
+        if isinstance(field, bytes):
+            field = field.decode("utf-8")
+        yield field, value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+REQUEST_DURATION = Histogram(
+    "dallinger_http_request_duration_seconds",
+    "Time spent handling HTTP requests, by route.",
+    ("method", "route"),
+)
+REQUESTS = Counter(
+    "dallinger_http_requests_total",
+    "HTTP requests handled, by route and status code.",
+    ("method", "route", "status"),
+)
+WORKER_EVENT_DURATION = Histogram(
+    "dallinger_worker_event_duration_seconds",
+    "Time spent processing worker events, by WorkerEvent type.",
+    ("event_type", "outcome"),
+)
+GEVENT_LOOP_BLOCKED = Counter(
+    "dallinger_gevent_loop_blocked_total",
+    "Times a greenlet blocked the gevent event loop for longer than "
+    "gevent_max_blocking_ms, by what it was running.",
+    ("process", "context"),
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "dallinger_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the database pool.",
+    ("process",),
+    buckets=WAIT_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = ProcessGauge(
+    "dallinger_db_pool_checked_out",
+    "Database connections checked out from the pool.",
+    collect=lambda: [({}, db.engine.pool.checkedout())],
+)
+WEBSOCKET_CLIENTS = ProcessGauge(
+    "dallinger_websocket_clients",
+    "Websocket clients subscribed to each channel.",
+    ("channel",),
+)
+
+HISTOGRAMS_AND_COUNTERS = (
+    REQUEST_DURATION,
+    REQUESTS,
+    WORKER_EVENT_DURATION,
+    GEVENT_LOOP_BLOCKED,
+    DB_POOL_CHECKOUT_WAIT,
+)
+PROCESS_GAUGES = (DB_POOL_CHECKED_OUT, WEBSOCKET_CLIENTS)
+
+
+_process = monitoring.MonitoredProcess()
+
+
+def start(process_type):
+    """Time database pool checkouts and start reporting the gauges of this
+    process, once per process. ``process_type`` is ``"web"``, ``"worker"``
+    or ``"clock"``.
+    """
+    if _process.start(process_type, run=_report_forever, name="dallinger-metrics"):
+        _time_pool_checkouts(db.engine)
+
+
+def _report_forever():
+    while True:
+        report_process_gauges()
+        time.sleep(REPORT_INTERVAL)
+
+
+def report_process_gauges():
+    report = {
+        "time": time.time(),
+        "gauges": {gauge.name: gauge.current() for gauge in PROCESS_GAUGES},
+    }
+    try:
+        db.redis_conn.hset(PROCESSES_KEY, _process.process_id, json.dumps(report))
+    except RedisError:
+        logger.warning("Could not report metrics to Redis.", exc_info=True)
+
+
+def _live_reports(conn):
+    now = time.time()
+    reports = []
+    for process_id, report in _decoded(conn.hgetall(PROCESSES_KEY)):
+        report = json.loads(report)
+        if now - report["time"] > STALE_AFTER:
+            conn.hdel(PROCESSES_KEY, process_id)
+        else:
+            reports.append(report)
+    return reports
+
+
+def _time_pool_checkouts(engine):
+    """Wrap the pool's ``connect``, which blocks while the pool is
+    exhausted. The pool is replaced when the engine is disposed, so it is
+    wrapped again.
+    """
+
+    def wrap(pool):
+        connect = pool.connect
+
+        def timed_connect(*args, **kwargs):
+            start = time.perf_counter()
+            connection = connect(*args, **kwargs)
+            with recording() as pipe:
+                DB_POOL_CHECKOUT_WAIT.observe(
+                    pipe, time.perf_counter() - start, process=_process.process_type
+                )
+            return connection
+
+        pool.connect = timed_connect
+
+    wrap(engine.pool)
+    event.listen(engine, "engine_disposed", lambda engine: wrap(engine.pool))
+
+
+@contextmanager
+def recording():
+    """Yield a Redis pipeline to record metrics in, and send it. Redis errors
+    are logged rather than raised, so that metrics never fail a request or job.
+    """
+    try:
+        pipe = db.redis_conn.pipeline(transaction=False)
+        yield pipe
+        pipe.execute()
+    except RedisError:
+        logger.warning("Could not record metrics in Redis.", exc_info=True)
+
+
+def time_worker_event(func):
+    """Record the duration of each call to ``worker_function``, by event
+    type and outcome.
+    """
+
+    @wraps(func)
+    def wrapper(event_type, *args, **kwargs):
+        if not enabled():
+            return func(event_type, *args, **kwargs)
+        start("worker")
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = func(event_type, *args, **kwargs)
+            outcome = "success"
+            return result
+        finally:
+            with recording() as pipe:
+                WORKER_EVENT_DURATION.observe(
+                    pipe,
+                    time.perf_counter() - started,
+                    event_type=event_type,
+                    outcome=outcome,
+                )
+
+    return wrapper
+
+
+def render(session=None):
+    """Return all metrics in the Prometheus text exposition format."""
+    from dallinger.models import Participant
+
+    session = session or db.session
+    conn = db.redis_conn
+    lines = []
+    for metric in HISTOGRAMS_AND_COUNTERS:
+        lines.extend(metric.render(conn))
+
+    reports = _live_reports(conn)
+    for gauge in PROCESS_GAUGES:
+        lines.extend(gauge.render(reports))
+
+    lines.extend(
+        _header("dallinger_rq_queue_length", "Jobs waiting in each RQ queue.", "gauge")
+    )
+    for name in QUEUE_NAMES:
+        lines.append(
+            _sample(
+                "dallinger_rq_queue_length",
+                _label_string(("queue",), {"queue": name}),
+                len(db.get_queue(name)),
+            )
+        )
+
+    lines.extend(_header("dallinger_participants", "Participants by status.", "gauge"))
+    counts = session.query(Participant.status, func.count(Participant.id)).group_by(
+        Participant.status
+    )
+    for status, count in sorted(counts):
+        lines.append(
+            _sample(
+                "dallinger_participants",
+                _label_string(("status",), {"status": status}),
+                count,
+            )
+        )
+
+    return "\n".join(lines) + "\n"
+
+
+def init_app(app):
+    """Record the duration and status of the requests handled by ``app``
+    when ``metrics`` is enabled.
+    """
+    from flask import g, request
+
+    from dallinger.experiment_server.utils import route_label
+
+    @app.before_request
+    def start_request_timer():
+        if enabled():
+            start("web")
+            g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop("_metrics_start", None)
+        if started is not None:
+            route = route_label()
+            with recording() as pipe:
+                REQUEST_DURATION.observe(
+                    pipe,
+                    time.perf_counter() - started,
+                    method=request.method,
+                    route=route,
+                )
+                REQUESTS.inc(
+                    pipe,
+                    method=request.method,
+                    route=route,
+                    status=response.status_code,
+                )
+        return response
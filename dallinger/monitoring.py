@@ -0,0 +1,43 @@
+"""Bookkeeping shared by the monitors that run in every web, worker and
+clock process and report on it in Redis: :mod:`dallinger.metrics`,
+:mod:`dallinger.blocking` and :mod:`dallinger.memory`.
+"""
+
+import os
+import socket
+import threading
+import time
+
+
+def process_id():
+    """Identify this process among the processes of every host, as
+    ``"<hostname>:<pid>"``.
+    """
+    return "{}:{}".format(socket.gethostname(), os.getpid())
+
+
+class MonitoredProcess:
+    """The type (``"web"``, ``"worker"`` or ``"clock"``) and id of a process
+    that reports on itself in Redis, set once per process by :meth:`start`.
+    """
+
+    def __init__(self, process_type=None, process_id=None, started=None):
+        self.process_type = process_type
+        self.process_id = process_id
+        self.started = started
+        self._lock = threading.Lock()
+
+    def start(self, process_type, run=None, name=None):
+        """Record the type of this process, and call ``run``, if given, in a
+        daemon thread named ``name``. Returns ``False`` without doing anything
+        if the process was already started.
+        """
+        with self._lock:
+            if self.process_type is not None:
+                return False
+            self.process_type = process_type
+            self.process_id = process_id()
+            self.started = time.time()
+        if run is not None:
+            threading.Thread(target=run, name=name, daemon=True).start()
+        return True
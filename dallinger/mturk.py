@@ -3,7 +3,6 @@ import logging
 import time
 from functools import cached_property
 
-import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
 
 logger = logging.getLogger(__name__)
@@ -55,6 +54,8 @@ class SNSService:
 
     @cached_property
     def _sns(self):
+        import boto3
+
         session = boto3.session.Session(
             aws_access_key_id=self.aws_key,
             aws_secret_access_key=self.aws_secret,
@@ -249,6 +250,8 @@ class MTurkService:
 
     @cached_property
     def mturk(self):
+        import boto3
+
         session = boto3.session.Session(
             aws_access_key_id=self.aws_key,
             aws_secret_access_key=self.aws_secret,
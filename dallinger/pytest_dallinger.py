@@ -4,6 +4,8 @@ import shutil
 import sys
 import tempfile
 import time
+import traceback
+from contextlib import contextmanager
 from unittest import mock
 
 import pexpect
@@ -13,6 +15,7 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
+from sqlalchemy import event
 
 from dallinger import db, information, models, networks, nodes
 from dallinger.bots import BotBase
@@ -58,6 +61,9 @@ def reset_sys_modules():
     to_clear = [k for k in sys.modules if is_dallinger_module(k)]
     for key in to_clear:
         del sys.modules[key]
+    experiment = sys.modules.get("dallinger.experiment")
+    if experiment is not None:
+        experiment.reset_load_cache()
 
 
 @pytest.fixture
@@ -265,6 +271,116 @@ def db_session():
         session.remove()
 
 
+class QueryCounter:
+    """Record the SQL statements executed while it is active, with the
+    location of the code that ran each one.
+
+    def test_neighbors_queries(self, a):
+        node = a.node()
+        with QueryCounter() as counter:
+            node.neighbors()
+        assert counter.count <= 2
+    """
+
+    def __init__(self, engine=None, stack_depth=3):
+        self.engine = engine
+        self.stack_depth = stack_depth
+        self.queries = []
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def statements(self):
+        return [statement for statement, location in self.queries]
+
+    def reset(self):
+        self.queries = []
+
+    def __enter__(self):
+        if self.engine is None:
+            self.engine = db.engine
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.queries.append((statement, self._location()))
+
+    def _location(self):
+        """The innermost frames outside of SQLAlchemy and this module."""
+        frames = [
+            frame
+            for frame in traceback.extract_stack()[:-2]
+            if not _is_library_frame(frame.filename)
+        ]
+        return frames[-self.stack_depth :]
+
+    def report(self):
+        lines = []
+        for number, (statement, location) in enumerate(self.queries, 1):
+            lines.append("{}. {}".format(number, " ".join(statement.split())))
+            for frame in reversed(location):
+                lines.append(
+                    "     at {}:{} in {}".format(
+                        frame.filename, frame.lineno, frame.name
+                    )
+                )
+        return "\n".join(lines)
+
+
+_LIBRARY_PACKAGES = ("sqlalchemy", "_pytest", "pluggy")
+
+
+def _is_library_frame(filename):
+    parts = filename.split(os.sep)
+    return (
+        any(package in parts for package in _LIBRARY_PACKAGES)
+        or parts[-1] == "contextlib.py"
+        or filename == __file__
+    )
+
+
+@contextmanager
+def max_queries(limit, engine=None):
+    """Fail if the code in the block executes more than ``limit`` SQL
+    statements, listing the statements and where they were run from.
+
+    with max_queries(2):
+        node.neighbors()
+    """
+    with QueryCounter(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        raise AssertionError(
+            "Expected at most {} queries, but {} were executed:\n{}".format(
+                limit, counter.count, counter.report()
+            )
+        )
+
+
+@pytest.fixture
+def query_counter(db_session):
+    """A :class:`QueryCounter` that is active for the whole test."""
+    with QueryCounter() as counter:
+        yield counter
+
+
+@pytest.fixture
+def assert_max_queries(db_session):
+    """The :func:`max_queries` context manager:
+
+    def test_neighbors(self, a, assert_max_queries):
+        node = a.node()
+        with assert_max_queries(2):
+            node.neighbors()
+    """
+    return max_queries
+
+
 @pytest.fixture
 def a(db_session):
     """Provides a standard way of building model objects in tests.
@@ -674,9 +790,13 @@ def wait_for_text(driver, el_id, value, removed=False, timeout=10):
 
 @pytest.fixture
 def redis_conn():
+    from dallinger.config import changeable_values
     from dallinger.db import redis_conn as _redis
 
+    changeable_values.clear()
+
     yield _redis
 
     for key in _redis.keys():
         _redis.delete(key)
+    changeable_values.clear()
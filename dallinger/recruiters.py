@@ -16,7 +16,6 @@ import flask
 import requests
 from sqlalchemy import func
 
-from dallinger.command_line.utils import Output, render_rich_table
 from dallinger.config import get_config
 from dallinger.db import get_queue, redis_conn, scoped_session_decorator, session
 from dallinger.experiment_server.utils import crossdomain, success_response
@@ -288,6 +287,8 @@ class Recruiter:
 
     def hits(self, app=None, sandbox=False):
         """Lists all hits on a recruiter."""
+        from dallinger.command_line.utils import Output, render_rich_table
+
         service = self.load_service(sandbox)
         hits = self._current_hits(service, app)
         formatted_hit_list = []
@@ -0,0 +1,262 @@
+"""Log SQL statements that run longer than the ``slow_query_ms`` threshold.
+
+Each slow statement is logged with the shape of its parameters (their types,
+never their values) and the route or worker event that ran it, and added to
+per-fingerprint totals in Redis, which the dashboard's Slow Queries tab
+reports for all the experiment's processes. The first time a fingerprint is
+seen, its query plan is captured in the background with
+``EXPLAIN (ANALYZE, BUFFERS)``, or a plain ``EXPLAIN`` for statements that
+write, in a transaction that is rolled back.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+
+from redis.exceptions import RedisError
+from sqlalchemy import event
+
+from dallinger import db
+from dallinger.config import get_config
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_LOG_PREFIX = "Slow query:"
+
+KEY_PREFIX = "dallinger_slow_queries"
+MAX_KEY = KEY_PREFIX + ":max"
+
+#: Longest time an EXPLAIN ANALYZE may run, in milliseconds.
+EXPLAIN_TIMEOUT_MS = 30000
+
+_installed = set()
+_install_lock = threading.Lock()
+
+
+def threshold_ms():
+    """The configured threshold, or ``None`` if slow queries aren't logged."""
+    config = get_config()
+    if not config.ready:
+        return None
+    return config.get("slow_query_ms", 0) or None
+
+
+def install(engine=None):
+    """Time the statements executed on ``engine`` (``dallinger.db.engine``
+    by default), once per process.
+    """
+    engine = engine or db.engine
+    if engine in _installed:
+        return
+    with _install_lock:
+        if engine in _installed:
+            return
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        _installed.add(engine)
+
+
+def normalize(statement):
+    """Replace the literals and parameters of a statement with ``?``, and
+    lists of them with ``(...)``, so that statements that only differ by
+    their values, or the length of an ``IN`` list, have the same
+    fingerprint.
+    """
+    statement = re.sub(r"%\(\w+\)s|%s", "?", statement)
+    statement = re.sub(r"'(?:[^']|'')*'", "?", statement)
+    statement = re.sub(r"(?<![\w.])-?\d+(?:\.\d+)?\b", "?", statement)
+    statement = re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", "(...)", statement)
+    return " ".join(statement.split())
+
+
+def fingerprint(statement):
+    return hashlib.sha1(normalize(statement).encode("utf-8")).hexdigest()[:12]
+
+
+def parameter_shape(parameters):
+    """Describe the types of a statement's parameters, without their values."""
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return "{} x {}".format(len(parameters), parameter_shape(parameters[0]))
+        return "({})".format(", ".join(_type_name(p) for p in parameters))
+    if isinstance(parameters, dict):
+        return "{{{}}}".format(
+            ", ".join(
+                "{}: {}".format(name, _type_name(value))
+                for name, value in sorted(parameters.items())
+            )
+        )
+    return _type_name(parameters)
+
+
+def _type_name(value):
+    if isinstance(value, (list, tuple)):
+        return "{}[{}]".format(type(value).__name__, len(value))
+    return type(value).__name__
+
+
+def calling_context():
+    """The route or worker event whose code is running, if any."""
+    from flask import has_request_context, request
+
+    if has_request_context():
+        from dallinger.experiment_server.utils import route_label
+
+        return "{} {}".format(request.method, route_label())
+
+    from rq import get_current_job
+
+    job = get_current_job()
+    if job is not None:
+        return db.job_label(job)
+    return "-"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    conn.info.setdefault("_slow_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    starts = conn.info.get("_slow_query_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+    threshold = threshold_ms()
+    if threshold is None or elapsed_ms < threshold:
+        return
+    if statement.lstrip().upper().startswith("EXPLAIN"):
+        return
+    record(statement, parameters, elapsed_ms, calling_context())
+
+
+def record(statement, parameters, elapsed_ms, context):
+    """Log a slow statement, add it to the totals for its fingerprint, and
+    explain it if it is the first of its fingerprint.
+    """
+    shape = parameter_shape(parameters)
+    key_id = fingerprint(statement)
+    logger.warning(
+        "%s %.0f ms [%s] from %s: %s params=%s",
+        SLOW_QUERY_LOG_PREFIX,
+        elapsed_ms,
+        key_id,
+        context,
+        " ".join(statement.split()),
+        shape,
+    )
+
+    key = "{}:{}".format(KEY_PREFIX, key_id)
+    try:
+        pipe = db.redis_conn.pipeline(transaction=False)
+        pipe.hset(
+            key,
+            mapping={
+                "statement": normalize(statement),
+                "params": shape,
+                "last_seen": time.time(),
+            },
+        )
+        pipe.hincrby(key, "count", 1)
+        pipe.hincrbyfloat(key, "total_ms", elapsed_ms)
+        pipe.hincrby(key + ":contexts", context, 1)
+        pipe.zadd(MAX_KEY, {key_id: elapsed_ms}, gt=True)
+        pipe.hsetnx(key, "plan", "")
+        first = pipe.execute()[-1]
+    except RedisError:
+        logger.warning("Could not record slow query in Redis.", exc_info=True)
+        return
+
+    if first:
+        threading.Thread(
+            target=explain,
+            args=(key, statement, parameters),
+            name="dallinger-explain",
+            daemon=True,
+        ).start()
+
+
+def explain(key, statement, parameters, engine=None):
+    """Store the plan of a statement in ``key``. Only statements that don't
+    write are run, with ``ANALYZE``, and everything is rolled back.
+    """
+    engine = engine or db.engine
+    if isinstance(parameters, (list, tuple)) and parameters:
+        if isinstance(parameters[0], (dict, list, tuple)):
+            parameters = parameters[0]
+    options = "ANALYZE, BUFFERS" if _is_read_only(statement) else "COSTS"
+    try:
+        with engine.connect() as conn:
+            transaction = conn.begin()
+            try:
+                conn.exec_driver_sql(
+                    "SET LOCAL statement_timeout = {:d}".format(EXPLAIN_TIMEOUT_MS)
+                )
+                rows = conn.exec_driver_sql(
+                    "EXPLAIN ({}) {}".format(options, statement), parameters or None
+                )
+                plan = "\n".join(row[0] for row in rows)
+            finally:
+                transaction.rollback()
+    except Exception as exc:
+        plan = "Could not explain statement: {}".format(exc)
+    try:
+        db.redis_conn.hset(key, "plan", plan)
+    except RedisError:
+        logger.warning("Could not store query plan in Redis.", exc_info=True)
+    return plan
+
+
+def _is_read_only(statement):
+    if not re.match(r"\s*(SELECT|WITH)\b", statement, re.I):
+        return False
+    return not re.search(r"\b(INSERT|UPDATE|DELETE)\b", statement, re.I)
+
+
+def summary(conn=None):
+    """Slow query totals by fingerprint, slowest total time first."""
+    conn = conn or db.redis_conn
+    key_ids = [k.decode("utf-8") for k in conn.zrange(MAX_KEY, 0, -1)]
+    pipe = conn.pipeline(transaction=False)
+    for key_id in key_ids:
+        key = "{}:{}".format(KEY_PREFIX, key_id)
+        pipe.hgetall(key)
+        pipe.hgetall(key + ":contexts")
+        pipe.zscore(MAX_KEY, key_id)
+    results = pipe.execute()
+
+    queries = []
+    for i, key_id in enumerate(key_ids):
+        values, contexts, max_ms = results[3 * i : 3 * i + 3]
+        values = {k.decode("utf-8"): v.decode("utf-8") for k, v in values.items()}
+        if not values:
+            continue
+        count = int(values["count"])
+        total_ms = float(values["total_ms"])
+        queries.append(
+            {
+                "fingerprint": key_id,
+                "statement": values["statement"],
+                "params": values["params"],
+                "count": count,
+                "total_ms": total_ms,
+                "mean_ms": total_ms / count,
+                "max_ms": max_ms,
+                "last_seen": float(values["last_seen"]),
+                "contexts": sorted(
+                    ((c.decode("utf-8"), int(n)) for c, n in contexts.items()),
+                    key=lambda item: item[1],
+                    reverse=True,
+                ),
+                "plan": values.get("plan", ""),
+            }
+        )
+    return sorted(queries, key=lambda q: q["total_ms"], reverse=True)
+
+
+def clear(conn=None):
+    conn = conn or db.redis_conn
+    keys = list(conn.scan_iter(KEY_PREFIX + ":*"))
+    if keys:
+        conn.delete(*keys)
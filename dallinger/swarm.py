@@ -0,0 +1,314 @@
+"""Drive many high-performance bots from a single process.
+
+:class:`BotSwarm` starts bot sessions at a configurable arrival rate, and
+runs each bot's ``run_experiment`` (and so its ``participate`` logic) in a
+pool of worker threads. All bots share one pooled HTTP session, which times
+every request into a per-endpoint :class:`LatencyHistogram`.
+
+Arrivals follow their schedule whether or not earlier bots have finished. When
+every thread is busy, arriving bots queue for one, and the time they wait is
+reported as their arrival lag rather than hidden in a lower arrival rate.
+"""
+
+import logging
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from urllib import parse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from dallinger.utils import generate_random_id
+
+logger = logging.getLogger(__name__)
+
+ARRIVAL_PROFILES = ("poisson", "constant", "ramp", "burst")
+
+#: Bots that start this many milliseconds after their scheduled arrival are
+#: counted as delayed.
+LATE_ARRIVAL_MS = 10
+
+
+class LatencyHistogram:
+    """Request latencies in logarithmic buckets.
+
+    Each bucket spans ``2 ** (1 / BUCKETS_PER_DOUBLING)`` times the previous
+    one, starting at ``MIN_MS``, so percentiles are accurate to about 9%
+    whatever the number of requests recorded.
+    """
+
+    MIN_MS = 0.1
+    BUCKETS_PER_DOUBLING = 8
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def _bucket(self, ms):
+        if ms <= self.MIN_MS:
+            return 0
+        return math.ceil(math.log2(ms / self.MIN_MS) * self.BUCKETS_PER_DOUBLING)
+
+    def _upper_bound(self, bucket):
+        return self.MIN_MS * 2 ** (bucket / self.BUCKETS_PER_DOUBLING)
+
+    def record(self, ms, error=False):
+        bucket = self._bucket(ms)
+        with self._lock:
+            self.counts[bucket] = self.counts.get(bucket, 0) + 1
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+            if error:
+                self.errors += 1
+
+    def merge(self, other):
+        with self._lock:
+            for bucket, count in other.counts.items():
+                self.counts[bucket] = self.counts.get(bucket, 0) + count
+            self.count += other.count
+            self.total_ms += other.total_ms
+            self.max_ms = max(self.max_ms, other.max_ms)
+            self.errors += other.errors
+
+    def percentile(self, q):
+        """Return the latency in milliseconds below which ``q`` percent of
+        the requests fall, or ``None`` if nothing was recorded.
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * q / 100.0))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self._upper_bound(bucket), self.max_ms)
+        return self.max_ms
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": self.total_ms / self.count if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms,
+            "buckets": {
+                round(self._upper_bound(bucket), 3): self.counts[bucket]
+                for bucket in sorted(self.counts)
+            },
+        }
+
+
+def endpoint_name(method, url):
+    """Group a request by method and the first segment of its path, so that
+    ``/participant/<worker>/<hit>/...`` and ``/node/4/neighbors`` are
+    reported as ``POST /participant`` and ``GET /node``.
+    """
+    path = parse.urlparse(url).path.strip("/")
+    return "{} /{}".format(method.upper(), path.split("/")[0])
+
+
+class SwarmSession(requests.Session):
+    """A ``requests.Session`` with a connection pool sized for the swarm,
+    which records the latency of every request by endpoint.
+    """
+
+    def __init__(self, pool_size=10):
+        super().__init__()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, endpoint):
+        with self._lock:
+            if endpoint not in self.histograms:
+                self.histograms[endpoint] = LatencyHistogram()
+            return self.histograms[endpoint]
+
+    def request(self, method, url, *args, **kwargs):
+        histogram = self.histogram(endpoint_name(method, url))
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.RequestException:
+            histogram.record((time.perf_counter() - start) * 1000, error=True)
+            raise
+        histogram.record(
+            (time.perf_counter() - start) * 1000, error=response.status_code >= 400
+        )
+        return response
+
+
+def arrival_delays(count, rate, profile="poisson"):
+    """Yield the delay in seconds before each of ``count`` bot arrivals.
+
+    ``rate`` is the mean number of arrivals per second. The ``poisson``
+    profile draws exponential inter-arrival times, ``constant`` spaces
+    arrivals evenly, ``ramp`` increases the rate linearly from zero to
+    ``rate`` over the run and ``burst`` starts every bot at once.
+    """
+    if profile not in ARRIVAL_PROFILES:
+        raise ValueError(
+            "Unknown arrival profile {!r}, expected one of {}".format(
+                profile, ", ".join(ARRIVAL_PROFILES)
+            )
+        )
+    for i in range(count):
+        if i == 0 or profile == "burst":
+            yield 0.0
+        elif profile == "constant":
+            yield 1.0 / rate
+        elif profile == "ramp":
+            # Arrival i is at ramp * sqrt(i / count), so the rate reaches
+            # ``rate`` as the last bot arrives
+            ramp = 2.0 * count / rate
+            yield ramp * (math.sqrt(i / count) - math.sqrt((i - 1) / count))
+        else:
+            yield random.expovariate(rate)
+
+
+@dataclass
+class SwarmResult:
+    """Outcome of a :class:`BotSwarm` run."""
+
+    started: int = 0
+    completed: int = 0
+    failed: int = 0
+    duration: float = 0.0
+    histograms: dict = field(default_factory=dict)
+    errors: dict = field(default_factory=dict)
+    #: Bots that started more than ``LATE_ARRIVAL_MS`` after their arrival
+    delayed: int = 0
+    #: Milliseconds between the scheduled arrival and the start of each bot
+    arrival_lag: LatencyHistogram = field(default_factory=LatencyHistogram)
+    #: ``(scheduled, actual)`` arrival times in seconds since the run started
+    arrivals: list = field(default_factory=list)
+
+    @property
+    def throughput(self):
+        """Completed bot sessions per second."""
+        return self.completed / self.duration if self.duration else 0.0
+
+    def as_dict(self):
+        return {
+            "started": self.started,
+            "completed": self.completed,
+            "failed": self.failed,
+            "duration": self.duration,
+            "throughput": self.throughput,
+            "endpoints": {
+                endpoint: histogram.as_dict()
+                for endpoint, histogram in sorted(self.histograms.items())
+            },
+            "errors": self.errors,
+            "delayed": self.delayed,
+            "arrival_lag": self.arrival_lag.as_dict(),
+        }
+
+
+class BotSwarm:
+    """Run ``count`` bots against the experiment at ``base_url``.
+
+    ``bot_factory`` is called like the ``Bot`` class of an experiment, with
+    an ad URL and the assignment, worker and HIT ids, and should return a
+    :class:`~dallinger.bots.HighPerformanceBotBase`. Bots arrive following
+    the ``profile`` (see :func:`arrival_delays`). Each bot runs in one of
+    ``concurrency`` threads, so at most that many run at the same time; when
+    they are all busy, arriving bots wait for a bot to finish, and are
+    reported in the result's ``delayed`` count and ``arrival_lag``.
+    """
+
+    def __init__(
+        self,
+        bot_factory,
+        base_url,
+        count,
+        rate=10.0,
+        profile="poisson",
+        concurrency=100,
+        recruiter="bots",
+    ):
+        self.bot_factory = bot_factory
+        self.base_url = base_url.rstrip("/")
+        self.count = count
+        self.rate = rate
+        self.profile = profile
+        self.concurrency = concurrency
+        self.recruiter = recruiter
+        self.session = SwarmSession(pool_size=concurrency)
+        self.result = SwarmResult()
+        self._lock = threading.Lock()
+
+    def make_bot(self):
+        worker = generate_random_id()
+        hit = generate_random_id()
+        assignment = generate_random_id()
+        url = (
+            "{}/ad?recruiter={}&assignmentId={}&hitId={}&workerId={}&mode=debug".format(
+                self.base_url, self.recruiter, assignment, hit, worker
+            )
+        )
+        bot = self.bot_factory(
+            url, assignment_id=assignment, worker_id=worker, hit_id=hit
+        )
+        bot.http = self.session
+        return bot
+
+    def arrive(self, bot, start, scheduled):
+        """Run a bot scheduled to arrive ``scheduled`` seconds after
+        ``start``, recording how late it started.
+        """
+        actual = time.perf_counter() - start
+        lag_ms = max(actual - scheduled, 0.0) * 1000
+        self.result.arrival_lag.record(lag_ms)
+        with self._lock:
+            self.result.arrivals.append((scheduled, actual))
+            if lag_ms > LATE_ARRIVAL_MS:
+                self.result.delayed += 1
+        self.run_bot(bot)
+
+    def run_bot(self, bot):
+        """Run the synchronous ``bot.run_experiment`` and record its outcome."""
+        with self._lock:
+            self.result.started += 1
+        try:
+            bot.run_experiment()
+        except Exception as err:
+            logger.exception("Bot {} failed".format(bot.worker_id))
+            name = type(err).__name__
+            with self._lock:
+                self.result.failed += 1
+                self.result.errors[name] = self.result.errors.get(name, 0) + 1
+        else:
+            with self._lock:
+                self.result.completed += 1
+
+    def run(self):
+        """Run the swarm to completion and return a :class:`SwarmResult`."""
+        start = time.perf_counter()
+        scheduled = 0.0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for delay in arrival_delays(self.count, self.rate, self.profile):
+                scheduled += delay
+                # Sleep until the scheduled time rather than for the delay,
+                # so that time spent submitting bots does not add up
+                wait = start + scheduled - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+                executor.submit(self.arrive, self.make_bot(), start, scheduled)
+
+        self.result.duration = time.perf_counter() - start
+        self.result.histograms = dict(self.session.histograms)
+        return self.result
@@ -22,7 +22,6 @@ from pathlib import Path
 from unicodedata import normalize
 
 import redis
-from faker import Faker
 from flask import request
 from pythonjsonlogger import jsonlogger
 from sqlalchemy import exc as sa_exc
@@ -69,8 +68,6 @@ def setup_warning_hooks():
     warnings.simplefilter("ignore", category=sa_exc.SAWarning)
 
 
-fake = Faker()
-
 JSON_LOGFILE = "logs.jsonl"
 
 
@@ -138,6 +135,33 @@ def generate_random_id(size=6, chars=string.ascii_uppercase + string.digits):
     return "".join(random.choice(chars) for x in range(size))
 
 
+def generate_password(length=20):
+    """Generate a random alphanumeric password."""
+    from faker import Faker
+
+    return Faker().password(length=length, special_chars=False)
+
+
+_fake = None
+
+
+def __getattr__(name):
+    if name == "fake":
+        warnings.warn(
+            "dallinger.utils.fake is deprecated; use generate_password() or "
+            "create a faker.Faker instance instead.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        global _fake
+        if _fake is None:
+            from faker import Faker
+
+            _fake = Faker()
+        return _fake
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
 def ensure_directory(path):
     """Create a matching path if it does not already exist"""
     if not os.path.exists(path):
@@ -518,7 +542,7 @@ def bootstrap_development_session(exp_config, experiment_path, log):
         }
     )
     if not config.get("dashboard_password", None):
-        config.set("dashboard_password", fake.password(length=20, special_chars=False))
+        config.set("dashboard_password", generate_password())
 
     source_path = Path(dallinger_package_path()) / "dev_server"
     destination_path = develop_target_path(config)
@@ -581,7 +605,7 @@ def setup_experiment(
     )
 
     if not config.get("dashboard_password", None):
-        config.set("dashboard_password", fake.password(length=20, special_chars=False))
+        config.set("dashboard_password", generate_password())
 
     temp_dir = assemble_experiment_temp_dir(log, config, for_remote=not local_checks)
     log("Deployment temp directory: {}".format(temp_dir), chevrons=False)
@@ -18,6 +18,7 @@ def main():
     from redis import BlockingConnectionPool, StrictRedis
     from rq import Queue
 
+    from dallinger import blocking, memory, slow_queries
     from dallinger.config import get_config, initialize_experiment_package
     from dallinger.heroku.rq_gevent_worker import GeventWorker as Worker
     from dallinger.utils import attach_json_logger
@@ -39,6 +40,12 @@ def main():
         level=LOG_LEVEL,
     )
     attach_json_logger(logging.getLogger())
+    if slow_queries.threshold_ms():
+        slow_queries.install()
+    if blocking.threshold_ms():
+        blocking.start("worker")
+    if memory.enabled():
+        memory.start("worker")
     redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
     # Specify queue class for improved performance with gevent.
     # see http://carsonip.me/posts/10x-faster-python-gevent-redis-connection-pool/
@@ -0,0 +1,118 @@
+"""Fixtures for the ORM benchmarks.
+
+Graphs are built with bulk inserts, which bypass ``add_node`` and
+``connect``, so that only the operation under test is timed.
+"""
+
+import pytest
+from sqlalchemy import select
+
+from dallinger.models import Info, Network, Node, Transmission, Vector
+
+#: Number of nodes, neighbors, infos or networks each benchmark runs at.
+SIZES = [10, 100, 1000, 10000]
+
+#: Timed runs of each benchmark. Every run gets freshly loaded objects.
+ROUNDS = 5
+
+
+class GraphBuilder:
+    """Insert graph objects in bulk and return their ids."""
+
+    def __init__(self, session):
+        self.session = session
+
+    def _insert(self, model, rows):
+        if not rows:
+            return []
+        last_id = self.session.execute(
+            select(model.id).order_by(model.id.desc()).limit(1)
+        ).scalar()
+        self.session.execute(model.__table__.insert(), rows)
+        return list(
+            self.session.execute(
+                select(model.id).where(model.id > (last_id or 0)).order_by(model.id)
+            ).scalars()
+        )
+
+    def nodes(self, network_id, count, type="node", **columns):
+        """Add ``count`` nodes to the network. Column values, including
+        ``network_id``, may be callables, which are passed the index of the
+        node.
+        """
+        columns = dict(columns, network_id=network_id, type=type)
+        rows = [
+            {
+                name: value(i) if callable(value) else value
+                for name, value in columns.items()
+            }
+            for i in range(count)
+        ]
+        return self._insert(Node, rows)
+
+    def vectors(self, network_id, pairs):
+        """Connect each ``(origin_id, destination_id)`` pair."""
+        return self._insert(
+            Vector,
+            [
+                {
+                    "origin_id": origin,
+                    "destination_id": destination,
+                    "network_id": network_id,
+                }
+                for origin, destination in pairs
+            ],
+        )
+
+    def infos(self, network_id, origin_id, count):
+        return self._insert(
+            Info,
+            [
+                {
+                    "origin_id": origin_id,
+                    "network_id": network_id,
+                    "type": "info",
+                    "contents": str(i),
+                }
+                for i in range(count)
+            ],
+        )
+
+    def networks(self, count, **columns):
+        rows = [dict(columns, type="network") for _ in range(count)]
+        return self._insert(Network, rows)
+
+    def transmissions(self, network_id, sends, status="pending"):
+        """Transmit along each ``(vector, info, origin, destination)`` of
+        ``sends``, by id.
+        """
+        return self._insert(
+            Transmission,
+            [
+                {
+                    "vector_id": vector_id,
+                    "info_id": info_id,
+                    "origin_id": origin_id,
+                    "destination_id": destination_id,
+                    "network_id": network_id,
+                    "status": status,
+                }
+                for vector_id, info_id, origin_id, destination_id in sends
+            ],
+        )
+
+    def add(self, obj):
+        self.session.add(obj)
+        self.session.commit()
+        return obj
+
+    def fresh(self, model, id):
+        """Reload an object in a clean session, as a new request would."""
+        self.session.commit()
+        self.session.expunge_all()
+        return self.session.get(model, id)
+
+
+@pytest.fixture
+def graph(db_session):
+    return GraphBuilder(db_session)
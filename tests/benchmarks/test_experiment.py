@@ -0,0 +1,32 @@
+"""Benchmarks for ``dallinger.experiment.Experiment``."""
+
+import pytest
+
+from dallinger.models import Participant
+from tests.benchmarks.conftest import ROUNDS, SIZES
+
+
+@pytest.mark.usefixtures("active_config")
+@pytest.mark.parametrize("size", SIZES)
+def test_get_network_for_participant(benchmark, graph, a, size):
+    """Choose among ``size`` networks, half of which the participant has
+    already joined.
+    """
+    from dallinger.experiment import Experiment
+
+    benchmark.group = "get_network_for_participant"
+    exp = Experiment()
+    participant_id = a.participant().id
+    network_ids = graph.networks(size, role="experiment")
+    joined = network_ids[::2]
+    graph.nodes(lambda i: joined[i], len(joined), participant_id=participant_id)
+
+    def setup():
+        return (graph.fresh(Participant, participant_id),), {}
+
+    def get_network(participant):
+        return exp.get_network_for_participant(participant)
+
+    network = benchmark.pedantic(get_network, setup=setup, rounds=ROUNDS)
+    assert network.id in network_ids
+    assert network.id not in joined
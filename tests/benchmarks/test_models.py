@@ -0,0 +1,114 @@
+"""Benchmarks for the graph methods of ``dallinger.models``."""
+
+import pytest
+
+from dallinger.models import Info, Network, Node
+from tests.benchmarks.conftest import ROUNDS, SIZES
+
+
+@pytest.fixture
+def network_id(graph):
+    return graph.add(Network()).id
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_neighbors(benchmark, graph, network_id, size):
+    benchmark.group = "neighbors"
+    center, *others = graph.nodes(network_id, size + 1)
+    graph.vectors(network_id, [(center, other) for other in others])
+
+    def setup():
+        return (graph.fresh(Node, center),), {}
+
+    def neighbors(node):
+        return node.neighbors()
+
+    assert len(benchmark.pedantic(neighbors, setup=setup, rounds=ROUNDS)) == size
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_transmit(benchmark, graph, network_id, size):
+    """Transmit an info to ``size`` neighbors."""
+    benchmark.group = "transmit"
+    source, *others = graph.nodes(network_id, size + 1)
+    graph.vectors(network_id, [(source, other) for other in others])
+    (info_id,) = graph.infos(network_id, source, 1)
+
+    def setup():
+        node = graph.fresh(Node, source)
+        return (node, graph.session.get(Info, info_id)), {}
+
+    def transmit(node, info):
+        transmissions = node.transmit(what=info)
+        graph.session.commit()
+        return transmissions
+
+    assert len(benchmark.pedantic(transmit, setup=setup, rounds=ROUNDS)) == size
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_receive(benchmark, graph, network_id, size):
+    """Receive ``size`` pending transmissions."""
+    benchmark.group = "receive"
+    source, destination = graph.nodes(network_id, 2)
+    (vector,) = graph.vectors(network_id, [(source, destination)])
+    info_ids = graph.infos(network_id, source, size)
+
+    def setup():
+        graph.transmissions(
+            network_id,
+            [(vector, info_id, source, destination) for info_id in info_ids],
+        )
+        return (graph.fresh(Node, destination),), {}
+
+    def receive(node):
+        node.receive()
+        graph.session.commit()
+
+    benchmark.pedantic(receive, setup=setup, rounds=ROUNDS)
+    node = graph.fresh(Node, destination)
+    assert node.transmissions(direction="incoming", status="pending") == []
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_received_infos(benchmark, graph, network_id, size):
+    benchmark.group = "received_infos"
+    source, destination = graph.nodes(network_id, 2)
+    (vector,) = graph.vectors(network_id, [(source, destination)])
+    info_ids = graph.infos(network_id, source, size)
+    graph.transmissions(
+        network_id,
+        [(vector, info_id, source, destination) for info_id in info_ids],
+        status="received",
+    )
+
+    def setup():
+        return (graph.fresh(Node, destination),), {}
+
+    def received_infos(node):
+        return node.received_infos()
+
+    infos = benchmark.pedantic(received_infos, setup=setup, rounds=ROUNDS)
+    assert len(infos) == size
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_fail_cascade(benchmark, graph, network_id, size):
+    """Fail a node with ``size`` vectors, infos and transmissions."""
+    benchmark.group = "fail"
+
+    def setup():
+        node, *others = graph.nodes(network_id, size + 1)
+        vectors = graph.vectors(network_id, [(node, other) for other in others])
+        infos = graph.infos(network_id, node, size)
+        graph.transmissions(network_id, zip(vectors, infos, [node] * size, others))
+        return (graph.fresh(Node, node),), {}
+
+    def fail(node):
+        node.fail()
+        graph.session.commit()
+        return node
+
+    node = benchmark.pedantic(fail, setup=setup, rounds=ROUNDS)
+    assert node.failed
+    assert node.vectors(failed=True)[0].failed_reason == "->Node{}".format(node.id)
@@ -0,0 +1,116 @@
+"""Benchmarks for adding a node to each type of network."""
+
+import pytest
+
+from dallinger import networks
+from dallinger.models import Network, Node
+from dallinger.nodes import Agent
+from tests.benchmarks.conftest import ROUNDS, SIZES
+from tests.test_networks import GenerationalAgent
+
+GENERATION_SIZE = 10
+
+
+def chain(graph, network_id, node_ids):
+    graph.vectors(network_id, zip(node_ids, node_ids[1:]))
+
+
+def ring(graph, network_id, node_ids):
+    """Connect every node to the next, both ways."""
+    pairs = list(zip(node_ids, node_ids[1:] + node_ids[:1]))
+    graph.vectors(network_id, pairs + [(b, a) for a, b in pairs])
+
+
+def star(graph, network_id, node_ids, both=True):
+    center, *others = node_ids
+    pairs = [(center, other) for other in others]
+    if both:
+        pairs += [(other, center) for other in others]
+    graph.vectors(network_id, pairs)
+
+
+def populate(graph, network_id, size, connect=None):
+    node_ids = graph.nodes(network_id, size, type="agent")
+    if connect is not None:
+        connect(graph, network_id, node_ids)
+    return Agent
+
+
+def populate_generations(graph, network_id, size):
+    graph.nodes(
+        network_id,
+        size,
+        type="test_agent",
+        property1="1.0",
+        property2=lambda i: repr(i // GENERATION_SIZE),
+    )
+    return GenerationalAgent
+
+
+NETWORK_TYPES = {
+    "burst": (
+        networks.Burst,
+        lambda graph, net, size: populate(
+            graph, net, size, lambda *args: star(*args, both=False)
+        ),
+    ),
+    "chain": (
+        networks.Chain,
+        lambda graph, net, size: populate(graph, net, size, chain),
+    ),
+    "delayed_chain": (
+        networks.DelayedChain,
+        lambda graph, net, size: populate(graph, net, size, chain),
+    ),
+    "discrete_generational": (
+        lambda size: networks.DiscreteGenerational(
+            generations=size // GENERATION_SIZE + ROUNDS + 1,
+            generation_size=GENERATION_SIZE,
+            initial_source=False,
+        ),
+        populate_generations,
+    ),
+    "empty": (networks.Empty, populate),
+    "fully_connected": (networks.FullyConnected, populate),
+    "scale_free": (
+        lambda size: networks.ScaleFree(m0=2, m=2),
+        lambda graph, net, size: populate(graph, net, size, ring),
+    ),
+    "sequential_microsociety": (
+        lambda size: networks.SequentialMicrosociety(n=3),
+        populate,
+    ),
+    "star": (
+        networks.Star,
+        lambda graph, net, size: populate(graph, net, size, star),
+    ),
+}
+
+
+def make_network(network_type, size):
+    factory = NETWORK_TYPES[network_type][0]
+    if isinstance(factory, type):
+        return factory()
+    return factory(size)
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("network_type", sorted(NETWORK_TYPES))
+def test_add_node(benchmark, graph, network_type, size):
+    """Create a node and add it to a network that already has ``size``
+    nodes, as ``/node`` does.
+    """
+    benchmark.group = "add_node[{}]".format(network_type)
+    network_id = graph.add(make_network(network_type, size)).id
+    node_class = NETWORK_TYPES[network_type][1](graph, network_id, size)
+
+    def setup():
+        return (graph.fresh(Network, network_id),), {}
+
+    def add_node(network):
+        node = node_class(network=network)
+        network.add_node(node)
+        graph.session.commit()
+
+    benchmark.pedantic(add_node, setup=setup, rounds=ROUNDS)
+    assert graph.session.query(Node).count() == size + ROUNDS
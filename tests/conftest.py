@@ -1,3 +1,4 @@
+import importlib.util
 import json
 import os
 from datetime import datetime
@@ -8,6 +9,11 @@ from tzlocal import get_localzone
 
 pytest_plugins = ["pytest_dallinger"]
 
+# The ORM benchmarks need pytest-benchmark, from the dev requirements
+collect_ignore = []
+if importlib.util.find_spec("pytest_benchmark") is None:
+    collect_ignore.append("benchmarks")
+
 
 @pytest.fixture(scope="module")
 def check_firefox(request):
@@ -315,11 +321,15 @@ def pytest_collection_modifyitems(config, items):
         run_docker = True
     skip_slow = pytest.mark.skip(reason="need --runslow option to run")
     skip_docker = pytest.mark.skip(reason="need RUN_DOCKER environment variable")
+    run_benchmarks = config.getoption("--benchmark-only", default=False)
+    skip_benchmark = pytest.mark.skip(reason="need --benchmark-only option to run")
     for item in items:
         if "slow" in item.keywords and not run_slow:
             item.add_marker(skip_slow)
         if "docker" in item.keywords and not run_docker:
             item.add_marker(skip_docker)
+        if "benchmark" in getattr(item, "fixturenames", ()) and not run_benchmarks:
+            item.add_marker(skip_benchmark)
 
 
 def pytest_configure():
@@ -0,0 +1,183 @@
+import time
+from unittest import mock
+
+import gevent
+import pytest
+from gevent import events
+
+from dallinger import blocking, monitoring
+
+
+@pytest.fixture
+def process():
+    with mock.patch.object(
+        blocking, "_process", monitoring.MonitoredProcess("web", "host:1")
+    ):
+        yield
+
+
+def report(context="GET /summary", **kw):
+    values = {
+        "time": time.time(),
+        "process": "web",
+        "process_id": "host:1",
+        "context": context,
+        "threshold_ms": 100.0,
+        "stack": "File experiment.py, line 12, in info_post_request",
+    }
+    values.update(kw)
+    return values
+
+
+class TestContext:
+    def test_attributed_greenlet(self):
+        greenlet = gevent.spawn(lambda: None)
+        blocking.attribute(greenlet, "GET /summary")
+
+        assert blocking.context_of(greenlet) == "GET /summary"
+
+    def test_falls_back_to_the_function_a_greenlet_runs(self):
+        class Experiment:
+            def background_task(self):
+                pass
+
+        greenlet = gevent.spawn(Experiment().background_task)
+
+        assert blocking.context_of(greenlet) == (
+            "greenlet TestContext.test_falls_back_to_the_function_a_greenlet_runs"
+            ".<locals>.Experiment.background_task"
+        )
+
+    def test_unknown(self):
+        assert blocking.context_of(gevent.getcurrent()) == "-"
+
+
+class TestEvents:
+    @pytest.fixture(autouse=True)
+    def last_blocked(self):
+        with mock.patch("dallinger.blocking._last_blocked", (None, 0.0)):
+            yield
+
+    def test_reports_from_a_hub_callback(self, process):
+        hub = mock.Mock()
+        greenlet = gevent.spawn(lambda: None)
+        blocking.attribute(greenlet, "worker AssignmentSubmitted")
+        event = events.EventLoopBlocked(greenlet, 0.1, ["line 1", "line 2"], hub=hub)
+
+        blocking._on_event(event)
+
+        (spawn, record, data), _ = hub.loop.run_callback_threadsafe.call_args
+        assert spawn is gevent.spawn
+        assert record is blocking.record
+        assert data["context"] == "worker AssignmentSubmitted"
+        assert data["process"] == "web"
+        assert data["threshold_ms"] == 100.0
+        assert data["stack"] == "line 1\nline 2"
+
+    def test_reports_continuous_blocking_once(self, process):
+        hub = mock.Mock()
+        greenlet = gevent.spawn(lambda: None)
+        event = events.EventLoopBlocked(greenlet, 0.1, [], hub=hub)
+
+        blocking._on_event(event)
+        blocking._on_event(event)
+        with mock.patch("time.time", return_value=time.time() + 1):
+            blocking._on_event(event)
+
+        assert hub.loop.run_callback_threadsafe.call_count == 2
+
+    def test_ignores_other_events(self):
+        blocking._on_event(object())
+
+    def test_record(self, redis_conn):
+        blocking.record(report())
+        blocking.record(report())
+        blocking.record(report(context='worker "quoted"', process="worker"))
+
+        assert blocking.counts() == [
+            ("web", "GET /summary", 2),
+            ("worker", 'worker "quoted"', 1),
+        ]
+        assert [e["context"] for e in blocking.recent_events()] == [
+            'worker "quoted"',
+            "GET /summary",
+            "GET /summary",
+        ]
+
+    def test_keeps_recent_events_only(self, redis_conn):
+        with mock.patch("dallinger.blocking.MAX_EVENTS", 2):
+            for i in range(3):
+                blocking.record(report(context=str(i)))
+
+        assert [e["context"] for e in blocking.recent_events()] == ["2", "1"]
+        assert blocking.counts()[0][2] == 1
+
+    def test_clear(self, redis_conn):
+        blocking.record(report())
+        blocking.clear()
+
+        assert blocking.counts() == []
+        assert blocking.recent_events() == []
+
+
+class TestMonitoring:
+    @pytest.fixture
+    def monitoring(self, active_config, redis_conn):
+        active_config.extend({"gevent_max_blocking_ms": 50})
+        hub = gevent.get_hub()
+        config = (
+            gevent.config.max_blocking_time,
+            gevent.config.monitor_thread,
+            gevent.config.print_blocking_reports,
+        )
+        with mock.patch.object(blocking, "_process", monitoring.MonitoredProcess()):
+            blocking.start("web")
+            yield
+        hub.periodic_monitoring_thread.kill()
+        hub.periodic_monitoring_thread = None
+        events.subscribers.remove(blocking._on_event)
+        (
+            gevent.config.max_blocking_time,
+            gevent.config.monitor_thread,
+            gevent.config.print_blocking_reports,
+        ) = config
+
+    def test_reports_blocking_greenlet(self, monitoring):
+        def info_post_request():
+            time.sleep(0.3)
+
+        greenlet = gevent.spawn(info_post_request)
+        blocking.attribute(greenlet, "POST /info/<int:node_id>")
+        greenlet.join()
+        for _ in range(20):
+            gevent.sleep(0.05)
+            if blocking.recent_events():
+                break
+
+        (event,) = blocking.recent_events()
+        assert event["context"] == "POST /info/<int:node_id>"
+        assert "info_post_request" in event["stack"]
+        assert blocking.counts() == [("web", "POST /info/<int:node_id>", 1)]
+
+
+@pytest.mark.usefixtures("experiment_dir_merged")
+class TestDashboard:
+    def test_requires_login(self, webapp):
+        assert webapp.get("/dashboard/event_loop").status_code == 401
+
+    def test_lists_events(self, redis_conn, webapp_admin):
+        blocking.record(report())
+
+        page = webapp_admin.get("/dashboard/event_loop").data.decode("utf8")
+        assert "<code>GET /summary</code>" in page
+        assert "in info_post_request" in page
+
+        resp = webapp_admin.get("/dashboard/event_loop?format=json")
+        assert resp.json["counts"] == [["web", "GET /summary", 1]]
+
+    def test_clear(self, redis_conn, webapp_admin):
+        blocking.record(report())
+
+        webapp_admin.post("/dashboard/event_loop/clear")
+
+        assert blocking.recent_events() == []
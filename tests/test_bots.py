@@ -179,3 +179,9 @@ class TestHighPerformanceBot:
         )
         # returns the response object
         assert response.dummy == 1
+
+    def test_requests_use_http_attribute(self, bot, req_post):
+        bot.http = mock.Mock()
+        bot.sign_off()
+        bot.http.post.assert_called_once()
+        req_post.assert_not_called()
@@ -1305,3 +1305,45 @@ def test_get_editable_dallinger_path():
             ]
             result = get_editable_dallinger_path()
             assert result == "/a path/where many/directories/have/a/space/in them"
+
+
+class TestReplayCache:
+    @pytest.fixture
+    def replay_cache(self):
+        from dallinger.command_line import replay_cache
+
+        return replay_cache
+
+    @pytest.fixture
+    def data(self):
+        with mock.patch("dallinger.command_line.data") as data:
+            yield data
+
+    def test_list(self, replay_cache, data):
+        data.list_cached_imports.return_value = [
+            {"name": "dallinger-replay-abc", "source": "x-data.zip", "size": 2e6}
+        ]
+        result = CliRunner().invoke(replay_cache, ["list"])
+        assert result.exit_code == 0
+        assert "dallinger-replay-abc" in result.output
+        assert "x-data.zip" in result.output
+
+    def test_list_empty(self, replay_cache, data):
+        data.list_cached_imports.return_value = []
+        result = CliRunner().invoke(replay_cache, ["list"])
+        assert "No cached replay imports found." in result.output
+
+    def test_evict_requires_names_or_all(self, replay_cache, data):
+        result = CliRunner().invoke(replay_cache, ["evict"])
+        assert result.exit_code != 0
+        data.evict_cached_imports.assert_not_called()
+
+    def test_evict_names(self, replay_cache, data):
+        data.evict_cached_imports.return_value = ["dallinger-replay-abc"]
+        CliRunner().invoke(replay_cache, ["evict", "dallinger-replay-abc"])
+        data.evict_cached_imports.assert_called_once_with(("dallinger-replay-abc",))
+
+    def test_evict_all(self, replay_cache, data):
+        data.evict_cached_imports.return_value = []
+        CliRunner().invoke(replay_cache, ["evict", "--all"])
+        data.evict_cached_imports.assert_called_once_with(None)
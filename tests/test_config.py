@@ -1,5 +1,7 @@
 import os
+import time
 from tempfile import NamedTemporaryFile
+from unittest import mock
 
 import pytest
 
@@ -244,6 +246,83 @@ worldwide = false
         redis_conn.set("auto_recruit", 1)
         assert active_config.get("auto_recruit") is True
 
+    def test_resolved_values_are_memoized(self):
+        config = Configuration()
+        config.register("num_participants", int)
+        config.extend({"num_participants": 1})
+        config.ready = True
+        assert config.get("num_participants") == 1
+        with mock.patch.object(config, "_layers_by_priority") as layers:
+            assert config.get("num_participants") == 1
+            layers.assert_not_called()
+
+    def test_memoized_values_reset_on_changes(self):
+        config = Configuration()
+        config.register("num_participants", int)
+        config.ready = True
+        assert config.get("num_participants", None) is None
+        config.set("num_participants", 1)
+        assert config.get("num_participants") == 1
+        with config.override({"num_participants": 2}):
+            assert config.get("num_participants") == 2
+        assert config.get("num_participants") == 1
+        config.extend({"num_participants": 3})
+        assert config.get("num_participants") == 3
+
+    def test_auto_recruit_cached_until_change_is_published(
+        self, active_config, redis_conn
+    ):
+        from dallinger.config import changeable_values
+
+        active_config.set("auto_recruit", False)
+        assert active_config.get("auto_recruit") is False
+        with mock.patch.object(redis_conn, "get") as get:
+            assert active_config.get("auto_recruit") is False
+            get.assert_not_called()
+
+        changeable_values.set("auto_recruit", 1)
+        assert active_config.get("auto_recruit") is True
+
+    def test_auto_recruit_invalidated_by_other_processes(
+        self, active_config, redis_conn
+    ):
+        from dallinger.config import CHANGEABLE_PARAMS_CHANNEL, changeable_values
+
+        active_config.set("auto_recruit", False)
+        assert active_config.get("auto_recruit") is False
+        redis_conn.set("auto_recruit", 1)
+        redis_conn.publish(CHANGEABLE_PARAMS_CHANNEL, "auto_recruit")
+        for _ in range(50):
+            if "auto_recruit" not in changeable_values.values:
+                break
+            time.sleep(0.1)
+        assert active_config.get("auto_recruit") is True
+
+    def test_value_invalidated_while_read_is_not_cached(
+        self, active_config, redis_conn
+    ):
+        from dallinger.config import CHANGEABLE_PARAMS_CHANNEL, changeable_values
+
+        assert changeable_values._subscribed()
+        changeable_values.clear()
+        redis_conn.set("auto_recruit", 1)
+        read = redis_conn.get
+
+        def get(key):
+            value = read(key)
+            # Another process turns auto recruitment off after this read
+            changeable_values._invalidate(
+                {"channel": CHANGEABLE_PARAMS_CHANNEL, "data": b"auto_recruit"}
+            )
+            return value
+
+        with mock.patch.object(redis_conn, "get", side_effect=get):
+            assert changeable_values.get("auto_recruit") == b"1"
+        assert "auto_recruit" not in changeable_values.values
+
+        assert changeable_values.get("auto_recruit") == b"1"
+        assert changeable_values.values["auto_recruit"] == b"1"
+
 
 @pytest.mark.usefixtures("experiment_dir_merged")
 class TestConfigurationIntegrationTests:
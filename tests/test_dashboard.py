@@ -1,4 +1,6 @@
 import codecs
+import json
+from datetime import datetime, timedelta
 from unittest import mock
 
 import pytest
@@ -514,6 +516,42 @@ class TestDashboardMonitorRoute:
             resp_text = resp.data.decode("utf8")
             assert '"custom_vis_option": 3' in resp_text
 
+    def test_structure_url_keeps_filters(self, webapp_admin):
+        resp = webapp_admin.get("/dashboard/monitoring?network_roles=test")
+        assert resp.status_code == 200
+        assert "/dashboard/network_structure?network_roles=test" in resp.data.decode(
+            "utf8"
+        )
+
+    def test_network_structure_requires_login(self, webapp):
+        assert webapp.get("/dashboard/network_structure").status_code == 401
+
+    def test_network_structure_route(self, webapp_admin, a):
+        network = a.network()
+        resp = webapp_admin.get("/dashboard/network_structure")
+        assert resp.status_code == 200
+        assert resp.content_type == "application/json"
+        data = resp.json
+        assert network.id in [n["id"] for n in data["networks"]]
+        assert data["page"] == 0
+        assert data["has_more"] is False
+        datetime.fromisoformat(data["next_since"])
+
+    def test_network_structure_route_since(self, webapp_admin, a):
+        a.network()
+        since = (datetime.now() + timedelta(minutes=1)).isoformat()
+        resp = webapp_admin.get(
+            "/dashboard/network_structure", query_string={"since": since}
+        )
+        assert resp.status_code == 200
+        assert resp.json["networks"] == []
+
+    def test_network_structure_route_bad_since(self, webapp_admin):
+        resp = webapp_admin.get(
+            "/dashboard/network_structure", query_string={"since": "yesterday"}
+        )
+        assert resp.status_code == 400
+
 
 @pytest.mark.usefixtures("experiment_dir_merged", "webapp")
 class TestDashboardNetworkInfo:
@@ -657,6 +695,98 @@ class TestDashboardNetworkInfo:
         assert len(network_structure["participants"]) == 1
         assert len(network_structure["trans"]) == 0
 
+    def test_network_structure_since(self, multinetwork_experiment):
+        structure = multinetwork_experiment.network_structure(
+            transformations="on", since=datetime.now() + timedelta(minutes=1)
+        )
+        for key in ("networks", "nodes", "vectors", "infos", "participants", "trans"):
+            assert structure[key] == []
+
+        structure = multinetwork_experiment.network_structure(
+            transformations="on", since=datetime.now() - timedelta(minutes=1)
+        )
+        assert len(structure["networks"]) == 2
+        assert len(structure["infos"]) == 4
+
+    def test_network_structure_delta_pages(self, multinetwork_experiment):
+        first = multinetwork_experiment.network_structure_delta(page_size=1)
+        assert first["page"] == 0
+        assert first["has_more"] is True
+        assert first["network_ids"] == [1]
+        assert [n["id"] for n in first["networks"]] == [1]
+        assert {i["id"] for i in first["infos"]} == {1, 2}
+        assert len(first["participants"]) == 1
+
+        second = multinetwork_experiment.network_structure_delta(page=1, page_size=1)
+        assert second["has_more"] is False
+        assert second["network_ids"] == [2]
+        assert {i["id"] for i in second["infos"]} == {3, 4}
+        # Participants are only sent with the first page
+        assert second["participants"] == []
+
+    def test_network_structure_delta_includes_touched_networks(
+        self, multinetwork_experiment, a, db_session
+    ):
+        from dallinger.models import Network, Node
+
+        since = datetime.now()
+        db_session.query(Network).update(
+            {Network.creation_time: since - timedelta(minutes=1)}
+        )
+        db_session.query(Node).update(
+            {Node.creation_time: since - timedelta(minutes=1)}
+        )
+        source = Node.query.get(2)
+        info = a.info(origin=source, contents="new contents")
+
+        delta = multinetwork_experiment.network_structure_delta(since=since)
+        assert [i["id"] for i in delta["infos"]] == [info.id]
+        assert delta["nodes"] == []
+        # The network's counts changed, so it is sent along with the info
+        assert [n["id"] for n in delta["networks"]] == [2]
+        assert delta["networks"][0]["n_completed_infos"] == 3
+
+    def test_stream_table_chunks(self, multinetwork_experiment):
+        chunks = list(multinetwork_experiment.stream_table("info", chunk_size=3))
+        assert [len(chunk) for chunk in chunks] == [3, 1]
+        assert [info.id for chunk in chunks for info in chunk] == [1, 2, 3, 4]
+
+    def test_stream_table_serialize(self, multinetwork_experiment):
+        (chunk,) = multinetwork_experiment.stream_table("node", serialize=True)
+        assert [node["id"] for node in chunk] == [1, 2]
+        assert {node["type"] for node in chunk} == {"random_binary_string_source"}
+
+    def test_stream_table_uses_one_query(self, multinetwork_experiment, a, db_session):
+        from sqlalchemy import event
+
+        network = a.network()
+        a.node(network=network)
+        a.source(network=network)
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            nodes = multinetwork_experiment.pull_table("node")
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        assert len(statements) == 1
+        assert [type(node).__name__ for node in nodes] == [
+            "RandomBinaryStringSource",
+            "RandomBinaryStringSource",
+            "Node",
+            "RandomBinaryStringSource",
+        ]
+
+    def test_pull_table_filtered_out(self, multinetwork_experiment):
+        experiment = multinetwork_experiment
+        assert experiment.pull_table("participant", cls_filter=lambda cls: False) == []
+        assert experiment.summarize_table("node", cls_filter=lambda cls: False) == []
+
     def test_custom_node_html(self, multinetwork_experiment):
         custom_html = multinetwork_experiment.node_visualization_html("Info", 1)
         assert custom_html == ""
@@ -668,6 +798,106 @@ class TestDashboardNetworkInfo:
             assert custom_html is node_html
 
 
+@pytest.mark.usefixtures("experiment_dir_merged")
+class TestDashboardLogs:
+    @pytest.fixture
+    def logfile(self, tmpdir):
+        path = tmpdir.join("logs.jsonl").strpath
+        with open(path, "w") as f:
+            for i in range(1, 31):
+                line = {"message": f"message {i}", "levelname": "INFO"}
+                f.write(json.dumps(line) + "\n")
+        with mock.patch("dallinger.experiment_server.dashboard.JSON_LOGFILE", path):
+            yield path
+
+    def test_logs_range(self, logfile, webapp_admin):
+        resp = webapp_admin.get("/dashboard/logs/range?start=20&end=22")
+        assert resp.status_code == 200
+        assert [line["log_line_number"] for line in resp.json] == [20, 21, 22]
+        assert "message 20" in resp.json[0]["message"]
+
+    def test_logs_range_past_end(self, logfile, webapp_admin):
+        resp = webapp_admin.get("/dashboard/logs/range?start=40&end=45")
+        assert resp.status_code == 400
+
+    def test_logs_find_lines(self, logfile, webapp_admin):
+        resp = webapp_admin.get("/dashboard/logs/find_lines?query=message%202&limit=2")
+        events = [
+            json.loads(event[len("data:") :])
+            for event in resp.data.decode("utf8").split("\n\n")
+            if event
+        ]
+        assert [event.get("log_line_number") for event in events] == [2, 20, None]
+        assert events[-1] == {"stop": True}
+
+    def test_logs_find_line_number(self, logfile, webapp_admin):
+        resp = webapp_admin.post(
+            "/dashboard/logs/find_line_number", json={"query": "message 2"}
+        )
+        assert resp.json == {"line_number": 29}
+
+
+@pytest.mark.usefixtures("experiment_dir_merged")
+class TestDashboardProfiling:
+    @pytest.fixture
+    def profiler(self):
+        from dallinger.experiment_server.profiling import profiler
+
+        profiler.clear()
+        yield profiler
+        profiler.clear()
+
+    def test_requires_login(self, webapp):
+        assert webapp.get("/dashboard/profiling").status_code == 401
+
+    def test_shows_notice_when_disabled(self, profiler, webapp_admin):
+        webapp_admin.get("/summary")
+        resp = webapp_admin.get("/dashboard/profiling")
+
+        assert resp.status_code == 200
+        assert "Request profiling is off" in resp.data.decode("utf8")
+        assert len(profiler.window) == 0
+
+    def test_records_queries_and_commits_by_route(
+        self, active_config, profiler, webapp_admin
+    ):
+        active_config.extend({"request_profiling": True})
+        webapp_admin.post("/participant/1/1/1/debug")
+        webapp_admin.post("/participant/2/2/2/debug")
+
+        resp = webapp_admin.get("/dashboard/profiling?format=json")
+
+        routes = {(r["method"], r["route"]): r for r in resp.json["routes"]}
+        create = routes[
+            (
+                "POST",
+                "/participant/<worker_id>/<hit_id>/<assignment_id>/<mode>",
+            )
+        ]
+        assert create["count"] == 2
+        assert create["errors"] == 0
+        assert create["sql_count"] > 0
+        assert create["commits"] >= 1
+        assert create["mean_ms"] >= create["sql_ms"]
+
+    def test_renders_routes(self, active_config, profiler, webapp_admin):
+        active_config.extend({"request_profiling": True})
+        webapp_admin.get("/summary")
+
+        resp = webapp_admin.get("/dashboard/profiling")
+
+        assert "<code>GET /summary</code>" in resp.data.decode("utf8")
+
+    def test_clear(self, active_config, profiler, webapp_admin):
+        active_config.extend({"request_profiling": True})
+        webapp_admin.get("/summary")
+
+        webapp_admin.post("/dashboard/profiling/clear")
+
+        # Only the clear request itself remains
+        assert [p.route for p in profiler.window] == ["/dashboard/profiling/clear"]
+
+
 @pytest.mark.usefixtures("experiment_dir_merged")
 class TestDashboardLifeCycleRoutes:
     def test_requires_login(self, webapp):
@@ -792,6 +1022,136 @@ class TestDashboardDatabase:
         ids = [d["id"] for d in page_all["data"]]
         assert ids == [2, 1]
 
+    def test_table_data_reports_searchable_columns(self, db_session):
+        from dallinger.experiment_server.experiment_server import Experiment
+        from dallinger.models import Participant
+
+        page = Experiment().table_data(table="participant", start=0, length=10)
+        columns = [col.name for col in Participant.__table__.columns]
+        assert page["searchable_columns"] == columns
+
+    def test_table_data_search_with_index(self, a, db_session):
+        from dallinger.experiment_server.experiment_server import Experiment
+
+        exp = Experiment()
+        p1 = a.participant(worker_id="W_AAA")
+        p2 = a.participant(worker_id="W_BBB")
+
+        with mock.patch(
+            "dallinger.experiment.indexed_search_columns",
+            return_value=("worker_id",),
+        ):
+            page = exp.table_data(
+                table="participant", start=0, length=50, search_value="W_BBB"
+            )
+            assert [row["id"] for row in page["data"]] == [p2.id]
+            assert "worker_id" in page["searchable_columns"]
+            assert "id" in page["searchable_columns"]
+            # Only indexed columns are searched as text
+            assert "status" not in page["searchable_columns"]
+            page = exp.table_data(
+                table="participant", start=0, length=50, search_value="working"
+            )
+            assert page["filtered_count"] == 0
+            # The integer primary key is matched exactly
+            page = exp.table_data(
+                table="participant", start=0, length=50, search_value=str(p1.id)
+            )
+            assert [row["id"] for row in page["data"]] == [p1.id]
+            # Other integer columns are not indexed
+            assert "network_id" not in exp.searchable_columns("info")
+
+    def test_table_data_keyset_pagination(self, a, db_session):
+        from dallinger.experiment_server.experiment_server import Experiment
+
+        exp = Experiment()
+        ids = [a.participant(worker_id=str(i)).id for i in range(5)]
+
+        first = exp.table_data(table="participant", start=0, length=2)
+        assert [row["id"] for row in first["data"]] == ids[:2]
+        second = exp.table_data(
+            table="participant", start=2, length=2, after=first["data"][-1]["id"]
+        )
+        assert [row["id"] for row in second["data"]] == ids[2:4]
+
+        first = exp.table_data(
+            table="participant", start=0, length=2, order_column="id", order_dir="desc"
+        )
+        second = exp.table_data(
+            table="participant",
+            start=2,
+            length=2,
+            order_column="id",
+            order_dir="desc",
+            after=first["data"][-1]["id"],
+        )
+        assert [row["id"] for row in second["data"]] == ids[::-1][2:4]
+
+    def test_table_data_keyset_ignored_for_nullable_columns(self, a, db_session):
+        from dallinger.experiment_server.experiment_server import Experiment
+
+        exp = Experiment()
+        ids = [a.participant(worker_id=str(i)).id for i in range(4)]
+        # base_pay is nullable, so rows are paged with OFFSET
+        page = exp.table_data(
+            table="participant",
+            start=2,
+            length=2,
+            order_column="base_pay",
+            after=ids[3],
+        )
+        assert len(page["data"]) == 2
+
+    def test_table_data_counts(self, a, db_session):
+        from dallinger.experiment_server.experiment_server import Experiment
+
+        exp = Experiment()
+        a.participant(worker_id="W_AAA")
+        a.participant(worker_id="W_BBB")
+        page = exp.table_data(
+            table="participant", start=0, length=10, search_value="W_BBB"
+        )
+        assert page["total_count"] == 2
+        assert page["filtered_count"] == 1
+
+    def test_table_data_column_filters(self, a, db_session):
+        from dallinger.experiment_server.experiment_server import Experiment
+
+        exp = Experiment()
+        a.participant(worker_id="W_AAA", hit_id="H1")
+        p2 = a.participant(worker_id="W_BBB", hit_id="H2")
+        p3 = a.participant(worker_id="W_CCC", hit_id="H2")
+
+        page = exp.table_data(
+            table="participant",
+            start=0,
+            length=10,
+            column_filters={"hit_id": ["H2"]},
+        )
+        assert [row["id"] for row in page["data"]] == [p2.id, p3.id]
+        assert page["total_count"] == 3
+        assert page["filtered_count"] == 2
+
+        page = exp.table_data(
+            table="participant",
+            start=0,
+            length=10,
+            search_value="W_CCC",
+            column_filters={"hit_id": ["H1", "H2"]},
+        )
+        assert [row["id"] for row in page["data"]] == [p3.id]
+        assert page["filtered_count"] == 1
+
+    def test_table_data_serializes_values(self, a, db_session):
+        from dallinger.experiment_server.experiment_server import Experiment
+
+        participant = a.participant(worker_id="W_AAA")
+        participant.details = {"answers": (1, 2), "nested": {"flag": True}}
+        page = Experiment().table_data(table="participant", start=0, length=10)
+        (row,) = page["data"]
+        assert row["creation_time"] == participant.creation_time.isoformat()
+        assert row["details"] == {"answers": [1, 2], "nested": {"flag": True}}
+
     def test_prep_datatables_options(self):
         """Ensure server-side flags and column normalization are applied."""
         from dallinger.experiment_server.dashboard import prep_datatables_options
@@ -860,6 +1220,90 @@ class TestDashboardDatabase:
         assert any(o["label"] == o["value"].capitalize() for o in opts)
         assert all({"label", "value", "total", "count"} <= set(o.keys()) for o in opts)
 
+    def test_table_search_panes_cached(self, a, db_session):
+        from dallinger.db import TABLE_VERSION_TTL
+        from dallinger.experiment_server.experiment_server import Experiment
+
+        exp = Experiment()
+        a.participant(worker_id="W1", hit_id="H1")
+        db_session.commit()
+        kwargs = {
+            "table": "participant",
+            "polymorphic_identity": None,
+            "search_value": "",
+            "pane_columns": ["hit_id"],
+            "column_filters": {},
+            "threshold": 1,
+        }
+
+        with mock.patch.object(
+            exp, "compute_search_panes", wraps=exp.compute_search_panes
+        ) as compute:
+            with mock.patch("time.time", return_value=1000.0):
+                first = exp.table_search_panes(**kwargs)
+                assert exp.table_search_panes(**kwargs) == first
+                assert compute.call_count == 1
+                assert first["pending"] == []
+                assert [o["value"] for o in first["options"]["hit_id"]] == ["H1"]
+
+            # Changes are picked up once the table version expires
+            a.participant(worker_id="W2", hit_id="H2")
+            db_session.commit()
+            with mock.patch("time.time", return_value=1000.0 + TABLE_VERSION_TTL):
+                panes = exp.table_search_panes(**kwargs)
+            assert compute.call_count == 2
+            assert {o["value"] for o in panes["options"]["hit_id"]} == {"H1", "H2"}
+
+    def test_table_search_panes_large_table_in_background(
+        self, a, db_session, redis_conn
+    ):
+        from dallinger.experiment_server import worker_events
+        from dallinger.experiment_server.experiment_server import Experiment
+
+        exp = Experiment()
+        a.participant(worker_id="W1", hit_id="H1")
+        db_session.commit()
+        kwargs = {
+            "table": "participant",
+            "polymorphic_identity": None,
+            "search_value": "",
+            "pane_columns": ["hit_id", "worker_id", "object_type"],
+            "column_filters": {},
+            "threshold": 1,
+        }
+        distinct = {"hit_id": 10, "worker_id": 10**6}
+
+        with (
+            mock.patch(
+                "dallinger.experiment.estimated_table_count", return_value=10**6
+            ),
+            mock.patch(
+                "dallinger.experiment.estimated_distinct_count",
+                side_effect=lambda table, column: distinct[column],
+            ),
+            mock.patch("dallinger.db.get_queue") as get_queue,
+        ):
+            panes = exp.table_search_panes(**kwargs)
+            # Low-cardinality panes are computed right away
+            assert [o["value"] for o in panes["options"]["hit_id"]] == ["H1"]
+            assert panes["pending"] == ["worker_id", "object_type"]
+            assert panes["options"]["worker_id"] == []
+            # The others are only requested once
+            exp.table_search_panes(**kwargs)
+            get_queue.assert_called_once_with("low")
+            enqueue = get_queue.return_value.enqueue
+            enqueue.assert_called_once()
+
+            # Run the worker job
+            job, *args = enqueue.call_args.args
+            assert job is worker_events.compute_search_panes
+            with mock.patch.object(worker_events, "_loaded_experiment") as loaded:
+                loaded.return_value = exp
+                job(*args)
+            panes = exp.table_search_panes(**kwargs)
+            assert panes["pending"] == []
+            assert [o["value"] for o in panes["options"]["worker_id"]] == ["W1"]
+
     def test_table_columns_for_network_and_node(self, a, db_session):
         """Smoke-test columns for other tables and that schema order is preserved,
         and that only non-empty json-exposed columns are kept."""
@@ -911,7 +1355,9 @@ class TestDashboardDatabase:
             "recordsFiltered",
             "data",
             "searchPanes",
+            "searchableColumns",
         }
+        assert "worker_id" in payload["searchableColumns"]
         assert isinstance(payload["data"], list)
         assert any(row.get("worker_id") == "ROUTE_TEST" for row in payload["data"])
 
@@ -1051,3 +1497,14 @@ class TestDashboardDatabaseActions:
 
         p = db_session.query(Participant).get(p_id)
         assert p.failed is True
+
+    def test_actions_invalidate_cached_results(self, webapp_admin, a, db_session):
+        from dallinger.db import table_version
+
+        p = a.participant()
+        version = table_version("participant")
+        webapp_admin.post(
+            "/dashboard/database/action/dashboard_fail",
+            json=[{"id": p.id, "object_type": "Participant"}],
+        )
+        assert table_version("participant") != version
@@ -1,5 +1,8 @@
+import time
 from unittest import mock
 
+import pytest
+
 
 def test_redis():
     from dallinger.db import redis_conn
@@ -7,7 +10,7 @@ def test_redis():
     assert redis_conn.ping()
 
 
-def test_serialized(db_session):
+def test_serialized(db_session, caplog):
     from dallinger.db import serialized
     from dallinger.models import Participant
 
@@ -62,6 +65,8 @@ def test_serialized(db_session):
     # Which we can check by making sure that `add_participant`
     # calculated the count at least 3 times
     assert counts == [0, 0, 1]
+    # and that the retry was logged, for `dallinger loadtest` to count
+    assert "Retrying serialized transaction: serialized_write" in caplog.text
 
 
 def test_after_commit_hook(db_session):
@@ -81,3 +86,146 @@ def test_create_db_engine_updates_postgresql_scheme():
     engine = create_db_engine(old_scheme_uri)
 
     assert engine.url.render_as_string().startswith("postgresql://")
+
+
+def test_init_db_creates_search_indexes_when_configured(active_config):
+    from dallinger.db import init_db
+
+    with mock.patch("dallinger.db.create_search_indexes") as create_search_indexes:
+        init_db()
+        create_search_indexes.assert_not_called()
+        active_config.set("dashboard_search_index", True)
+        init_db()
+        create_search_indexes.assert_called_once()
+
+
+def test_create_search_indexes(db_session):
+    from dallinger.db import (
+        create_search_indexes,
+        indexed_search_columns,
+        reset_search_index_cache,
+    )
+
+    try:
+        if not create_search_indexes():
+            pytest.skip("pg_trgm extension is not available")
+        assert "contents" in indexed_search_columns("info")
+        assert "worker_id" in indexed_search_columns("participant")
+        assert "id" not in indexed_search_columns("participant")
+    finally:
+        reset_search_index_cache()
+
+
+def test_no_search_indexes_by_default(db_session):
+    from dallinger.db import indexed_search_columns
+
+    assert indexed_search_columns("participant") == ()
+
+
+def test_search_indexes_cache_expires(db_session):
+    from dallinger.db import (
+        SEARCH_INDEX_CACHE_TTL,
+        indexed_search_columns,
+        reset_search_index_cache,
+    )
+
+    assert indexed_search_columns("participant") == ()
+    index = mock.Mock(indexname="ix_participant_worker_id_trgm")
+    expired = time.monotonic() + SEARCH_INDEX_CACHE_TTL
+    try:
+        with mock.patch("dallinger.db.session") as session:
+            session.execute.return_value = [index]
+            assert indexed_search_columns("participant") == ()
+            with mock.patch("time.monotonic", return_value=expired):
+                assert indexed_search_columns("participant") == ("worker_id",)
+    finally:
+        reset_search_index_cache()
+
+
+def test_cached_count_counts_small_results_exactly(a, db_session):
+    from dallinger.db import cached_count
+    from dallinger.models import Participant
+
+    a.participant()
+    assert cached_count(Participant.query, "test-count") == 1
+
+
+def test_cached_count_estimates_large_results(db_session, redis_conn):
+    from dallinger.db import cached_count, count_rows
+    from dallinger.models import Participant
+
+    with mock.patch("dallinger.db.get_queue") as get_queue:
+        count = cached_count(Participant.query, "test-count", estimate=10**6)
+        assert count == 10**6
+        assert redis_conn.exists("test-count:pending")
+        # A pending count is only requested once
+        cached_count(Participant.query, "test-count", estimate=10**6)
+        get_queue.assert_called_once_with("low")
+        enqueue = get_queue.return_value.enqueue
+        enqueue.assert_called_once()
+        # The exact count is computed by a worker
+        job, *args = enqueue.call_args.args
+        assert job is count_rows
+        job(*args)
+
+    assert not redis_conn.exists("test-count:pending")
+    assert cached_count(Participant.query, "test-count", estimate=10**6) == 0
+
+
+def test_cached_count_expands_in_lists(a, db_session, redis_conn):
+    from dallinger.db import cached_count, count_rows
+    from dallinger.models import Participant
+
+    a.participant(hit_id="H1")
+    query = Participant.query.filter(Participant.hit_id.in_(["H1", "H2"]))
+    assert cached_count(query, "test-count") == 1
+    with mock.patch("dallinger.db.get_queue") as get_queue:
+        cached_count(query, "test-count", estimate=10**6)
+    count_rows(*get_queue.return_value.enqueue.call_args.args[1:])
+    assert redis_conn.get("test-count") == b"1"
+
+
+def test_estimated_distinct_count(a, db_session):
+    from sqlalchemy import text
+
+    from dallinger.db import estimated_distinct_count
+
+    assert estimated_distinct_count("participant", "hit_id") is None
+    for worker_id, hit_id in (("W1", "H1"), ("W2", "H1"), ("W3", "H2")):
+        a.participant(worker_id=worker_id, hit_id=hit_id)
+    db_session.commit()
+    db_session.execute(text("ANALYZE participant"))
+
+    assert estimated_distinct_count("participant", "hit_id") == 2
+    assert estimated_distinct_count("participant", "worker_id") == 3
+
+
+def test_estimated_count(db_session):
+    from dallinger.db import estimated_count
+    from dallinger.models import Participant
+
+    query = Participant.query.filter(Participant.worker_id.ilike("%x%"))
+    assert isinstance(estimated_count(query), int)
+
+
+def test_table_version(a, db_session, redis_conn):
+    from dallinger.db import TABLE_VERSION_TTL, invalidate_tables, table_version
+
+    with mock.patch("time.time", return_value=1000.0):
+        participants = table_version("participant")
+        networks = table_version("network")
+        counter = redis_conn.get("table_version:participant")
+        a.participant()
+        db_session.commit()
+        # Commits do not write to Redis
+        assert redis_conn.get("table_version:participant") == counter
+        assert table_version("participant") == participants
+
+    # Other changes are picked up once the version expires
+    with mock.patch("time.time", return_value=1000.0 + TABLE_VERSION_TTL):
+        assert table_version("participant") != participants
+        assert table_version("network") != networks
+
+        participants = table_version("participant")
+        invalidate_tables(["participant"])
+        assert table_version("participant") != participants
@@ -1,4 +1,5 @@
 import configparser
+import json
 import os
 import re
 import shutil
@@ -1011,6 +1012,112 @@ class TestDebugServer:
         )
 
 
+class TestLoadTestDeployment:
+    @pytest.fixture
+    def tester(self, output, tmpdir):
+        from dallinger.deployment import LoadTestDeployment
+
+        tester = LoadTestDeployment(
+            output,
+            verbose=True,
+            exp_config={},
+            bots=2,
+            results_path=tmpdir.join("results.json").strpath,
+        )
+        tester.exp_id = "some_experiment_id"
+        return tester
+
+    @pytest.fixture
+    def swarm(self, tester):
+        from dallinger.bots import LoadTestBot
+        from dallinger.swarm import BotSwarm
+
+        swarm = BotSwarm(LoadTestBot, "http://localhost:5000", count=2)
+        swarm.result.started = swarm.result.completed = 2
+        swarm.result.duration = 4.0
+        swarm.session.histogram("POST /participant").record(12.0)
+        swarm.result.histograms = swarm.session.histograms
+        tester.swarm = swarm
+        return swarm
+
+    def test_experiment_recruitment_is_ignored(self, tester):
+        tester.configure()
+        assert tester.exp_config == {"mode": "debug", "recruiter": "hotair"}
+
+    def test_uses_generic_bot_without_high_performance_bot(self, tester):
+        from dallinger.bots import BotBase, LoadTestBot
+
+        with mock.patch.dict(
+            "sys.modules",
+            {"dallinger_experiment.experiment": mock.Mock(Bot=BotBase)},
+        ):
+            assert tester.bot_class() is LoadTestBot
+
+    def test_uses_experiment_high_performance_bot(self, tester):
+        from dallinger.bots import HighPerformanceBotBase
+
+        class Bot(HighPerformanceBotBase):
+            pass
+
+        with mock.patch.dict(
+            "sys.modules", {"dallinger_experiment.experiment": mock.Mock(Bot=Bot)}
+        ):
+            assert tester.bot_class() is Bot
+
+    def test_counts_serialization_retries(self, tester):
+        from dallinger.db import SERIALIZATION_RETRY_LOG_PREFIX
+
+        for name in ("create_node", "create_node", "create_participant"):
+            tester.notify(
+                "web.1 | WARNING {} {}".format(SERIALIZATION_RETRY_LOG_PREFIX, name)
+            )
+        assert tester.serialization_retries == {
+            "create_node": 2,
+            "create_participant": 1,
+        }
+
+    def test_stops_monitoring_when_complete(self, tester):
+        from dallinger.heroku.tools import HerokuLocalWrapper
+
+        tester.complete = True
+        assert tester.notify("web.1 | anything") is HerokuLocalWrapper.MONITOR_STOP
+
+    def test_swarm_stops_server_when_done(self, tester, swarm):
+        heroku = mock.Mock()
+        tester.QUEUE_SAMPLE_INTERVAL = 0
+        with mock.patch.object(swarm, "run") as run:
+            tester.run_swarm(heroku)
+        run.assert_called_once_with()
+        heroku.stop.assert_called_once_with()
+        assert tester.complete
+
+    def test_saves_results(self, tester, swarm):
+        tester.serialization_retries = {"create_node": 3}
+        tester.queue_depths = {"high": [], "default": [0, 4, 2], "low": [1]}
+        tester.save_results()
+
+        with open(tester.results_path) as f:
+            results = json.load(f)
+        assert results["experiment_id"] == "some_experiment_id"
+        assert results["bot_class"] == "LoadTestBot"
+        assert results["throughput"] == 0.5
+        assert results["endpoints"]["POST /participant"]["count"] == 1
+        assert results["serialization_retries"]["total"] == 3
+        assert results["queue_depth"]["default"] == {"max": 4, "mean": 2.0}
+        assert results["queue_depth"]["high"] == {"max": 0, "mean": 0}
+        assert results["delayed"] == 0
+        assert results["arrival_lag"]["count"] == 0
+        tester.out.log.assert_called_with(
+            "Results saved to {}".format(tester.results_path)
+        )
+
+    def test_results_without_swarm(self, tester):
+        results = tester.results()
+        assert results["bot_class"] is None
+        assert results["started"] == results["completed"] == 0
+        assert results["endpoints"] == {}
+
+
 if os.environ.get("CI"):
     MAX_DOCKER_RERUNS = 5
 else:
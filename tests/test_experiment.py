@@ -1,3 +1,4 @@
+import time
 import warnings
 from datetime import datetime
 from unittest import mock
@@ -431,6 +432,151 @@ class TestExperimentBaseClass:
             klass()
             mock_configure.assert_called_once()
 
+    def test_monitoring_statistics(self, exp, a):
+        network = a.network(role="practice")
+        a.network(role="experiment").fail()
+        node = a.node(network=network)
+        a.info(origin=node)
+        a.info(origin=node).fail()
+        a.participant().status = "approved"
+        a.participant().status = "approved"
+        a.participant()
+
+        stats = exp.monitoring_statistics(transformations=True)
+
+        assert stats["Participants"] == {"approved": 2, "working": 1}
+        assert list(stats["Participants"]) == ["approved", "working"]
+        assert stats["Networks"] == {
+            "practice": {"count": 1, "failed": 0},
+            "experiment": {"count": 1, "failed": 1},
+        }
+        assert stats["Nodes"] == {"count": 1, "failed": 0}
+        assert stats["Infos"] == {"count": 2, "failed": 1}
+        assert stats["transformations"] == {"count": 0, "failed": 0}
+
+    def test_log_summary_counts_statuses(self, exp, a):
+        a.participant()
+        a.participant().status = "approved"
+        a.participant()
+
+        assert exp.log_summary() == [("approved", 1), ("working", 2)]
+
+    def test_statistics_cached_for_ttl(self, exp, a):
+        from dallinger import experiment
+
+        experiment._statistics_cache.clear()
+        exp.statistics_cache_ttl = 10
+        a.participant()
+        assert exp.log_summary() == [("working", 1)]
+        a.participant()
+        assert exp.log_summary() == [("working", 1)]
+        assert exp.monitoring_statistics()["Participants"] == {"working": 2}
+
+        later = time.monotonic() + 11
+        with mock.patch("dallinger.experiment.time.monotonic", return_value=later):
+            assert exp.log_summary() == [("working", 2)]
+        experiment._statistics_cache.clear()
+
+    @pytest.mark.slow
+    def test_statistics_benchmark(self, exp, db_session):
+        """Statistics for 100,000 participants take a constant number of
+        queries and don't load any rows into the session.
+        """
+        from sqlalchemy import event
+
+        db_session.execute(
+            Participant.__table__.insert(),
+            [
+                {
+                    "recruiter_id": "hotair",
+                    "worker_id": str(i),
+                    "assignment_id": str(i),
+                    "unique_id": "{}:{}".format(i, i),
+                    "hit_id": "1",
+                    "mode": "debug",
+                    "type": "participant",
+                    "status": "approved" if i % 2 else "working",
+                }
+                for i in range(100000)
+            ],
+        )
+        statements = []
+
+        def count_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", count_statement)
+        try:
+            start = time.perf_counter()
+            stats = exp.monitoring_statistics()
+            summary = exp.log_summary()
+            elapsed = time.perf_counter() - start
+        finally:
+            event.remove(db.engine, "before_cursor_execute", count_statement)
+        assert stats["Participants"] == {"approved": 50000, "working": 50000}
+        assert summary == [("approved", 50000), ("working", 50000)]
+        assert len(statements) <= 5
+        assert len(db_session.identity_map) == 0
+        assert elapsed < 5
+
+
+@pytest.mark.usefixtures("experiment_dir")
+class TestLoad:
+    def test_load_is_cached(self):
+        from dallinger.experiment import load
+
+        klass = load()
+        assert klass.__name__ == "TestExperiment"
+        with mock.patch("dallinger.experiment._find_experiment_class") as find:
+            assert load() is klass
+            find.assert_not_called()
+
+    def test_reset_load_cache(self):
+        from dallinger.experiment import load, reset_load_cache
+
+        load()
+        reset_load_cache()
+        with mock.patch("dallinger.experiment._find_experiment_class") as find:
+            assert load() is find.return_value
+
+    def test_load_cache_keyed_on_class_name(self, monkeypatch):
+        from dallinger.experiment import load
+
+        load()
+        monkeypatch.setenv("EXPERIMENT_CLASS_NAME", "ZSubclassThatSortsLower")
+        assert load().__name__ == "ZSubclassThatSortsLower"
+
+    def test_load_cache_ignores_replaced_package(self, monkeypatch):
+        import sys
+        import types
+
+        from dallinger.experiment import load
+
+        load()
+        monkeypatch.setitem(
+            sys.modules, "dallinger_experiment", types.ModuleType("replaced")
+        )
+        with mock.patch("dallinger.experiment._find_experiment_class") as find:
+            assert load() is find.return_value
+
+    @pytest.mark.slow
+    def test_load_benchmark(self):
+        """Loading the experiment class once it has been discovered costs
+        little more than locating the experiment directory.
+        """
+        from dallinger.experiment import _find_experiment_class, load
+
+        load()
+        start = time.perf_counter()
+        for _ in range(1000):
+            _find_experiment_class()
+        uncached = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(1000):
+            load()
+        cached = time.perf_counter() - start
+        assert cached < uncached / 2
+
 
 class TestTaskRegistration:
     def test_deferred_task_decorator(self, tasks_with_cleanup):
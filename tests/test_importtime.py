@@ -0,0 +1,89 @@
+"""Startup time budget for the ``dallinger`` CLI and server processes."""
+
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+# Heavy optional dependencies that must only be imported on first use.
+LAZY_DEPENDENCIES = (
+    "boto3",
+    "faker",
+    "pandas",
+    "paramiko",
+    "selenium",
+    "user_agents",
+)
+
+# Cumulative import time budgets in milliseconds. These are several times
+# the time measured on a developer laptop, so that only real regressions
+# fail; override them with DALLINGER_IMPORT_BUDGET_MS on slow machines.
+IMPORT_BUDGETS_MS = {
+    "dallinger": 1500,
+    "dallinger.command_line": 3000,
+    "dallinger.experiment_server.experiment_server": 3500,
+}
+
+
+def imported_modules(module):
+    code = "import sys, {}; print('\\n'.join(sys.modules))".format(module)
+    output = subprocess.check_output([sys.executable, "-c", code], text=True)
+    return set(output.split())
+
+
+def import_time_ms(module):
+    """Return the cumulative time taken to import ``module`` in a fresh
+    interpreter, as reported by ``python -X importtime``.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + module],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    pattern = r"import time:\s+\d+ \|\s+(\d+) \| {}$".format(re.escape(module))
+    match = re.search(pattern, result.stderr, re.MULTILINE)
+    return int(match.group(1)) / 1000
+
+
+class TestImportTime:
+    def test_package_import_does_not_import_submodules(self):
+        modules = imported_modules("dallinger")
+        assert "dallinger.command_line" not in modules
+        assert "dallinger.experiment_server" not in modules
+
+    def test_package_import_registers_all_models(self):
+        code = (
+            "from dallinger.models import Node; "
+            "print('random_binary_string_source' in Node.__mapper__.polymorphic_map)"
+        )
+        output = subprocess.check_output([sys.executable, "-c", code], text=True)
+        assert output.strip() == "True"
+
+    def test_submodules_available_as_attributes(self):
+        import dallinger
+
+        assert dallinger.nodes.Source.__name__ == "Source"
+        with pytest.raises(AttributeError):
+            dallinger.not_a_submodule
+
+    @pytest.mark.parametrize(
+        "module",
+        ["dallinger.command_line", "dallinger.experiment_server.experiment_server"],
+    )
+    def test_heavy_dependencies_imported_lazily(self, module):
+        modules = imported_modules(module)
+        assert not [name for name in LAZY_DEPENDENCIES if name in modules]
+
+    @pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS_MS))
+    def test_import_time_budget(self, module):
+        budget = float(
+            os.environ.get("DALLINGER_IMPORT_BUDGET_MS", IMPORT_BUDGETS_MS[module])
+        )
+        # Take the best of two runs so a cold filesystem cache doesn't count
+        elapsed = min(import_time_ms(module) for _ in range(2))
+        assert elapsed < budget, "Importing {} took {:.0f}ms (budget {:.0f}ms)".format(
+            module, elapsed, budget
+        )
@@ -0,0 +1,102 @@
+import json
+import os
+from unittest import mock
+
+import pytest
+
+from dallinger.experiment_server.log_index import LogIndex
+
+
+def write_lines(path, start, stop):
+    with open(path, "a") as f:
+        for i in range(start, stop):
+            f.write(json.dumps({"message": f"line {i}", "levelname": "INFO"}) + "\n")
+
+
+@pytest.fixture
+def log_path(tmpdir):
+    path = os.path.join(tmpdir.strpath, "logs.jsonl")
+    write_lines(path, 1, 26)
+    return path
+
+
+class TestLogIndex:
+    def test_indexes_checkpoints(self, log_path):
+        index = LogIndex(log_path, every=10)
+        assert index.update() == 25
+        assert len(index.offsets) == 3
+        with open(log_path, "rb") as f:
+            f.seek(index.offsets[2])
+            assert b'"line 21"' in f.readline()
+
+    def test_read_range(self, log_path):
+        index = LogIndex(log_path, every=10)
+        lines = index.read(9, 13)
+        assert [number for number, _ in lines] == [9, 10, 11, 12]
+        assert all(f'"line {number}"' in line for number, line in lines)
+        assert index.read(30, 40) == []
+
+    def test_updates_incrementally(self, log_path):
+        index = LogIndex(log_path, every=10)
+        index.update()
+        end = index.end
+        write_lines(log_path, 26, 36)
+        assert index.update() == 35
+        assert index.end > end
+        assert [number for number, _ in index.read(34, 40)] == [34, 35]
+
+    def test_partial_line_not_indexed(self, log_path):
+        index = LogIndex(log_path, every=10)
+        with open(log_path, "a") as f:
+            f.write('{"message": "line 26"')
+        assert index.update() == 25
+        with open(log_path, "a") as f:
+            f.write("}\n")
+        assert index.update() == 26
+        ((number, line),) = index.read(26, 27)
+        assert json.loads(line)["message"] == "line 26"
+
+    def test_sidecar_is_reused(self, log_path):
+        LogIndex(log_path, every=10).update()
+        index = LogIndex(log_path, every=10)
+        assert index.lines == 25
+        assert len(index.offsets) == 3
+
+    def test_rebuilds_when_truncated(self, log_path):
+        index = LogIndex(log_path, every=10)
+        index.update()
+        os.remove(log_path)
+        write_lines(log_path, 1, 4)
+        assert index.update() == 3
+        assert index.offsets == [0]
+
+    def test_find(self, log_path):
+        index = LogIndex(log_path, every=10)
+        assert index.find('"line 2') == 2
+        assert index.find('"line 2', last=True) == 25
+        assert index.find("missing") is None
+        assert index.find("missing", last=True) is None
+
+    def test_search_stops_at_limit(self, log_path):
+        index = LogIndex(log_path, every=10)
+        matches = list(index.search('"line 1', limit=3))
+        assert [number for number, _ in matches] == [1, 10, 11]
+        assert len(list(index.search('"line 1'))) == 11
+
+    def test_closing_search_stops_thread(self, log_path):
+        index = LogIndex(log_path, every=10)
+        search = index.search("line")
+        assert next(search)[0] == 1
+        search.close()
+
+    def test_long_reads_yield_to_other_greenlets(self, log_path):
+        index = LogIndex(log_path, every=10)
+        with (
+            mock.patch("dallinger.experiment_server.log_index.YIELD_EVERY", 5),
+            mock.patch("gevent.monkey.is_module_patched", return_value=True),
+            mock.patch("gevent.sleep") as sleep,
+        ):
+            index.update()
+            assert sleep.call_count == 5
+            assert index.find("missing") is None
+            assert sleep.call_count == 10
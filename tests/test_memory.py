@@ -0,0 +1,200 @@
+import json
+import time
+import tracemalloc
+from unittest import mock
+
+import pytest
+
+from dallinger import memory, monitoring
+
+
+@pytest.fixture
+def process():
+    with mock.patch.multiple(
+        "dallinger.memory",
+        _process=monitoring.MonitoredProcess("web", "host:1", time.time()),
+        _snapshot_seq=None,
+        _previous_snapshot=None,
+    ):
+        yield
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+@pytest.fixture
+def profiling(active_config, redis_conn, process):
+    active_config.extend({"memory_profiling": True})
+    yield
+
+
+@pytest.fixture
+def gunicorn_worker():
+    worker = mock.Mock(alive=True)
+    with mock.patch.multiple(
+        "dallinger.memory", _gunicorn_worker=worker, _recycling=False
+    ):
+        yield worker
+
+
+class TestSamples:
+    def test_records_samples_by_process(self, redis_conn, process):
+        memory.record(100)
+        memory.record(150)
+
+        (report,) = memory.processes()
+        assert report["process_id"] == "host:1"
+        assert report["process"] == "web"
+        assert report["rss"] == 150
+        assert [rss for _, rss in report["samples"]] == [100, 150]
+        assert report["snapshot"] is None
+
+    def test_keeps_recent_samples_only(self, redis_conn, process):
+        with mock.patch("dallinger.memory.MAX_SAMPLES", 2):
+            for rss in (1, 2, 3):
+                memory.record(rss)
+
+        (report,) = memory.processes()
+        assert [rss for _, rss in report["samples"]] == [2, 3]
+
+    def test_drops_stale_processes(self, redis_conn, process):
+        stale = {"process": "web", "started": 0, "time": 0, "rss": 1}
+        redis_conn.hset(memory.PROCESSES_KEY, "gone:1", json.dumps(stale))
+        memory.record(100)
+
+        assert [r["process_id"] for r in memory.processes()] == ["host:1"]
+        assert redis_conn.hkeys(memory.PROCESSES_KEY) == [b"host:1"]
+
+    def test_sample_records_when_enabled(self, profiling):
+        assert memory.sample() == memory.rss()
+        assert len(memory.processes()) == 1
+
+    def test_sample_does_not_record_when_disabled(
+        self, active_config, redis_conn, process
+    ):
+        memory.sample()
+        assert memory.processes() == []
+
+
+class TestTracing:
+    def test_starts_and_stops_tracing(self, redis_conn, process):
+        memory.start_tracing()
+        memory.apply_commands()
+        assert tracemalloc.is_tracing()
+        assert memory.tracing_requested()
+
+        memory.stop_tracing()
+        memory.apply_commands()
+        assert not tracemalloc.is_tracing()
+
+    def test_ignores_snapshots_requested_before_the_process_started(
+        self, redis_conn, process
+    ):
+        memory.start_tracing()
+        memory.request_snapshot()
+        memory.apply_commands()
+
+        assert not redis_conn.exists(memory._snapshot_key("host:1"))
+
+    def test_snapshots_diff_with_the_previous_one(self, redis_conn, process):
+        memory.start_tracing()
+        memory.apply_commands()
+        memory.request_snapshot()
+        memory.apply_commands()
+        memory.record(100)
+
+        snapshot = memory.processes()[0]["snapshot"]
+        assert snapshot["traced"] > 0
+        assert snapshot["top"]
+        assert snapshot["diff"] is None
+
+        allocations = [bytearray(1000) for _ in range(1000)]  # noqa: F841
+        memory.request_snapshot()
+        memory.apply_commands()
+
+        snapshot = memory.processes()[0]["snapshot"]
+        (grown,) = [
+            stat for stat in snapshot["diff"] if "test_memory.py" in stat["site"]
+        ]
+        assert grown["size_diff"] >= 1000 * 1000
+        assert grown["count_diff"] >= 1000
+
+    def test_clear_keeps_tracing(self, redis_conn, process):
+        memory.start_tracing()
+        memory.record(100)
+
+        memory.clear()
+
+        assert memory.processes() == []
+        assert memory.tracing_requested()
+
+
+class TestRecycling:
+    def test_recycles_gunicorn_worker_over_the_limit(
+        self, active_config, gunicorn_worker
+    ):
+        active_config.extend({"max_worker_memory_mb": 1})
+        with mock.patch("dallinger.memory.logger") as logger:
+            memory.sample()
+            memory.sample()
+
+        assert gunicorn_worker.alive is False
+        logger.warning.assert_called_once()
+        assert logger.warning.call_args[0][0].startswith("Recycling worker")
+
+    def test_keeps_worker_under_the_limit(self, active_config, gunicorn_worker):
+        active_config.extend({"max_worker_memory_mb": 1024 * 1024})
+        memory.sample()
+
+        assert gunicorn_worker.alive is True
+
+    def test_off_by_default(self, active_config, gunicorn_worker):
+        memory.sample()
+
+        assert gunicorn_worker.alive is True
+
+    def test_post_worker_init_starts_sampling(self, active_config, gunicorn_worker):
+        from dallinger.experiment_server.gunicorn import post_worker_init
+
+        active_config.extend({"max_worker_memory_mb": 512})
+        worker = mock.Mock()
+        with mock.patch("dallinger.memory.start") as start:
+            post_worker_init(worker)
+
+        assert memory._gunicorn_worker is worker
+        start.assert_called_once_with("web")
+
+
+@pytest.mark.usefixtures("experiment_dir_merged")
+class TestDashboard:
+    def test_requires_login(self, webapp):
+        assert webapp.get("/dashboard/memory").status_code == 401
+
+    def test_lists_processes(self, profiling, webapp_admin):
+        memory.record(100 * 1024 * 1024)
+        memory.record(120 * 1024 * 1024)
+
+        page = webapp_admin.get("/dashboard/memory").data.decode("utf8")
+        assert "web host:1" in page
+        assert "120.0 MiB" in page
+        assert "+20.0 MiB" in page
+
+        resp = webapp_admin.get("/dashboard/memory?format=json")
+        assert resp.json["processes"][0]["rss"] == 120 * 1024 * 1024
+        assert resp.json["tracing"] is False
+
+    def test_tracing_commands(self, redis_conn, webapp_admin):
+        webapp_admin.post("/dashboard/memory/tracing", data={"enable": "true"})
+        assert memory.tracing_requested()
+
+        webapp_admin.post("/dashboard/memory/snapshot")
+        assert redis_conn.hget(memory.COMMANDS_KEY, "snapshot") == b"1"
+
+        webapp_admin.post("/dashboard/memory/tracing", data={"enable": "false"})
+        assert not memory.tracing_requested()
+
+    def test_clear(self, profiling, webapp_admin):
+        memory.record(100)
+
+        webapp_admin.post("/dashboard/memory/clear")
+
+        assert memory.processes() == []
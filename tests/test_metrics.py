@@ -0,0 +1,175 @@
+import json
+import time
+from unittest import mock
+
+import pytest
+from sqlalchemy import create_engine
+
+from dallinger import metrics, monitoring
+
+
+@pytest.fixture
+def metrics_config(active_config, redis_conn):
+    active_config.extend({"metrics": True})
+    # Don't time the shared engine's pool or start a reporting thread
+    with mock.patch("dallinger.metrics.start") as start:
+        yield start
+
+
+def sample(text, line_start):
+    for line in text.splitlines():
+        if line.startswith(line_start + " "):
+            return float(line.rsplit(" ", 1)[1])
+
+
+class TestMetricTypes:
+    def test_counter(self, redis_conn):
+        counter = metrics.Counter("test_total", "Things.", ("kind",))
+        pipe = redis_conn.pipeline()
+        counter.inc(pipe, kind="a")
+        counter.inc(pipe, 2, kind="a")
+        counter.inc(pipe, kind='"b"')
+        pipe.execute()
+
+        assert counter.render(redis_conn) == [
+            "# HELP test_total Things.",
+            "# TYPE test_total counter",
+            'test_total{kind="\\"b\\""} 1',
+            'test_total{kind="a"} 3',
+        ]
+
+    def test_histogram_buckets_are_cumulative(self, redis_conn):
+        histogram = metrics.Histogram("test_seconds", "Time.", buckets=(0.1, 1))
+        pipe = redis_conn.pipeline()
+        for value in (0.05, 0.5, 0.5, 5):
+            histogram.observe(pipe, value)
+        pipe.execute()
+
+        assert histogram.render(redis_conn)[2:] == [
+            'test_seconds_bucket{le="0.1"} 1',
+            'test_seconds_bucket{le="1.0"} 3',
+            'test_seconds_bucket{le="+Inf"} 4',
+            "test_seconds_sum 6.05",
+            "test_seconds_count 4",
+        ]
+
+    def test_process_gauges_are_summed_by_process_type(self):
+        gauge = metrics.ProcessGauge("test_gauge", "Things.", ("channel",))
+        reports = [
+            {"gauges": {"test_gauge": {'process="web",channel="a"': 2}}},
+            {"gauges": {"test_gauge": {'process="web",channel="a"': 3}}},
+            {"gauges": {"test_gauge": {'process="web",channel="b"': 1}}},
+        ]
+
+        assert gauge.render(reports)[2:] == [
+            'test_gauge{process="web",channel="a"} 5',
+            'test_gauge{process="web",channel="b"} 1',
+        ]
+
+
+class TestProcessReports:
+    @pytest.fixture(autouse=True)
+    def process(self):
+        with mock.patch.object(
+            metrics, "_process", monitoring.MonitoredProcess("web", "host:1")
+        ):
+            yield
+
+    def test_reports_pool_and_websocket_gauges(self, redis_conn):
+        with mock.patch.object(
+            metrics.WEBSOCKET_CLIENTS, "collect", lambda: [({"channel": "chat"}, 4)]
+        ):
+            metrics.report_process_gauges()
+
+        (report,) = [json.loads(r) for r in redis_conn.hvals(metrics.PROCESSES_KEY)]
+        assert report["gauges"]["dallinger_websocket_clients"] == {
+            'process="web",channel="chat"': 4
+        }
+        assert "dallinger_db_pool_checked_out" in report["gauges"]
+
+    def test_drops_stale_processes(self, redis_conn):
+        stale = {"time": time.time() - metrics.STALE_AFTER - 1, "gauges": {}}
+        redis_conn.hset(metrics.PROCESSES_KEY, "gone:1", json.dumps(stale))
+        metrics.report_process_gauges()
+
+        assert len(metrics._live_reports(redis_conn)) == 1
+        assert redis_conn.hkeys(metrics.PROCESSES_KEY) == [b"host:1"]
+
+    def test_times_pool_checkouts(self, redis_conn):
+        engine = create_engine("sqlite://")
+        metrics._time_pool_checkouts(engine)
+        with engine.connect():
+            pass
+        engine.dispose()
+        with engine.connect():
+            pass
+
+        text = "\n".join(metrics.DB_POOL_CHECKOUT_WAIT.render(redis_conn))
+        name = "dallinger_db_pool_checkout_wait_seconds_count"
+        assert sample(text, name + '{process="web"}') == 2
+
+
+class TestWorkerEvents:
+    def test_records_duration_by_event_type_and_outcome(self, metrics_config):
+        @metrics.time_worker_event
+        def worker_function(event_type, fail=False):
+            if fail:
+                raise ValueError()
+
+        worker_function("AssignmentSubmitted")
+        with pytest.raises(ValueError):
+            worker_function("AssignmentSubmitted", fail=True)
+
+        text = "\n".join(metrics.WORKER_EVENT_DURATION.render(metrics.db.redis_conn))
+        name = "dallinger_worker_event_duration_seconds_count"
+        for outcome in ("success", "error"):
+            labels = 'event_type="AssignmentSubmitted",outcome="{}"'.format(outcome)
+            assert sample(text, "{}{{{}}}".format(name, labels)) == 1
+        metrics_config.assert_called_with("worker")
+
+    def test_not_recorded_when_disabled(self, active_config, redis_conn):
+        wrapped = metrics.time_worker_event(lambda event_type: event_type)
+
+        assert wrapped("AssignmentSubmitted") == "AssignmentSubmitted"
+        assert not redis_conn.exists(metrics.WORKER_EVENT_DURATION.key)
+
+
+@pytest.mark.usefixtures("experiment_dir_merged")
+class TestMetricsRoute:
+    def test_not_found_when_disabled(self, webapp_admin):
+        assert webapp_admin.get("/metrics").status_code == 404
+
+    def test_requires_login(self, metrics_config, webapp):
+        assert webapp.get("/metrics").status_code == 401
+
+    def test_reports_requests_queues_and_participants(
+        self, metrics_config, db_session, webapp_admin
+    ):
+        webapp_admin.post("/participant/1/1/1/debug")
+        webapp_admin.get("/summary")
+        webapp_admin.get("/summary")
+
+        resp = webapp_admin.get("/metrics")
+
+        assert resp.status_code == 200
+        assert resp.content_type == metrics.CONTENT_TYPE
+        text = resp.data.decode("utf8")
+        assert (
+            sample(
+                text,
+                "dallinger_http_request_duration_seconds_count"
+                '{method="GET",route="/summary"}',
+            )
+            == 2
+        )
+        assert (
+            sample(
+                text,
+                'dallinger_http_requests_total{method="GET",route="/summary",'
+                'status="200"}',
+            )
+            == 2
+        )
+        assert sample(text, 'dallinger_rq_queue_length{queue="high"}') == 0
+        assert sample(text, 'dallinger_participants{status="working"}') == 1
+        metrics_config.assert_called_with("web")
@@ -0,0 +1,20 @@
+import os
+import time
+from unittest import mock
+
+from dallinger.monitoring import MonitoredProcess
+
+
+def test_monitored_process_starts_once():
+    process = MonitoredProcess()
+    run = mock.Mock()
+
+    assert process.start("web", run=run, name="test-process")
+    assert not process.start("worker", run=run)
+    assert process.process_type == "web"
+    assert process.process_id.endswith(":{}".format(os.getpid()))
+    for _ in range(100):
+        if run.called:
+            break
+        time.sleep(0.01)
+    run.assert_called_once_with()
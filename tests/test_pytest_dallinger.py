@@ -0,0 +1,85 @@
+"""Tests for the query counting helpers of dallinger.pytest_dallinger."""
+
+import pytest
+
+from dallinger.models import Node
+from dallinger.pytest_dallinger import QueryCounter, max_queries
+
+
+class TestQueryCounter:
+    def test_counts_statements(self, db_session):
+        with QueryCounter() as counter:
+            db_session.query(Node).all()
+            db_session.query(Node).count()
+
+        assert counter.count == 2
+        assert counter.statements[0].startswith("SELECT node.id")
+
+    def test_stops_counting_on_exit(self, db_session):
+        with QueryCounter() as counter:
+            pass
+        db_session.query(Node).all()
+
+        assert counter.count == 0
+
+    def test_records_calling_code(self, a):
+        node = a.node()
+        with QueryCounter() as counter:
+            node.neighbors()
+
+        (statement, location) = counter.queries[0]
+        assert location[-1].filename.endswith("models.py")
+        assert location[-1].name == "neighbors"
+        assert location[-2].name == "test_records_calling_code"
+
+    def test_reset(self, db_session):
+        with QueryCounter() as counter:
+            db_session.query(Node).all()
+            counter.reset()
+
+        assert counter.count == 0
+
+
+class TestMaxQueries:
+    def test_passes_within_limit(self, db_session):
+        with max_queries(1) as counter:
+            db_session.query(Node).all()
+
+        assert counter.count == 1
+
+    def test_lists_statements_when_limit_exceeded(self, a):
+        nodes = [a.node() for _ in range(3)]
+
+        with pytest.raises(AssertionError) as excinfo:
+            with max_queries(2):
+                for node in nodes:
+                    node.neighbors()
+
+        message = str(excinfo.value)
+        assert message.startswith("Expected at most 2 queries, but ")
+        assert "1. SELECT" in message
+        assert "models.py" in message and "in neighbors" in message
+        assert "in test_lists_statements_when_limit_exceeded" in message
+
+    def test_does_not_hide_errors_in_block(self, db_session):
+        with pytest.raises(ValueError):
+            with max_queries(0):
+                db_session.query(Node).all()
+                raise ValueError()
+
+
+class TestFixtures:
+    def test_query_counter(self, db_session, query_counter):
+        query_counter.reset()
+        db_session.query(Node).all()
+
+        assert query_counter.count == 1
+
+    def test_assert_max_queries(self, a, assert_max_queries):
+        network = a.network()
+        center = a.node(network=network)
+        for _ in range(5):
+            center.connect(a.node(network=network))
+
+        with assert_max_queries(3):
+            assert len(center.neighbors()) == 5
@@ -105,3 +105,77 @@ class TestReplayBackend:
         for rp in replayed:
             time_diff = (rp["replay_time"] - rp["orig_time"]).total_seconds()
             assert abs(time_diff - base_offset) <= self.allowed_jitter
+
+
+class TestReplayBackendStreaming:
+    def make_backend(self, exp, **kwargs):
+        from dallinger.experiment_server.replay import ReplayBackend
+
+        return ReplayBackend(exp, **kwargs)
+
+    def test_batches_group_events_in_same_tick(self):
+        backend = self.make_backend(DummyExperiment(), tick=0.01)
+        events = [
+            DummyEvent(datetime(2010, 1, 1, 0, 0, 0, 0)),
+            DummyEvent(datetime(2010, 1, 1, 0, 0, 0, 5000)),
+            DummyEvent(datetime(2010, 1, 1, 0, 0, 1, 0)),
+        ]
+        assert [len(batch) for batch in backend.batches(events)] == [2, 1]
+
+    def test_stream_uses_server_side_cursor_for_queries(self):
+        from unittest import mock
+
+        backend = self.make_backend(DummyExperiment(), batch_size=50)
+        query = mock.Mock()
+        backend.stream(query)
+        query.execution_options.assert_called_once_with(stream_results=True)
+        query.execution_options.return_value.yield_per.assert_called_once_with(50)
+
+    def test_fast_forward_replays_without_waiting(self):
+        exp = DummyExperiment()
+        exp.replayed = []
+        exp.started = True
+        exp._events = DummyEvents(
+            [DummyEvent(datetime(2010, 1, 1, 0, t, 0)) for t in range(10)]
+        )
+        backend = self.make_backend(exp, speed=0)
+        gevent.spawn(backend).join(timeout=5)
+        assert exp.finished is True
+        assert len(exp.replayed) == 10
+        assert backend.replayed == 10
+        assert backend.rate > 0
+
+    def test_empty_replay_finishes(self):
+        exp = DummyExperiment()
+        exp._events = DummyEvents()
+        exp.started = True
+        backend = self.make_backend(exp, speed=0)
+        gevent.spawn(backend).join(timeout=5)
+        assert exp.finished is True
+        assert backend.rate is None
+
+    def test_replay_event_may_commit(self, a, db_session):
+        from dallinger.experiment import Experiment
+        from dallinger.models import Network
+
+        network = a.network()
+        node = a.node(network=network)
+        for _ in range(5):
+            a.info(origin=node)
+        db_session.commit()
+
+        class CommittingExperiment(DummyExperiment):
+            events_for_replay = Experiment.events_for_replay
+
+            def replay_event(self, event):
+                self.replayed.append(event.id)
+                db_session.add(Network())
+                db_session.commit()
+
+        exp = CommittingExperiment()
+        exp.replayed = []
+        exp.started = True
+        backend = self.make_backend(exp, speed=0, batch_size=2)
+        gevent.spawn(backend).join(timeout=5)
+        assert exp.finished is True
+        assert len(exp.replayed) == 5
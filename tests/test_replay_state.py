@@ -46,7 +46,7 @@ class TestReplayState:
             scrubber(datetime.now())
             assert replay_event.call_count == 5
 
-    def test_cannot_scrub_backwards(self, scrubber):
+    def test_scrub_backwards(self, scrubber):
         target = datetime(2017, 6, 23, 12, 0, 29, 941148)
         with mock.patch(
             "dlgr.demos.bartlett1932.experiment.Bartlett1932.replay_event"
@@ -54,5 +54,107 @@ class TestReplayState:
             replay_event.assert_not_called()
             scrubber(datetime.now())
             assert replay_event.call_count == 5
-            with pytest.raises(NotImplementedError):
+            scrubber(target)
+            # Only events after the checkpoint taken following the first
+            # event are replayed again
+            assert replay_event.call_count == 8
+            assert scrubber.experiment._replay_time_index <= target
+
+    def test_scrub_backwards_restores_checkpoint(self, experiment, db_session):
+        from dallinger.models import Network
+
+        target = datetime(2017, 6, 23, 12, 0, 29, 941148)
+
+        def replay_event(event):
+            db_session.add(Network())
+            db_session.flush()
+
+        with experiment.restore_state_from_replay(
+            "bartlett-test",
+            session=db_session,
+            zip_path=self.bartlett_export,
+            checkpoint_interval=0,
+        ) as scrubber:
+            with mock.patch.object(
+                experiment, "replay_event", side_effect=replay_event
+            ) as replayed:
+                scrubber(datetime.now())
+                assert Network.query.count() == 5
+                scrubber(target)
+                assert replayed.call_count == 5
+                assert Network.query.count() == 4
+                scrubber(datetime.now())
+                assert replayed.call_count == 6
+                assert Network.query.count() == 5
+
+    def test_caps_checkpoint_savepoints(self, experiment, db_session):
+        from dallinger.models import Network
+
+        target = datetime(2017, 6, 23, 12, 0, 29, 941148)
+
+        def replay_event(event):
+            db_session.add(Network())
+            db_session.flush()
+
+        with experiment.restore_state_from_replay(
+            "bartlett-test",
+            session=db_session,
+            zip_path=self.bartlett_export,
+            checkpoint_interval=0,
+            max_checkpoints=3,
+        ) as scrubber:
+            with mock.patch.object(
+                experiment, "replay_event", side_effect=replay_event
+            ) as replayed:
+                scrubber(datetime.now())
+                checkpoints = experiment._replay_checkpoints
+                assert len(checkpoints) == 3
+                assert (
+                    db_session().get_nested_transaction() is checkpoints[-1].savepoint
+                )
+                assert checkpoints[-1].time == experiment._replay_time_index
+                # Spread over the whole experiment
+                assert [c.time for c in checkpoints[1:]] == list(
+                    experiment.usable_replay_range
+                )
+
+                scrubber(target)
+                # Reverted to the checkpoint after the first event
+                assert replayed.call_count == 8
+                assert Network.query.count() == 4
+
+    def test_scrubber_without_restored_replay(self, a, experiment, db_session):
+        from dallinger.experiment import Scrubber
+
+        node = a.node()
+        infos = [a.info(origin=node) for _ in range(2)]
+        db_session.commit()
+        scrubber = Scrubber(experiment, session=db_session)
+
+        with mock.patch.object(experiment, "replay_event") as replayed:
+            scrubber(datetime.now())
+            assert replayed.call_count == 2
+            scrubber(infos[0].creation_time)
+            assert replayed.call_count == 3
+            assert experiment._replay_time_index == infos[0].creation_time
+
+    def test_scrub_backwards_restores_experiment_state(self, experiment, db_session):
+        target = datetime(2017, 6, 23, 12, 0, 29, 941148)
+        with experiment.restore_state_from_replay(
+            "bartlett-test",
+            session=db_session,
+            zip_path=self.bartlett_export,
+            checkpoint_interval=0,
+        ) as scrubber:
+            with (
+                mock.patch.object(
+                    experiment,
+                    "replay_checkpoint",
+                    side_effect=lambda: experiment._replay_time_index,
+                ),
+                mock.patch.object(experiment, "replay_restore") as replay_restore,
+            ):
+                scrubber(datetime.now())
                 scrubber(target)
+                replay_restore.assert_called_once_with(experiment._replay_time_index)
+                assert experiment._replay_time_index <= target
@@ -0,0 +1,167 @@
+from unittest import mock
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine.url import make_url
+
+from dallinger import db, models
+from dallinger.experiment_server.utils import READ_YOUR_WRITES_COOKIE
+
+REPLICA_DATABASE = "dallinger-replica"
+
+
+@pytest.fixture(scope="module")
+def replica_url():
+    """A second database on the local server, standing in for a replica.
+    It is never written to by the primary, so that the tests can tell which
+    of the two a query ran on.
+    """
+    admin = create_engine(db.db_url, isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM pg_database WHERE datname = :name"),
+            {"name": REPLICA_DATABASE},
+        ).scalar()
+        if not exists:
+            conn.execute(text('CREATE DATABASE "{}"'.format(REPLICA_DATABASE)))
+    admin.dispose()
+    url = make_url(db.db_url).set(database=REPLICA_DATABASE)
+    return url.render_as_string(hide_password=False)
+
+
+@pytest.fixture
+def replica(active_config, db_session, replica_url):
+    active_config.extend({"database_replica_url": replica_url})
+    engine = db.replica_engine()
+    db.init_db(drop_all=True, bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def add_network(session):
+    network = models.Network()
+    session.add(network)
+    session.commit()
+    return network
+
+
+class TestRoutingSession:
+    def test_reads_from_replica(self, replica, db_session):
+        add_network(db_session)
+
+        with db.reading_from_replica():
+            assert models.Network.query.count() == 0
+        assert models.Network.query.count() == 1
+
+    def test_reads_from_primary_after_writing(self, replica, db_session):
+        add_network(db_session)
+
+        with db.reading_from_replica():
+            db_session.add(models.Network())
+            db_session.flush()
+            assert models.Network.query.count() == 2
+
+        assert db.wrote()
+
+    def test_locking_reads_go_to_primary(self, replica, db_session):
+        add_network(db_session)
+
+        with db.reading_from_replica():
+            assert len(models.Network.query.with_for_update().all()) == 1
+
+    def test_reads_from_primary_without_replica(self, active_config, db_session):
+        add_network(db_session)
+
+        with db.reading_from_replica():
+            assert models.Network.query.count() == 1
+        assert db.replica_engine() is None
+
+    def test_selects_do_not_count_as_writes(self, replica, db_session):
+        db.reset_writes()
+        models.Network.query.all()
+
+        assert not db.wrote()
+
+    def test_text_reads_do_not_count_as_writes(self, replica, db_session):
+        add_network(db_session)
+        db.reset_writes()
+
+        with db.reading_from_replica():
+            db_session.execute(text("SELECT 1"))
+            db_session.connection()
+            assert db.estimated_count(models.Network.query) >= 0
+            assert models.Network.query.count() == 0
+
+        assert not db.wrote()
+
+    def test_read_only_statements_read_from_replica(self, replica, db_session):
+        add_network(db_session)
+        count = text("SELECT count(*) FROM network")
+
+        with db.reading_from_replica():
+            assert db_session.execute(count, bind_arguments=db.READ_ONLY).scalar() == 0
+            assert db_session.execute(count).scalar() == 1
+
+
+@pytest.mark.usefixtures("experiment_dir_merged")
+class TestReplicaRoutes:
+    def test_summary_reads_from_replica(self, replica, db_session, webapp):
+        add_network(db_session)
+
+        resp = webapp.get("/summary")
+
+        assert resp.json["unfilled_networks"] == 0
+
+    def test_node_infos_read_from_replica(self, replica, db_session, webapp):
+        network = add_network(db_session)
+        node = models.Node(network=network)
+        db_session.add(node)
+        db_session.commit()
+        node_id = node.id
+        # Requests start with an empty session
+        db_session.remove()
+
+        resp = webapp.get("/node/{}/infos".format(node_id))
+
+        assert resp.json["status"] == "error"
+        assert "/node/infos, node does not exist" in resp.json["html"]
+
+    def test_clients_that_wrote_read_their_writes(self, replica, db_session, webapp):
+        resp = webapp.post("/participant/1/1/1/debug")
+        assert READ_YOUR_WRITES_COOKIE in resp.headers["Set-Cookie"]
+
+        assert webapp.get("/summary").json["unfilled_networks"] > 0
+
+        with mock.patch("time.time", return_value=10**10):
+            assert webapp.get("/summary").json["unfilled_networks"] == 0
+
+    def test_no_cookie_without_replica(self, db_session, webapp):
+        resp = webapp.post("/participant/1/1/1/debug")
+        assert "Set-Cookie" not in resp.headers
+
+    def test_no_cookie_for_reads(self, replica, webapp):
+        resp = webapp.get("/summary")
+        assert "Set-Cookie" not in resp.headers
+
+    def test_dashboard_reads_from_replica(self, replica, db_session, webapp_admin):
+        add_network(db_session)
+
+        resp = webapp_admin.get("/dashboard/network_structure")
+
+        assert resp.json["networks"] == []
+
+    def test_database_view_reads_from_replica(self, replica, db_session, webapp_admin):
+        add_network(db_session)
+        params = {
+            "table": "network",
+            "polymorphic_identity": "network",
+            "draw": "1",
+            "columns[0][data]": "id",
+            "columns[0][name]": "id",
+        }
+
+        resp = webapp_admin.get("/dashboard/database", query_string=params)
+
+        assert resp.json["recordsTotal"] == 0
+        assert resp.json["data"] == []
+        assert "Set-Cookie" not in resp.headers
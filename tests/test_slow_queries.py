@@ -0,0 +1,169 @@
+from unittest import mock
+
+import pytest
+from sqlalchemy import text
+
+from dallinger import db, slow_queries
+
+
+@pytest.fixture
+def explain():
+    with mock.patch("dallinger.slow_queries.explain") as explain:
+        yield explain
+
+
+@pytest.fixture
+def engine():
+    engine = db.create_db_engine(db.db_url)
+    slow_queries.install(engine)
+    yield engine
+    engine.dispose()
+
+
+class TestNormalize:
+    def test_replaces_parameters_and_literals(self):
+        statement = (
+            "SELECT * FROM node WHERE node.id = %(id_1)s AND "
+            "node.type = 'agent' AND node.failed = false LIMIT 10"
+        )
+        assert slow_queries.normalize(statement) == (
+            "SELECT * FROM node WHERE node.id = ? AND node.type = ? AND "
+            "node.failed = false LIMIT ?"
+        )
+
+    def test_in_lists_of_any_length_have_the_same_fingerprint(self):
+        two = "SELECT * FROM node WHERE node.id IN (%(id_1_1)s, %(id_1_2)s)"
+        three = "SELECT * FROM node WHERE node.id IN (%(id_1_1)s, %(id_1_2)s, 3)"
+
+        assert slow_queries.normalize(three) == (
+            "SELECT * FROM node WHERE node.id IN (...)"
+        )
+        assert slow_queries.fingerprint(two) == slow_queries.fingerprint(three)
+
+    def test_keeps_identifiers_with_digits(self):
+        statement = "SELECT node.property1 FROM node AS node_1"
+        assert slow_queries.normalize(statement) == statement
+
+
+class TestParameterShape:
+    def test_dict(self):
+        shape = slow_queries.parameter_shape(
+            {"id_1": 1, "name": "secret", "ids": [1, 2, 3]}
+        )
+        assert shape == "{id_1: int, ids: list[3], name: str}"
+
+    def test_executemany(self):
+        shape = slow_queries.parameter_shape([{"id": 1}, {"id": 2}])
+        assert shape == "2 x {id: int}"
+
+
+class TestRecord:
+    def test_totals_by_fingerprint(self, redis_conn, explain):
+        statement = "SELECT * FROM node WHERE id = %(id_1)s"
+        slow_queries.record(statement, {"id_1": 1}, 120.0, "GET /node/<int:node_id>")
+        slow_queries.record(statement, {"id_1": 2}, 80.0, "worker AssignmentSubmitted")
+        slow_queries.record(statement, {"id_1": 3}, 100.0, "GET /node/<int:node_id>")
+
+        (query,) = slow_queries.summary()
+        assert query["statement"] == "SELECT * FROM node WHERE id = ?"
+        assert query["params"] == "{id_1: int}"
+        assert query["count"] == 3
+        assert query["total_ms"] == 300.0
+        assert query["mean_ms"] == 100.0
+        assert query["max_ms"] == 120.0
+        assert query["contexts"] == [
+            ("GET /node/<int:node_id>", 2),
+            ("worker AssignmentSubmitted", 1),
+        ]
+
+    def test_explains_first_occurrence_only(self, redis_conn, explain):
+        slow_queries.record("SELECT 1", {}, 100.0, "-")
+        slow_queries.record("SELECT 2", {}, 100.0, "-")
+
+        explain.assert_called_once_with(
+            "dallinger_slow_queries:" + slow_queries.fingerprint("SELECT 1"),
+            "SELECT 1",
+            {},
+        )
+
+    def test_logs_statement(self, redis_conn, explain):
+        with mock.patch("dallinger.slow_queries.logger") as logger:
+            slow_queries.record("SELECT %(x)s", {"x": "private"}, 100.0, "-")
+
+        message = logger.warning.call_args[0][0] % logger.warning.call_args[0][1:]
+        assert message.startswith("Slow query: 100 ms")
+        assert "params={x: str}" in message
+        assert "private" not in message
+
+    def test_clear(self, redis_conn, explain):
+        slow_queries.record("SELECT 1", {}, 100.0, "-")
+        slow_queries.clear()
+
+        assert slow_queries.summary() == []
+
+
+class TestExplain:
+    def test_analyzes_selects(self, db_session, redis_conn):
+        plan = slow_queries.explain(
+            "key", "SELECT * FROM node WHERE id = %(id_1)s", {"id_1": 1}
+        )
+
+        assert "actual time" in plan
+        assert redis_conn.hget("key", "plan").decode() == plan
+
+    def test_does_not_run_writes(self, db_session, redis_conn):
+        statement = "INSERT INTO network (type, role) VALUES (%(type)s, 'default')"
+        plan = slow_queries.explain("key", statement, {"type": "network"})
+
+        assert "Insert on network" in plan
+        assert "actual time" not in plan
+        assert db_session.execute(text("SELECT count(*) FROM network")).scalar() == 0
+
+    def test_reports_errors(self, db_session, redis_conn):
+        plan = slow_queries.explain("key", "SELECT * FROM missing", {})
+        assert plan.startswith("Could not explain statement")
+
+
+class TestHook:
+    def test_records_statements_over_threshold(
+        self, active_config, redis_conn, explain, engine
+    ):
+        active_config.extend({"slow_query_ms": 20})
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_sleep(0.05)"))
+            conn.execute(text("SELECT 1"))
+
+        (query,) = slow_queries.summary()
+        assert query["statement"] == "SELECT pg_sleep(?)"
+        assert query["contexts"] == [("-", 1)]
+
+    def test_off_by_default(self, active_config, redis_conn, explain, engine):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_sleep(0.05)"))
+
+        assert slow_queries.summary() == []
+
+
+@pytest.mark.usefixtures("experiment_dir_merged")
+class TestDashboard:
+    def test_requires_login(self, webapp):
+        assert webapp.get("/dashboard/slow_queries").status_code == 401
+
+    def test_lists_queries(self, active_config, redis_conn, explain, webapp_admin):
+        active_config.extend({"slow_query_ms": 50})
+        slow_queries.record("SELECT * FROM node", {}, 120.0, "GET /summary")
+
+        resp = webapp_admin.get("/dashboard/slow_queries")
+        page = resp.data.decode("utf8")
+        assert "SELECT * FROM node" in page
+        assert "<code>GET /summary</code> (1)" in page
+
+        resp = webapp_admin.get("/dashboard/slow_queries?format=json")
+        assert resp.json["queries"][0]["count"] == 1
+
+    def test_clear(self, redis_conn, explain, webapp_admin):
+        slow_queries.record("SELECT * FROM node", {}, 120.0, "GET /summary")
+
+        webapp_admin.post("/dashboard/slow_queries/clear")
+
+        assert slow_queries.summary() == []
@@ -0,0 +1,170 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from dallinger.swarm import (
+    BotSwarm,
+    LatencyHistogram,
+    SwarmSession,
+    arrival_delays,
+    endpoint_name,
+)
+
+
+class OKHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        status = 500 if self.path.startswith("/fail") else 200
+        body = b'{"status": "success"}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), OKHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}".format(httpd.server_address[1])
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class FakeBot:
+    http = None
+
+    def __init__(self, url, assignment_id="", worker_id="", hit_id=""):
+        self.url = url
+        self.worker_id = worker_id
+        self.host = url.split("/ad?")[0]
+
+    def run_experiment(self):
+        self.http.post(self.host + "/participant/{}/1/1/debug".format(self.worker_id))
+        self.http.get(self.host + "/worker_complete?participant_id=1")
+
+
+class TestLatencyHistogram:
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 101):
+            histogram.record(float(ms))
+        assert histogram.count == 100
+        assert histogram.percentile(50) == pytest.approx(50, rel=0.1)
+        assert histogram.percentile(99) == pytest.approx(99, rel=0.1)
+        assert histogram.percentile(100) == 100
+
+    def test_empty(self):
+        histogram = LatencyHistogram()
+        assert histogram.percentile(50) is None
+        assert histogram.as_dict()["mean_ms"] is None
+
+    def test_merge(self):
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(1.0)
+        second.record(3.0, error=True)
+        first.merge(second)
+        assert first.count == 2
+        assert first.errors == 1
+        assert first.max_ms == 3.0
+
+
+class TestArrivalDelays:
+    def test_constant(self):
+        assert list(arrival_delays(3, 2.0, "constant")) == [0.0, 0.5, 0.5]
+
+    def test_burst(self):
+        assert list(arrival_delays(3, 2.0, "burst")) == [0.0, 0.0, 0.0]
+
+    def test_ramp_reaches_rate(self):
+        delays = list(arrival_delays(100, 10.0, "ramp"))
+        assert sum(delays) == pytest.approx(20.0, rel=0.01)
+        assert delays[-1] == pytest.approx(0.1, rel=0.05)
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError):
+            list(arrival_delays(1, 1.0, "bogus"))
+
+
+def test_endpoint_name():
+    assert (
+        endpoint_name("post", "http://host/participant/w/h/a/debug?x=1")
+        == "POST /participant"
+    )
+    assert endpoint_name("GET", "http://host/node/4/neighbors") == "GET /node"
+
+
+def test_session_records_latency_and_errors(server):
+    session = SwarmSession(pool_size=2)
+    session.get(server + "/info/1")
+    session.get(server + "/fail")
+    assert session.histograms["GET /info"].count == 1
+    assert session.histograms["GET /fail"].errors == 1
+
+
+def test_swarm_runs_bots_with_shared_session(server):
+    swarm = BotSwarm(FakeBot, server, count=20, profile="burst", concurrency=5)
+    result = swarm.run()
+    assert result.started == result.completed == 20
+    assert result.failed == 0
+    endpoints = result.as_dict()["endpoints"]
+    assert endpoints["POST /participant"]["count"] == 20
+    assert endpoints["GET /worker_complete"]["count"] == 20
+
+
+def test_swarm_counts_failed_bots(server):
+    class BrokenBot(FakeBot):
+        def run_experiment(self):
+            raise RuntimeError("broken")
+
+    result = BotSwarm(BrokenBot, server, count=3, profile="burst").run()
+    assert result.failed == 3
+    assert result.errors == {"RuntimeError": 3}
+
+
+def test_swarm_runs_at_most_concurrency_bots_at_once(server):
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    class SlowBot(FakeBot):
+        def run_experiment(self):
+            with lock:
+                running.append(self)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.remove(self)
+
+    result = BotSwarm(SlowBot, server, count=10, profile="burst", concurrency=2).run()
+    assert result.completed == 10
+    assert max(peak) == 2
+
+
+def test_swarm_reports_arrivals_delayed_by_saturation(server):
+    class SlowBot(FakeBot):
+        def run_experiment(self):
+            time.sleep(0.05)
+
+    swarm = BotSwarm(SlowBot, server, count=4, rate=100, profile="constant")
+    swarm.concurrency = 1
+    result = swarm.run()
+
+    scheduled = [s for s, _ in sorted(result.arrivals)]
+    assert scheduled == pytest.approx([0.0, 0.01, 0.02, 0.03])
+    # Each bot waited for the previous ones to finish
+    assert result.delayed == 3
+    assert result.arrival_lag.max_ms >= 3 * 50 - 30
+    assert result.as_dict()["arrival_lag"]["count"] == 4
@@ -454,3 +454,8 @@ def test_port_is_open(tmp_path):
         assert port_is_open(port, host="127.0.0.1") is True
     # After closing, the port should not be open
     assert port_is_open(port, host="127.0.0.1") is False
+
+
+def test_fake_is_deprecated():
+    with pytest.deprecated_call():
+        assert utils.fake.password()